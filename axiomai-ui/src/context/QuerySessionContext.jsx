@@ -13,6 +13,51 @@ export const QuerySessionProvider = ({ children }) => {
         error: null
     });
 
+    const handleStreamEvent = (event, data) => {
+        switch (event) {
+            case "retrieval":
+                setState(prev => ({
+                    ...prev,
+                    phase: "generating",
+                    citations: data.citations || [],
+                    reasoningLog: [...prev.reasoningLog, `[RETRIEVER] Retrieved ${(data.citations || []).length} documents.`]
+                }));
+                break;
+            case "token":
+                setState(prev => ({ ...prev, answer: prev.answer + (data.text || "") }));
+                break;
+            case "validation":
+                setState(prev => ({
+                    ...prev,
+                    phase: data.decision === "trusted" ? prev.phase : "verifying",
+                    trustScore: data.trust_score || 0,
+                    reasoningLog: [...prev.reasoningLog, `[VALIDATOR] Trust score computed: ${data.trust_score}`]
+                }));
+                break;
+            case "hallucination":
+                setState(prev => ({
+                    ...prev,
+                    reasoningLog: [...prev.reasoningLog, `[VERIFIER] Hallucination detected: ${data.hallucination}`]
+                }));
+                break;
+            case "done":
+                setState(prev => ({
+                    ...prev,
+                    phase: "done",
+                    trustScore: data.trust_score || 0,
+                    answer: data.answer || "No logical answer generated.",
+                    claims: data.claims || [],
+                    citations: data.citations || [],
+                    reasoningLog: [...prev.reasoningLog, ...(data.reasoning_log || []), "[SYSTEM] Query resolution complete."]
+                }));
+                break;
+            case "error":
+                throw new Error(data.detail || "Stream error");
+            default:
+                break;
+        }
+    };
+
     const handleQuerySubmit = async (query) => {
         if (!query) return;
 
@@ -27,21 +72,7 @@ export const QuerySessionProvider = ({ children }) => {
         });
 
         try {
-            const API_URL = 'http://localhost:8000/api/v1/query';
-
-            const phases = ['generating', 'validating', 'verifying'];
-            let currentPhaseIdx = 0;
-
-            const simulateInterval = setInterval(() => {
-                if (currentPhaseIdx < phases.length) {
-                    setState(prev => ({
-                        ...prev,
-                        phase: phases[currentPhaseIdx],
-                        reasoningLog: [...prev.reasoningLog, `[SYSTEM] Transitioning to ${phases[currentPhaseIdx]}...`]
-                    }));
-                    currentPhaseIdx++;
-                }
-            }, 1000);
+            const API_URL = 'http://localhost:8000/api/v1/query/stream';
 
             const response = await fetch(API_URL, {
                 method: 'POST',
@@ -49,23 +80,34 @@ export const QuerySessionProvider = ({ children }) => {
                 body: JSON.stringify({ query })
             });
 
-            clearInterval(simulateInterval);
-
-            if (!response.ok) {
+            if (!response.ok || !response.body) {
                 throw new Error('Network response was not ok');
             }
 
-            const data = await response.json();
+            // Server-sent events: "event: <name>\ndata: <json>\n\n"
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = "";
 
-            setState(prev => ({
-                ...prev,
-                phase: "done",
-                trustScore: data.trust_score || 0,
-                answer: data.answer || "No logical answer generated.",
-                claims: data.claims || [],
-                citations: data.citations || [],
-                reasoningLog: [...prev.reasoningLog, ...(data.reasoning_log || []), "[SYSTEM] Query resolution complete."]
-            }));
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                let boundary;
+                while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+                    const raw = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+
+                    let event = "message";
+                    let data = "";
+                    for (const line of raw.split("\n")) {
+                        if (line.startsWith("event: ")) event = line.slice(7);
+                        else if (line.startsWith("data: ")) data += line.slice(6);
+                    }
+                    handleStreamEvent(event, data ? JSON.parse(data) : {});
+                }
+            }
 
         } catch (err) {
             console.error(err);
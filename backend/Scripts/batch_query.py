@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+# Ensure backend directory is in path to import app
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.orchestration.batch import arun_batch
+
+
+def load_items(path: str) -> list:
+    """JSONL with "query" (or "question") and optional "id"; ids default to the line number."""
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            query = row.get("query") or row.get("question")
+            if not query:
+                print(f"Skipping line {line_number}: no 'query' field")
+                continue
+            items.append({"id": str(row.get("id", line_number)), "query": query})
+    return items
+
+
+def completed_ids(path: str) -> set:
+    """Ids that already have a successful record in the output (errored items are retried)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial line from an interrupted run
+            if "error" not in record:
+                done.add(record["id"])
+    return done
+
+
+async def run(items: list, output: str, args) -> None:
+    started = time.perf_counter()
+    answered = failed = 0
+    # Terminate a partial last line left by an interrupted run
+    terminate = False
+    if os.path.exists(output) and os.path.getsize(output):
+        with open(output, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            terminate = f.read(1) != b"\n"
+    with open(output, "a", encoding="utf-8") as f:
+        if terminate:
+            f.write("\n")
+        async for record in arun_batch(
+            items,
+            max_concurrency=args.concurrency,
+            llm_concurrency=args.llm_concurrency,
+            chunk_size=args.chunk_size,
+            include_trace=args.trace
+        ):
+            # One flushed line per item: an interrupted run resumes from here
+            f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            if "error" in record:
+                failed += 1
+            else:
+                answered += 1
+            done = answered + failed
+            if done % 10 == 0 or done == len(items):
+                elapsed = time.perf_counter() - started
+                print(f"{done}/{len(items)} | {failed} failed | {done / elapsed:.2f} items/s")
+
+    print(f"\n✅ {answered} answered, {failed} failed in {time.perf_counter() - started:.1f}s → {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer a JSONL file of questions through the AXIOMAI pipeline and write "
+                    "JSONL results with per-item timings. Re-running with the same --output "
+                    "skips questions that already have an answer."
+    )
+    parser.add_argument("input", help="JSONL with 'query' (or 'question') and optional 'id' per line")
+    parser.add_argument("--output", required=True, help="JSONL results file (appended to on resume)")
+    parser.add_argument("--concurrency", type=int, default=settings.BATCH_MAX_CONCURRENCY, help="Pipelines in flight")
+    parser.add_argument("--llm-concurrency", type=int, default=settings.BATCH_LLM_CONCURRENCY, help="Concurrent Gemini calls")
+    parser.add_argument("--chunk-size", type=int, default=settings.BATCH_CHUNK_SIZE, help="Queries embedded per batch")
+    parser.add_argument("--trace", action="store_true", help="Include the full per-node trace in each record")
+    parser.add_argument("--restart", action="store_true", help="Ignore existing results and start over")
+    args = parser.parse_args()
+
+    items = load_items(args.input)
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+    done = completed_ids(args.output)
+    pending = [item for item in items if item["id"] not in done]
+    print(f"Questions: {len(items)} | Already answered: {len(items) - len(pending)} | To run: {len(pending)}")
+    if not pending:
+        return
+
+    asyncio.run(run(pending, args.output, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+import os
+import re
+import sys
+import json
+import logging
+import time
+import zlib
+import asyncio
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+
+import numpy as np
+
+# Ensure backend directory is in path to import app
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+from app.core.log import ROOT_LOGGER
+from app.core.memory import _peak_rss_mb
+from app.rag.embedding_cache import content_hash
+from app.rag.embeddings import EmbeddingService
+
+TOPICS = [
+    "ipsec", "encryption", "tcp", "routing", "firewall", "dns", "tls", "osi",
+    "vpn", "kerberos", "hashing", "certificates", "subnet", "ethernet", "bgp", "nat"
+]
+FILLER = (
+    "the protocol layer packet header network host security key exchange session "
+    "integrity authentication traffic model data link transport address service"
+).split()
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+# ── Local stand-ins ──
+
+class HashingEmbeddings(EmbeddingService):
+    """
+    The real EmbeddingService with a deterministic feature-hashing model.
+
+    Only the model is replaced, so the embedding cache and the cross-request
+    batcher run as they do in the API. Token overlap drives similarity, so
+    retrieval, validation and claim checks behave plausibly without a model.
+    Counts every forward pass.
+    """
+
+    BACKENDS = ("hashing",)
+
+    def __init__(self, dimension: int = 256):
+        self._dimension = dimension
+        self._counter_lock = threading.Lock()
+        self.calls = 0
+        self.texts = 0
+        super().__init__(model_name="hashing-benchmark", backend="hashing")
+
+    def _load_model(self):
+        return None
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def reset_counters(self) -> None:
+        with self._counter_lock:
+            self.calls = 0
+            self.texts = 0
+
+    def _forward(self, texts):
+        with self._counter_lock:
+            self.calls += 1
+            self.texts += len(texts)
+        vectors = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in _TOKEN_RE.findall(text.lower()):
+                digest = zlib.crc32(token.encode("utf-8"))
+                vectors[row, digest % self._dimension] += 1.0 if digest & 1 << 31 else -1.0
+        norms = np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors / norms
+
+
+def fake_answer(inputs: dict) -> str:
+    """
+    Deterministic stand-in for Gemini: restates the first sentence of the top
+    chunks. Every fourth question also gets an unsupported sentence, so the
+    untrusted → hallucination path is exercised too.
+    """
+    sentences = []
+    for block in inputs["context"].split("\n\nChunk ")[:2]:
+        body = block.split("]:\n", 1)[-1]
+        sentences.append(body.split(". ")[0].strip())
+    answer = ". ".join(s for s in sentences if s) + "."
+    if zlib.crc32(inputs["question"].encode("utf-8")) % 4 == 0:
+        answer += " The moon landing used quantum blockchain telemetry."
+    return answer
+
+
+def make_generator(latency_ms: float):
+    """A real LLMGeneratorAgent whose chain is the deterministic fake LLM."""
+    from langchain_core.runnables import RunnableLambda
+    from app.agents.generator import LLMGeneratorAgent
+
+    async def afake_answer(inputs: dict) -> str:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return fake_answer(inputs)
+
+    generator = LLMGeneratorAgent.__new__(LLMGeneratorAgent)
+    generator.llm = None
+    generator.prompt = None
+    generator.chain = RunnableLambda(fake_answer, afunc=afake_answer)
+    return generator
+
+
+# ── Synthetic corpus ──
+
+def make_corpus(size: int, seed: int = 0) -> list:
+    """Chunks spread over topics, several chunks per source/page."""
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for i in range(size):
+        topic = TOPICS[i % len(TOPICS)]
+        words = rng.choice(FILLER, size=40).tolist()
+        text = (
+            f"{topic.upper()} overview section {i}. "
+            f"{topic} {' '.join(words[:20])} {topic}. {' '.join(words[20:])}."
+        )
+        chunks.append({
+            "id": f"bench-{i}",
+            "text": text,
+            "metadata": {
+                "source": f"bench-{topic}",
+                "page": i // 8,
+                "chunk_id": i % 8,
+                "published_at": datetime.utcnow().isoformat(),
+                "content_hash": content_hash(text)
+            }
+        })
+    return chunks
+
+
+def make_queries(count: int) -> list:
+    return [f"What is {TOPICS[i % len(TOPICS)]} used for in {FILLER[i % len(FILLER)]}?" for i in range(count)]
+
+
+def install_corpus(embeddings: HashingEmbeddings, corpus: list, index_dir: str) -> None:
+    """Point the app's store and lexical index at a fresh local index holding `corpus`."""
+    from app.rag import lexical, vector_store
+    from app.rag.lexical import BM25Index
+    from app.rag.vector_store import TEXT_KEY, LocalVectorStore
+
+    store = LocalVectorStore(path=os.path.join(index_dir, "vectors"), search="exact")
+    for start in range(0, len(corpus), 512):
+        batch = corpus[start:start + 512]
+        vectors = embeddings.embed([chunk["text"] for chunk in batch])
+        store.upsert([
+            {"id": chunk["id"], "values": vector.tolist(), "metadata": {**chunk["metadata"], TEXT_KEY: chunk["text"]}}
+            for chunk, vector in zip(batch, vectors)
+        ])
+    store.flush()
+
+    index = BM25Index(path=os.path.join(index_dir, "lexical"))
+    index.update({chunk["id"]: chunk["text"] for chunk in corpus})
+    index.save()
+
+    vector_store._store = store
+    lexical._index = index
+
+
+# ── Measurement ──
+
+def summarize(latencies: list, elapsed: float, embed_calls: int, operations: int) -> dict:
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+    return {
+        "operations": operations,
+        "throughput_ops": round(operations / elapsed, 2) if elapsed else None,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "embed_calls_per_op": round(embed_calls / operations, 2) if operations else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 1)
+    }
+
+
+def bench_sync(embeddings: HashingEmbeddings, func, inputs: list) -> dict:
+    embeddings.reset_counters()
+    latencies = []
+    started = time.perf_counter()
+    for item in inputs:
+        op_started = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - op_started)
+    return summarize(latencies, time.perf_counter() - started, embeddings.calls, len(inputs))
+
+
+async def bench_pipeline(embeddings: HashingEmbeddings, queries: list, concurrency: int) -> dict:
+    from app.orchestration.graph import arun_axiomai
+
+    embeddings.reset_counters()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(query):
+        async with semaphore:
+            op_started = time.perf_counter()
+            await arun_axiomai(query)
+            latencies.append(time.perf_counter() - op_started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(query) for query in queries))
+    return summarize(latencies, time.perf_counter() - started, embeddings.calls, len(queries))
+
+
+def run_benchmarks(args) -> list:
+    from app.rag import embeddings as embeddings_module
+    from app.orchestration.agents import registry
+    from app.rag.retriever import RetrieverAgent
+    from app.rag.refresh import KnowledgeRefreshAgent
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="axiomai-bench-") as workdir:
+        # Exercise the embedding cache without touching the real one under data/
+        settings.EMBEDDING_CACHE_PATH = os.path.join(workdir, "embedding_cache.sqlite3")
+        embeddings = HashingEmbeddings()
+        # Agents fetch the shared service directly as well as through the registry
+        embeddings_module._service = embeddings
+        registry.override("embeddings", embeddings)
+        registry.override("generator", make_generator(args.llm_latency_ms))
+
+        for corpus_size in args.corpus_sizes:
+            print(f"\nCorpus: {corpus_size} chunks")
+            corpus = make_corpus(corpus_size)
+            install_corpus(embeddings, corpus, os.path.join(workdir, str(corpus_size)))
+            # Store-bound agents capture the store at construction
+            registry.override("retriever", RetrieverAgent())
+            registry.override("refresher", KnowledgeRefreshAgent())
+
+            retriever = registry.get("retriever")
+            validator = registry.get("validator")
+            detector = registry.get("hallucination_detector")
+            refresher = registry.get("refresher")
+
+            queries = make_queries(args.queries)
+            retrieved = [retriever.retrieve(query) for query in queries[:args.agent_iterations]]
+            answers = [
+                (fake_answer({"context": "\n\nChunk ".join(d["content"] for d in docs), "question": query}), docs)
+                for query, docs in zip(queries, retrieved)
+            ]
+
+            agent_runs = {
+                "retriever.retrieve": lambda query: retriever.retrieve(query),
+                "validator.validate": lambda item: validator.validate(item[0], item[1]),
+                "hallucination.detect": lambda item: detector.detect(item[0], item[1]),
+                "refresh.refresh": lambda item: refresher.refresh("benchmark", item[1][:2]),
+            }
+            agent_inputs = {
+                "retriever.retrieve": queries[:args.agent_iterations],
+                "validator.validate": answers,
+                "hallucination.detect": answers,
+                # Each refresh flushes the local index to disk; keep the sample small
+                "refresh.refresh": answers[:args.refresh_iterations],
+            }
+            for name, func in agent_runs.items():
+                result = {"benchmark": name, "corpus_size": corpus_size, "concurrency": 1}
+                result.update(bench_sync(embeddings, func, agent_inputs[name]))
+                results.append(result)
+                print_result(result)
+
+            for concurrency in args.concurrency:
+                result = {"benchmark": "pipeline", "corpus_size": corpus_size, "concurrency": concurrency}
+                result.update(asyncio.run(bench_pipeline(embeddings, queries, concurrency)))
+                results.append(result)
+                print_result(result)
+
+            registry.get("refresher").upserter.close()
+    return results
+
+
+def print_result(result: dict) -> None:
+    print(
+        f"{result['benchmark']:<22} | n={result['corpus_size']:<6} c={result['concurrency']:<3} | "
+        f"{result['throughput_ops']!s:>8} ops/s | p50 {result['p50_ms']!s:>8}ms | "
+        f"p95 {result['p95_ms']!s:>8}ms | p99 {result['p99_ms']!s:>8}ms | "
+        f"embed/op {result['embed_calls_per_op']} | peak RSS {result['peak_rss_mb']} MB"
+    )
+
+
+def compare(results: list, baseline_path: str) -> None:
+    """Print throughput and p95 changes against a previous run."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {
+            (r["benchmark"], r["corpus_size"], r["concurrency"]): r
+            for r in json.load(f)["results"]
+        }
+    print(f"\nChange vs {baseline_path} (throughput / p95; + is better):")
+    for result in results:
+        old = baseline.get((result["benchmark"], result["corpus_size"], result["concurrency"]))
+        if not old or not old["throughput_ops"] or not old["p95_ms"]:
+            continue
+        throughput = (result["throughput_ops"] / old["throughput_ops"] - 1) * 100
+        p95 = (1 - result["p95_ms"] / old["p95_ms"]) * 100
+        print(
+            f"{result['benchmark']:<22} | n={result['corpus_size']:<6} c={result['concurrency']:<3} | "
+            f"throughput {throughput:+.1f}% | p95 {p95:+.1f}%"
+        )
+
+
+def configure_offline() -> None:
+    """
+    Offline settings: no reranker model, no query cache (measure the pipeline),
+    inline refresh (never a queue under data/ or re-indexing mid-run), quiet logs.
+    Must run before the graph module is imported (it is built at import time).
+    """
+    settings.RERANK_ENABLED = False
+    settings.QUERY_CACHE_ENABLED = False
+    settings.REFRESH_QUEUE_ENABLED = False
+    settings.LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING")
+    # Logging was already set up when app modules were imported above
+    logging.getLogger(ROOT_LOGGER).setLevel(settings.LOG_LEVEL.upper())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline benchmark of the AXIOMAI pipeline and agents with local stand-ins "
+                    "(local vector store, hashing embedder, deterministic fake LLM)."
+    )
+    parser.add_argument("--corpus-sizes", default="1000,10000", help="Comma-separated chunk counts")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated pipeline concurrency levels")
+    parser.add_argument("--queries", type=int, default=200, help="Pipeline queries per run")
+    parser.add_argument("--agent-iterations", type=int, default=100, help="Calls per agent benchmark")
+    parser.add_argument("--refresh-iterations", type=int, default=20, help="Calls for the refresh benchmark")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated LLM latency")
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", default=None, help="Previous --output file to compare against")
+    args = parser.parse_args()
+    args.corpus_sizes = [int(n) for n in args.corpus_sizes.split(",")]
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+
+    configure_offline()
+    results = run_benchmarks(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": datetime.now().isoformat(),
+                "settings": {
+                    "queries": args.queries,
+                    "agent_iterations": args.agent_iterations,
+                    "llm_latency_ms": args.llm_latency_ms,
+                    "cpu_workers": settings.CPU_WORKERS,
+                    "io_workers": settings.IO_WORKERS,
+                    "top_k": settings.TOP_K
+                },
+                "results": results
+            }, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Ensure backend directory is in path to import app
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from app.core.config import settings
+
+# Compare fresh forward passes at the requested batch size: no cached vectors,
+# and no batcher regrouping texts or adding its wait to the timings
+settings.EMBEDDING_CACHE_ENABLED = False
+settings.EMBEDDING_BATCHING_ENABLED = False
+
+from app.rag.embeddings import EmbeddingService
+from benchmark import make_corpus, make_queries
+
+
+def load_texts(path: str, limit: int) -> list:
+    """One text per line, or JSONL objects with a "text" field."""
+    texts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            texts.append(json.loads(line)["text"] if line.startswith("{") else line)
+            if len(texts) >= limit:
+                break
+    return texts
+
+
+def timed_embed(service: EmbeddingService, texts: list, batch_size: int) -> tuple:
+    service.embed(texts[:batch_size])  # warm-up
+    started = time.perf_counter()
+    vectors = np.vstack([
+        service.embed(texts[start:start + batch_size])
+        for start in range(0, len(texts), batch_size)
+    ])
+    return vectors, time.perf_counter() - started
+
+
+def top_k(query_vectors: np.ndarray, doc_vectors: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-(query_vectors @ doc_vectors.T), axis=1)[:, :k]
+
+
+def compare_backends(backend: str, texts: list, queries: list, k: int, batch_size: int) -> dict:
+    """fp32 torch vs `backend`: vector agreement, top-k neighbour overlap and throughput."""
+    results = {}
+    for name in ("torch", backend):
+        print(f"Loading {settings.EMBEDDING_MODEL_NAME} [{name}]...")
+        service = EmbeddingService(backend=name)
+        docs, doc_seconds = timed_embed(service, texts, batch_size)
+        # Queries one at a time, as the /query path embeds them
+        query_vectors, query_seconds = timed_embed(service, queries, 1)
+        results[name] = {
+            "docs": docs,
+            "queries": query_vectors,
+            "seconds": doc_seconds,
+            "query_ms": query_seconds * 1000 / len(queries)
+        }
+        del service
+
+    reference, candidate = results["torch"], results[backend]
+    # Vectors are normalized, so the row-wise dot product is the cosine
+    cosine = np.sum(reference["docs"] * candidate["docs"], axis=1)
+    expected = top_k(reference["queries"], reference["docs"], k)
+    actual = top_k(candidate["queries"], candidate["docs"], k)
+    overlap = [len(set(e) & set(a)) / k for e, a in zip(expected.tolist(), actual.tolist())]
+
+    return {
+        "model": settings.EMBEDDING_MODEL_NAME,
+        "backend": backend,
+        "texts": len(texts),
+        "queries": len(queries),
+        "cosine_mean": round(float(cosine.mean()), 5),
+        "cosine_min": round(float(cosine.min()), 5),
+        f"recall_at_{k}": round(float(np.mean(overlap)), 4),
+        "fp32_texts_per_s": round(len(texts) / reference["seconds"], 1),
+        "candidate_texts_per_s": round(len(texts) / candidate["seconds"], 1),
+        "speedup": round(reference["seconds"] / candidate["seconds"], 2),
+        "fp32_query_ms": round(reference["query_ms"], 2),
+        "candidate_query_ms": round(candidate["query_ms"], 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare an embedding backend (int8 / onnx) against fp32 torch before switching "
+                    "EMBEDDING_BACKEND. Vectors already in the index stay comparable only if "
+                    "cosine agreement is high and retrieval recall is unchanged."
+    )
+    parser.add_argument("--backend", choices=["int8", "onnx"], default="int8", help="Candidate backend")
+    parser.add_argument("--texts-file", default=None, help="Text per line or JSONL with 'text' (default: synthetic chunks)")
+    parser.add_argument("--limit", type=int, default=500, help="Maximum texts to embed")
+    parser.add_argument("--queries", type=int, default=50, help="Synthetic queries for the recall check")
+    parser.add_argument("--top-k", type=int, default=settings.TOP_K, help="Neighbours compared per query")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per forward pass")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Fail below this mean cosine")
+    parser.add_argument("--min-recall", type=float, default=0.9, help="Fail below this top-k recall")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    if args.texts_file:
+        texts = load_texts(args.texts_file, args.limit)
+    else:
+        texts = [chunk["text"] for chunk in make_corpus(args.limit)]
+    queries = make_queries(args.queries)
+
+    report = compare_backends(args.backend, texts, queries, args.top_k, args.batch_size)
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.output}")
+
+    recall = report[f"recall_at_{args.top_k}"]
+    if report["cosine_mean"] < args.min_cosine or recall < args.min_recall:
+        print(f"❌ {args.backend} drifts from fp32 (cosine {report['cosine_mean']}, recall {recall})")
+        sys.exit(1)
+    print(f"✅ {args.backend} matches fp32 within tolerance ({report['speedup']}x speedup)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,102 +1,340 @@
 import os
 import sys
-import hashlib
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 # Ensure backend directory is in path to import app
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_pinecone import PineconeVectorStore
+from pypdf import PdfReader
 from app.core.config import settings
+from app.rag.sources import file_hash, make_splitter
+from app.rag.watcher import DocumentWatcherAgent
+
+# Local manifests of indexed chunk ids, one per ingested book
+CHECKPOINT_DIR = settings.INGEST_MANIFEST_DIR
+
+PAGES_PER_TASK = 16
+
 
 def compute_hash(text: str) -> str:
-    """Compute SHA256 hash of text content."""
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    """Compute SHA256 hash of text content (same hash the watcher checks)."""
+    return DocumentWatcherAgent._compute_hash(text)
+
+
+def _parse_and_split(pdf_path: str, start: int, end: int) -> list:
+    """
+    Worker process: extract pages [start, end) and split them into chunks.
+
+    Returns:
+        List of (page_number, chunk_text) in page order
+    """
+    reader = PdfReader(pdf_path)
+    # Same splitter the watcher re-splits changed pages with (app/rag/sources.py)
+    text_splitter = make_splitter()
+    chunks = []
+    for page_number in range(start, end):
+        text = reader.pages[page_number].extract_text() or ""
+        for chunk_text in text_splitter.split_text(text):
+            chunks.append((page_number, chunk_text))
+    return chunks
+
 
+def load_chunks(pdf_path: str, workers: int) -> tuple:
+    """
+    Parse and split the PDF across a process pool.
 
-def ingest_pdf_book(pdf_path: str):
+    Returns:
+        (total_pages, [(page_number, chunk_text), ...]) in document order
     """
-    Ingest a PDF book into Pinecone vector database.
-    
+    total_pages = len(PdfReader(pdf_path).pages)
+    ranges = [(start, min(start + PAGES_PER_TASK, total_pages)) for start in range(0, total_pages, PAGES_PER_TASK)]
+
+    if not ranges:
+        return total_pages, []
+
+    starts, ends = zip(*ranges)
+    chunks = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map preserves order, so chunk positions are deterministic
+        for page_chunks in pool.map(_parse_and_split, [pdf_path] * len(ranges), starts, ends):
+            chunks.extend(page_chunks)
+    return total_pages, chunks
+
+
+def chunk_vector_id(source: str, page_number: int, index: int, content_hash: str) -> str:
+    """
+    Deterministic chunk id from source, position and content hash.
+    Position is (page, index within page), so an edit on one page leaves
+    the ids of every other page unchanged.
+    """
+    return f"{source}:{page_number}:{index}:{content_hash[:16]}"
+
+
+def _load_manifest(path: str) -> dict:
+    """Load the manifest of already-indexed chunk ids -> content hashes."""
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if "chunks" in manifest:
+            return manifest
+    return {"chunks": {}}
+
+
+def _save_manifest(path: str, manifest: dict) -> None:
+    """Atomically write the manifest."""
+    manifest["updated_at"] = datetime.now().isoformat()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def ingest_pdf_book(
+    pdf_path: str,
+    batch_size: int = 256,
+    parse_workers: int = None,
+    upsert_workers: int = 4,
+    embed_threads: int = None,
+    restart: bool = False
+):
+    """
+    Ingest a PDF book into the vector store, incrementally.
+
+    Pipeline:
+        1. Pages are parsed and split in a process pool.
+        2. Each chunk gets a deterministic id (source + position + content
+           hash); chunks whose id is already in the local manifest are skipped.
+           Without a manifest, the book's existing vectors are deleted first.
+        3. Remaining chunks are embedded in large batches. A chunk that only
+           moved (same content hash under an old id) reuses its stored vector.
+        4. Each batch is upserted on a thread pool while the next batch
+           embeds; the manifest is updated as batches land, so a rerun
+           resumes where it stopped.
+        5. Ids that vanished from the book are deleted from the store.
+        6. The BM25 keyword index is brought in line with the book's chunks.
+
     Args:
         pdf_path: Path to the PDF file
+        batch_size: Chunks per embedding/upsert batch
+        parse_workers: Processes for PDF parsing (default: CPU count)
+        upsert_workers: Concurrent upsert requests
+        embed_threads: Intra-op threads for embedding (overrides EMBEDDING_NUM_THREADS)
+        restart: Ignore the manifest, delete the book's vectors and re-embed every chunk
     """
     print(f"Starting PDF ingestion: {pdf_path}")
-    
+
     # 1. Check if file exists
     if not os.path.exists(pdf_path):
         print(f"Error: File not found at {pdf_path}")
         return
-    
-    # 2. Load PDF
-    print("Loading PDF...")
-    loader = PyPDFLoader(pdf_path)
-    documents = loader.load()
-    print(f"Loaded {len(documents)} pages from PDF")
-    
-    # 3. Split into chunks
-    print("Splitting into chunks...")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,  # Reasonable chunk size for technical content
-        chunk_overlap=200,  # Overlap to maintain context
-        length_function=len,
-        separators=["\n\n", "\n", " ", ""]
-    )
-    chunks = text_splitter.split_documents(documents)
-    print(f"Created {len(chunks)} chunks")
-    
-    # 4. Initialize embeddings
-    print(f"Initializing embeddings: {settings.EMBEDDING_MODEL_NAME}")
-    embeddings = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL_NAME)
-    
-    # 5. Prepare metadata
+
+    # Imported after the path check; loading these pulls in the model stack
+    from app.rag.embeddings import get_embedding_service
+    from app.rag.indexing import BatchUpserter, split_upsert_requests
+    from app.rag.lexical import get_lexical_index
+    from app.rag.refresh_queue import get_refresh_queue
+    from app.rag.vector_store import TEXT_KEY, get_vector_store
+
+    started = time.perf_counter()
     book_name = os.path.basename(pdf_path)
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    manifest_path = os.path.join(CHECKPOINT_DIR, f"{book_name}.json")
+    manifest = {"chunks": {}} if restart else _load_manifest(manifest_path)
+    pdf_hash = file_hash(pdf_path)
+    lexical = get_lexical_index()
+
+    if (
+        manifest.get("pdf_sha256") == pdf_hash
+        and manifest.get("complete")
+        and lexical.contains(manifest["chunks"])
+    ):
+        print(f"Nothing to do: {book_name} is unchanged since the last ingestion")
+        return
+
+    # 2. Parse and split in parallel
+    print("Parsing and splitting PDF...")
+    total_pages, chunks = load_chunks(pdf_path, parse_workers or os.cpu_count())
+    parse_seconds = time.perf_counter() - started
+    print(f"Loaded {total_pages} pages, created {len(chunks)} chunks in {parse_seconds:.1f}s")
+
+    # 3. Diff against the manifest
+    current = []  # (vector id, page, index within page, text, content hash)
+    page_counts = {}
+    for page_number, text in chunks:
+        index = page_counts.get(page_number, 0)
+        page_counts[page_number] = index + 1
+        content_hash = compute_hash(text)
+        current.append((chunk_vector_id(book_name, page_number, index, content_hash), page_number, index, text, content_hash))
+
+    indexed = manifest["chunks"]
+    current_ids = {item[0] for item in current}
+    to_index = [item for item in current if item[0] not in indexed]
+    vanished = [vector_id for vector_id in indexed if vector_id not in current_ids]
+    # Old ids by content hash, for chunks that only changed position
+    moved_from = {}
+    for vector_id, content_hash in indexed.items():
+        if vector_id not in current_ids:
+            moved_from.setdefault(content_hash, vector_id)
+
+    # The watcher compares indexed chunks against this file while its hash matches
+    manifest.update({
+        "source": book_name,
+        "pdf_path": os.path.abspath(pdf_path),
+        "pdf_sha256": pdf_hash,
+        "complete": False
+    })
+    print(
+        f"Unchanged: {len(current) - len(to_index)} | "
+        f"To index: {len(to_index)} | To delete: {len(vanished)}"
+    )
+
+    # 4. Initialize embeddings and store
+    store = get_vector_store()
+    replaced = []
+    if not indexed:
+        # No manifest (first run on an index built by the old script, or --restart):
+        # ids from an earlier ingestion would never be diffed away, so drop the book's vectors
+        replaced = store.delete_matching({"source": book_name})
+        store.flush()
+        if replaced:
+            lexical.remove(replaced)
+            print(f"Deleted {len(replaced)} previously ingested vectors of {book_name}")
+    if to_index:
+        print(f"Initializing embeddings: {settings.EMBEDDING_MODEL_NAME}")
+        if embed_threads:
+            settings.EMBEDDING_NUM_THREADS = embed_threads
+        embeddings = get_embedding_service()
+
     timestamp = datetime.now().isoformat()
     published_at = datetime.utcnow().isoformat()
-    
-    # Add metadata to each chunk
-    for i, chunk in enumerate(chunks):
-        content_hash = compute_hash(chunk.page_content)
-        chunk.metadata.update({
-            "source": book_name,
-            "doc_id": book_name,
-            "chunk_id": i,
-            "total_chunks": len(chunks),
-            "ingestion_date": timestamp,
-            "published_at": published_at,
-            "content_hash": content_hash,
-            "doc_type": "book"
-        })
-    
-    # 6. Ingest into Pinecone
-    print(f"Ingesting into Pinecone index '{settings.PINECONE_INDEX_NAME}'...")
-    
-    vectorstore = PineconeVectorStore(
-        index_name=settings.PINECONE_INDEX_NAME,
-        embedding=embeddings,
-        pinecone_api_key=settings.PINECONE_API_KEY
-    )
-    
-    # Add documents in batches to avoid timeout
-    batch_size = 100
-    for i in range(0, len(chunks), batch_size):
-        batch = chunks[i:i+batch_size]
-        print(f"Ingesting batch {i//batch_size + 1}/{(len(chunks)-1)//batch_size + 1}...")
-        vectorstore.add_documents(batch)
-    
-    print(f"Successfully ingested {len(chunks)} chunks from {book_name}")
+
+    # 5. Embed batches and pipeline upserts
+    print(f"Ingesting into the '{settings.VECTOR_STORE_BACKEND}' vector store...")
+    pipeline_started = time.perf_counter()
+    total_batches = (len(to_index) - 1) // batch_size + 1 if to_index else 0
+    processed = 0
+    embedded = 0
+    reused = 0
+    pending = []  # ([futures], [(vector id, content hash)])
+
+    def record_completed():
+        """Add every finished batch to the manifest."""
+        finished = [entry for entry in pending if all(future.done() for future in entry[0])]
+        for entry in finished:
+            for future in entry[0]:
+                future.result()  # re-raise upsert failures
+            pending.remove(entry)
+            indexed.update(entry[1])
+        if finished:
+            store.flush()
+            _save_manifest(manifest_path, manifest)
+
+    with BatchUpserter(store, max_workers=upsert_workers) as upserter:
+        for batch_index in range(total_batches):
+            batch = to_index[batch_index * batch_size:(batch_index + 1) * batch_size]
+
+            # Reuse stored vectors for chunks that only moved
+            old_ids = {item[0]: moved_from[item[4]] for item in batch if item[4] in moved_from}
+            stored = store.fetch(list(old_ids.values())) if old_ids else {}
+            vectors = {
+                vector_id: stored[old_id]["values"]
+                for vector_id, old_id in old_ids.items()
+                if old_id in stored
+            }
+            to_embed = [item for item in batch if item[0] not in vectors]
+            if to_embed:
+                for item, vector in zip(to_embed, embeddings.embed([item[3] for item in to_embed])):
+                    vectors[item[0]] = vector.tolist()
+            embedded += len(to_embed)
+            reused += len(batch) - len(to_embed)
+
+            records = []
+            for vector_id, page_number, index, text, content_hash in batch:
+                records.append({
+                    "id": vector_id,
+                    "values": vectors[vector_id],
+                    "metadata": {
+                        TEXT_KEY: text,
+                        "source": book_name,
+                        "doc_id": book_name,
+                        "page": page_number,
+                        "chunk_id": index,
+                        "ingestion_date": timestamp,
+                        "published_at": published_at,
+                        "content_hash": content_hash,
+                        "doc_type": "book"
+                    }
+                })
+            # Size-bounded requests, sent concurrently
+            futures = [upserter.submit(request) for request in split_upsert_requests(records)]
+            pending.append((futures, [(item[0], item[4]) for item in batch]))
+
+            processed += len(batch)
+            elapsed = time.perf_counter() - pipeline_started
+            print(
+                f"Embedded batch {batch_index + 1}/{total_batches} | "
+                f"{processed / elapsed:.1f} chunks/sec"
+            )
+            record_completed()
+
+    # Upserter closed: every batch has finished
+    record_completed()
+
+    # 6. Delete vanished chunks only after their replacements are in place
+    for start in range(0, len(vanished), batch_size):
+        batch = vanished[start:start + batch_size]
+        store.delete(batch)
+        for vector_id in batch:
+            indexed.pop(vector_id, None)
+    store.flush()
+
+    # 7. Keyword index: cheap to rebuild for the whole book from parsed text
+    lexical.remove(vanished)
+    lexical.update({item[0]: item[3] for item in current})
+    lexical.save()
+
+    # Running API workers evict cached answers built from replaced chunks
+    get_refresh_queue().mark_refreshed([item[0] for item in to_index] + vanished + replaced)
+
+    manifest["complete"] = True
+    _save_manifest(manifest_path, manifest)
+
+    total_seconds = time.perf_counter() - started
+    pipeline_seconds = time.perf_counter() - pipeline_started
+    print(f"Successfully ingested {processed} chunks from {book_name}")
     print(f"Book: {book_name}")
-    print(f"Total Pages: {len(documents)}")
+    print(f"Total Pages: {total_pages}")
     print(f"Total Chunks: {len(chunks)}")
-    print(f"Index: {settings.PINECONE_INDEX_NAME}")
+    print(f"Embedded: {embedded} | Reused vectors: {reused} | Deleted: {len(vanished)}")
+    print(f"Store: {settings.VECTOR_STORE_BACKEND}")
+    if processed:
+        print(f"Throughput: {processed / pipeline_seconds:.1f} chunks/sec (embed + upsert), "
+              f"{total_seconds:.1f}s total")
 
 if __name__ == "__main__":
     # Path to the PDF book
-    pdf_path = os.path.join(os.path.dirname(__file__), "..", "..", "ML_oreilly.pdf")
-    pdf_path = os.path.abspath(pdf_path)
-    
+    default_path = os.path.join(os.path.dirname(__file__), "..", "..", "ML_oreilly.pdf")
+
+    parser = argparse.ArgumentParser(description="Ingest a PDF book into the vector store.")
+    parser.add_argument("pdf_path", nargs="?", default=default_path)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--parse-workers", type=int, default=None)
+    parser.add_argument("--upsert-workers", type=int, default=4)
+    parser.add_argument("--embed-threads", type=int, default=None)
+    parser.add_argument("--restart", action="store_true", help="Ignore the manifest, delete the book's vectors and re-embed every chunk")
+    args = parser.parse_args()
+
+    pdf_path = os.path.abspath(args.pdf_path)
     print(f"PDF Path: {pdf_path}")
-    ingest_pdf_book(pdf_path)
+    ingest_pdf_book(
+        pdf_path,
+        batch_size=args.batch_size,
+        parse_workers=args.parse_workers,
+        upsert_workers=args.upsert_workers,
+        embed_threads=args.embed_threads,
+        restart=args.restart
+    )
@@ -4,13 +4,15 @@ import sys
 # Ensure backend directory is in path to import app
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_pinecone import PineconeVectorStore
 from app.core.config import settings
+from app.rag.embeddings import get_embedding_service
+from app.rag.lexical import get_lexical_index
+from app.rag.refresh_queue import get_refresh_queue
+from app.rag.vector_store import TEXT_KEY, get_vector_store
 
 def ingest_data():
     print(f"Initializing embeddings: {settings.EMBEDDING_MODEL_NAME}")
-    embeddings = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL_NAME)
+    embeddings = get_embedding_service()
 
     # Detailed AXIOMAI Knowledge Base
     documents = [
@@ -55,15 +57,27 @@ def ingest_data():
     texts = [doc["text"] for doc in documents]
     metadatas = [{"source": doc["source"], "chunk_id": i} for i, doc in enumerate(documents)]
 
-    print(f"Ingesting {len(texts)} documents into Pinecone index '{settings.PINECONE_INDEX_NAME}'...")
+    print(f"Ingesting {len(texts)} documents into the '{settings.VECTOR_STORE_BACKEND}' vector store...")
     
-    vectorstore = PineconeVectorStore(
-        index_name=settings.PINECONE_INDEX_NAME,
-        embedding=embeddings,
-        pinecone_api_key=settings.PINECONE_API_KEY
-    )
+    store = get_vector_store()
+    vectors = embeddings.embed(texts)
+    store.upsert([
+        {
+            "id": f"sample-{i}",
+            "values": vector.tolist(),
+            "metadata": {**metadata, TEXT_KEY: text}
+        }
+        for i, (text, metadata, vector) in enumerate(zip(texts, metadatas, vectors))
+    ])
+    store.flush()
+
+    # Keyword index over the same chunk ids, for hybrid retrieval
+    lexical = get_lexical_index()
+    lexical.update({f"sample-{i}": text for i, text in enumerate(texts)})
+    lexical.save()
 
-    vectorstore.add_texts(texts=texts, metadatas=metadatas)
+    # Running API workers evict cached answers built from the previous text
+    get_refresh_queue().mark_refreshed([f"sample-{i}" for i in range(len(texts))])
     
     print("✅ Sample data ingested successfully.")
 
@@ -0,0 +1,145 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure backend directory is in path to import app
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(BACKEND_DIR)
+
+DEFAULT_QUERIES = [
+    "What is IPSec?",
+    "What is encryption?",
+    "What is a network protocol?",
+    "Explain TCP/IP",
+    "What is the OSI model?"
+]
+
+
+def wait_until_ready(base_url: str, timeout: float) -> bool:
+    """Poll /ready until every agent is warm."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/v1/ready", timeout=5) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(1)
+    return False
+
+
+def send_query(url: str, query: str) -> float:
+    """POST one query; returns latency in seconds (raises on failure)."""
+    body = json.dumps({"query": query}).encode("utf-8")
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=300) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def run_load(base_url: str, queries: list, concurrency: int, duration: float) -> dict:
+    """Keep `concurrency` requests in flight for `duration` seconds."""
+    url = f"{base_url}/api/v1/query"
+    latencies = []
+    errors = 0
+    deadline = time.time() + duration
+
+    def worker(worker_id: int):
+        nonlocal errors
+        i = worker_id
+        while time.time() < deadline:
+            try:
+                latencies.append(send_query(url, queries[i % len(queries)]))
+            except Exception:
+                errors += 1
+            i += concurrency
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1) if latencies else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load-test /api/v1/query at several worker counts to show throughput scaling."
+    )
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated API_WORKERS values")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load per worker count")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--output", default=None, help="Optional JSON results file")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = []
+
+    for workers in [int(w) for w in args.workers.split(",")]:
+        print(f"\nStarting server with {workers} worker(s)...")
+        env = {
+            **os.environ,
+            "API_WORKERS": str(workers),
+            "API_PORT": str(args.port),
+            "API_HOST": "127.0.0.1",
+            # Measure the pipeline, not the query cache
+            "QUERY_CACHE_ENABLED": "false"
+        }
+        server = subprocess.Popen([sys.executable, "main.py"], cwd=BACKEND_DIR, env=env)
+        try:
+            if not wait_until_ready(base_url, args.ready_timeout):
+                print("Server did not become ready; skipping")
+                continue
+            # With several workers, /ready may be answered by an already-warm
+            # one; give the others a moment to finish warming
+            time.sleep(2 * workers)
+
+            result = run_load(base_url, DEFAULT_QUERIES, args.concurrency, args.duration)
+            result.update({"workers": workers, "concurrency": args.concurrency})
+            results.append(result)
+            print(
+                f"Workers: {workers} | Throughput: {result['throughput_rps']} req/s | "
+                f"p50: {result['p50_ms']}ms | p95: {result['p95_ms']}ms | Errors: {result['errors']}"
+            )
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+
+    print("\nWorkers | req/s   | p50 ms  | p95 ms  | scaling")
+    base = results[0]["throughput_rps"] if results else 0
+    for result in results:
+        scaling = f"{result['throughput_rps'] / base:.2f}x" if base else "N/A"
+        print(
+            f"{result['workers']:>7} | {result['throughput_rps']:>7} | "
+            f"{result['p50_ms']!s:>7} | {result['p95_ms']!s:>7} | {scaling}"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
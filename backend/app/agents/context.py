@@ -0,0 +1,184 @@
+"""
+Context Builder for AXIOMAI.
+
+Turns retrieved chunks into the generator's prompt context:
+  1. Adjacent chunks from the same source/page are merged, with the
+     splitter's overlap (CHUNK_OVERLAP in app/rag/sources.py) removed.
+  2. Near-duplicate chunks (e.g. the same passage ingested twice) are dropped.
+  3. What remains is packed, best-ranked first, into a token budget.
+
+Token counts are estimated locally (~4 characters per token for English
+text with Gemini's tokenizer), so packing costs no API round-trip.
+"""
+import math
+import re
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+
+CHARS_PER_TOKEN = 4
+
+# Overlaps shorter than this are treated as coincidence, not splitter overlap
+MIN_OVERLAP_CHARS = 20
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of `text`."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right`."""
+    for size in range(min(len(left), len(right)), MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _rank_key(doc: Dict[str, Any]) -> Tuple[bool, float]:
+    """Cross-encoder score when the chunk was reranked, else retrieval score."""
+    if "rerank_score" in doc:
+        return True, doc["rerank_score"]
+    return False, doc.get("score", 0.0)
+
+
+def _block(doc: Dict[str, Any]) -> Dict[str, Any]:
+    chunk_id = _chunk_index(doc)
+    return {
+        "content": doc.get("content", ""),
+        "metadata": doc.get("metadata", {}),
+        "rank": _rank_key(doc),
+        "ids": [doc.get("id")],
+        "last_chunk_id": chunk_id
+    }
+
+
+def _chunk_index(doc: Dict[str, Any]) -> Optional[int]:
+    """Position within the page; stores may return it as int, float or str, or not at all."""
+    try:
+        return int(float(doc.get("metadata", {}).get("chunk_id")))
+    except (TypeError, ValueError):
+        return None
+
+
+def _merge_adjacent(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge consecutive chunks of the same source/page into single blocks."""
+    groups: Dict[Tuple[Any, Any], List[Dict[str, Any]]] = {}
+    for doc in docs:
+        metadata = doc.get("metadata", {})
+        groups.setdefault((metadata.get("source"), metadata.get("page")), []).append(doc)
+
+    blocks = []
+    for (_, page), members in groups.items():
+        if page is None:
+            # No position information: nothing is provably adjacent
+            blocks.extend(_block(doc) for doc in members)
+            continue
+
+        # Page order; chunks without a usable position go last, in retrieval order
+        members.sort(key=lambda d: (_chunk_index(d) is None, _chunk_index(d) or 0))
+        current = None
+        for doc in members:
+            content = doc.get("content", "")
+            chunk_id = _chunk_index(doc)
+            if current is not None:
+                overlap = _overlap(current["content"], content)
+                last = current["last_chunk_id"]
+                consecutive = chunk_id is not None and last is not None and chunk_id == last + 1
+                if overlap or consecutive:
+                    current["content"] += content[overlap:] if overlap else " " + content
+                    current["rank"] = max(current["rank"], _rank_key(doc))
+                    current["ids"].append(doc.get("id"))
+                    current["last_chunk_id"] = chunk_id
+                    continue
+                blocks.append(current)
+            current = _block(doc)
+        if current is not None:
+            blocks.append(current)
+    return blocks
+
+
+def _drop_near_duplicates(blocks: List[Dict[str, Any]], threshold: float) -> List[Dict[str, Any]]:
+    """Keep the better-ranked of any two blocks whose shingle sets mostly coincide."""
+    kept = []
+    kept_shingles = []
+    for block in sorted(blocks, key=lambda b: b["rank"], reverse=True):
+        shingles = _shingles(block["content"])
+        duplicate = False
+        for other in kept_shingles:
+            common = len(shingles & other)
+            # Containment catches a short chunk repeated inside a longer block
+            if shingles and common / min(len(shingles), len(other) or 1) >= threshold:
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(block)
+            kept_shingles.append(shingles)
+    return kept
+
+
+def build_context(
+    docs: List[Dict[str, Any]],
+    token_budget: int = None,
+    dedup_threshold: float = None
+) -> Dict[str, Any]:
+    """
+    Build the prompt context for a set of retrieved chunks.
+
+    Args:
+        docs: Retrieved chunks ({"id", "content", "metadata", "score"})
+        token_budget: Max context tokens (default: settings.CONTEXT_TOKEN_BUDGET)
+        dedup_threshold: Shingle overlap above which a block is a near-duplicate
+                         (default: settings.CONTEXT_DEDUP_THRESHOLD)
+
+    Returns:
+        {
+            "text": str,                 # formatted context for the prompt
+            "chunk_ids": List[str],      # chunks that made it into the context
+            "raw_tokens": int,           # all chunks concatenated verbatim
+            "tokens": int,               # packed context
+            "chunks_in": int,
+            "blocks_packed": int
+        }
+    """
+    token_budget = token_budget or settings.CONTEXT_TOKEN_BUDGET
+    dedup_threshold = dedup_threshold or settings.CONTEXT_DEDUP_THRESHOLD
+
+    blocks = _drop_near_duplicates(_merge_adjacent(docs), dedup_threshold)
+
+    sections = []
+    chunk_ids = []
+    used = 0
+    for block in blocks:
+        source = block["metadata"].get("source", "Unknown")
+        section = f"Chunk {len(sections) + 1} [Source: {source}]:\n{block['content']}\n"
+        cost = estimate_tokens(section)
+        if used + cost > token_budget:
+            if sections:
+                # Skip it; a smaller, lower-ranked block may still fit
+                continue
+            # Never send an empty context: truncate the best block instead
+            section = section[:token_budget * CHARS_PER_TOKEN]
+            cost = estimate_tokens(section)
+        sections.append(section)
+        chunk_ids.extend(block["ids"])
+        used += cost
+
+    text = "\n".join(sections)
+    return {
+        "text": text,
+        "chunk_ids": chunk_ids,
+        "raw_tokens": sum(estimate_tokens(doc.get("content", "")) for doc in docs),
+        "tokens": estimate_tokens(text),
+        "chunks_in": len(docs),
+        "blocks_packed": len(sections)
+    }
@@ -1,11 +1,23 @@
-from typing import List, Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
+import asyncio
+import contextlib
+import contextvars
+from typing import List, Dict, Any, AsyncIterator, Optional
 from app.core.config import settings
-from app.core.prompts import get_generator_prompt
+from app.core.prompts import GENERATOR_SYSTEM_PROMPT, get_generator_prompt
+from app.agents.context import build_context, estimate_tokens
+from app.core.tracing import record_llm_tokens
 from langchain_core.output_parsers import StrOutputParser
 
+# Set by batch runs (app/orchestration/batch.py) to cap concurrent LLM calls
+llm_slots: contextvars.ContextVar[Optional[asyncio.Semaphore]] = contextvars.ContextVar(
+    "axiomai_llm_slots", default=None
+)
+
 class LLMGeneratorAgent:
     def __init__(self):
+        # Deferred: langchain_google_genai is slow to import
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         self.llm = ChatGoogleGenerativeAI(
             model=settings.LLM_MODEL_NAME,
             google_api_key=settings.GOOGLE_API_KEY,
@@ -14,30 +26,77 @@ class LLMGeneratorAgent:
         self.prompt = get_generator_prompt()
         self.chain = self.prompt | self.llm | StrOutputParser()
 
-    def _format_docs(self, docs: List[Dict[str, Any]]) -> str:
-        formatted_docs = []
-        for i, doc in enumerate(docs):
-            content = doc.get("content", "")
-            metadata = doc.get("metadata", {})
-            source = metadata.get("source", "Unknown")
-            # Assuming 'id' or similar might be in metadata, but for now using source filename or index
-            # If doc has a specific ID in metadata, use that. Otherwise, try to use source.
-            source_id = source 
-            
-            formatted_docs.append(f"Chunk {i+1} [Source: {source_id}]:\n{content}\n")
-        return "\n".join(formatted_docs)
-
-    def generate(self, query: str, retrieved_docs: List[Dict[str, Any]]) -> str:
+    def build_context(self, query: str, docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Pack retrieved chunks into the prompt context (see app/agents/context.py).
+        Adds "prompt_tokens": the estimated size of the whole prompt.
+        """
+        context = build_context(docs)
+        context["prompt_tokens"] = (
+            estimate_tokens(GENERATOR_SYSTEM_PROMPT) + context["tokens"] + estimate_tokens(query)
+        )
+        return context
+
+    def generate(self, query: str, retrieved_docs: List[Dict[str, Any]], context: Dict[str, Any] = None) -> str:
         if not retrieved_docs:
             return "I cannot answer the question because no relevant documents were found."
 
-        context = self._format_docs(retrieved_docs)
+        context = context or self.build_context(query, retrieved_docs)
         
         try:
             response = self.chain.invoke({
-                "context": context,
+                "context": context["text"],
                 "question": query
             })
+            record_llm_tokens(context["prompt_tokens"], estimate_tokens(response))
+            return response
+        except Exception as e:
+            return f"Error generating answer: {str(e)}"
+
+    async def agenerate(
+        self,
+        query: str,
+        retrieved_docs: List[Dict[str, Any]],
+        context: Dict[str, Any] = None
+    ) -> str:
+        if not retrieved_docs:
+            return "I cannot answer the question because no relevant documents were found."
+
+        context = context or self.build_context(query, retrieved_docs)
+        
+        slots = llm_slots.get()
+        try:
+            async with slots if slots is not None else contextlib.nullcontext():
+                response = await self.chain.ainvoke({
+                    "context": context["text"],
+                    "question": query
+                })
+            record_llm_tokens(context["prompt_tokens"], estimate_tokens(response))
             return response
         except Exception as e:
             return f"Error generating answer: {str(e)}"
+
+    async def astream(
+        self,
+        query: str,
+        retrieved_docs: List[Dict[str, Any]],
+        context: Dict[str, Any] = None
+    ) -> AsyncIterator[str]:
+        """Yield answer tokens as they arrive from the LLM."""
+        if not retrieved_docs:
+            yield "I cannot answer the question because no relevant documents were found."
+            return
+
+        context = context or self.build_context(query, retrieved_docs)
+        
+        output = []
+        try:
+            async for token in self.chain.astream({
+                "context": context["text"],
+                "question": query
+            }):
+                output.append(token)
+                yield token
+            record_llm_tokens(context["prompt_tokens"], estimate_tokens("".join(output)))
+        except Exception as e:
+            yield f"Error generating answer: {str(e)}"
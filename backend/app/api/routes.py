@@ -3,10 +3,16 @@ AXIOMAI API Routes.
 
 Thin API layer — all business logic lives in the orchestration graph.
 """
-from fastapi import APIRouter, HTTPException
+import json
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-from app.orchestration.graph import run_axiomai
+from app.core.config import settings
+from app.core.metrics import render_metrics
+from app.orchestration.agents import registry
+from app.orchestration.batch import arun_batch
+from app.orchestration.graph import arun_axiomai, astream_axiomai, query_cache
 
 router = APIRouter()
 
@@ -14,6 +20,8 @@ router = APIRouter()
 
 class QueryRequest(BaseModel):
     query: str
+    # Include per-node timing in the response (always on with TRACE_IN_RESPONSE)
+    trace: bool = False
 
 class QueryResponse(BaseModel):
     answer: str
@@ -22,77 +30,248 @@ class QueryResponse(BaseModel):
     claims: List[Dict[str, Any]] = []
     citations: List[Dict[str, Any]] = []
     reasoning_log: List[str] = []
+    cached: bool = False
+    # Changed chunks were queued for background re-indexing (REFRESH_QUEUE_ENABLED, see
+    # /refresh/queue): the answer was not regenerated from the refreshed content
+    refresh_scheduled: bool = False
+    request_id: Optional[str] = None
+    # Estimated prompt size: context/prompt tokens after packing vs. raw chunks
+    token_usage: Dict[str, Any] = {}
+    trace: Optional[Dict[str, Any]] = None
+
+class BatchItem(BaseModel):
+    # Defaults to the item's position in the request
+    id: Optional[str] = None
+    query: str
+
+class BatchQueryRequest(BaseModel):
+    items: List[BatchItem]
+    trace: bool = False
 
 class HealthResponse(BaseModel):
     status: str
     service: str
 
-# ── Routes ──
+# ── Response Builders ──
 
-@router.post("/query", response_model=QueryResponse)
-async def query(request: QueryRequest):
-    """Execute the full AXIOMAI agentic RAG pipeline."""
-    try:
-        result = run_axiomai(request.query)
-        
-        val = result.get("validation", {})
-        hal = result.get("hallucination", {})
-        docs = result.get("documents", [])
+def _answer_status(val: Dict[str, Any], hal: Dict[str, Any]) -> str:
+    if val.get("decision") == "trusted":
+        return "trusted"
+    elif hal.get("hallucination"):
+        return "hallucinated"
+    return "low_confidence"
+
+def _build_citations(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    citations = []
+    for doc in docs:
+        citations.append({
+            "source": doc.get("metadata", {}).get("source", "Unknown"),
+            "similarity": doc.get("score", 0.0), # Assuming score is here
+            "snippet": doc.get("content", "")[:250] + "..." if len(doc.get("content", "")) > 250 else doc.get("content", "")
+        })
+    return citations
+
+def _reasoning_log(result: Dict[str, Any]) -> List[str]:
+    """One line per executed node, from the request trace."""
+    val = result.get("validation", {})
+    hal = result.get("hallucination", {})
+    context = result.get("context", {})
+    details = {
+        "retrieve": f"{len(result.get('documents', []))} documents",
+        "generate": f"context {context.get('tokens', 0)} tokens (from {context.get('raw_tokens', 0)} raw)",
+        "validate": f"trust score {val.get('trust_score', 0)}",
+        "hallucination": f"hallucination detected: {hal.get('hallucination', False)}",
+        "hallucination_cancelled": "claim check cancelled (answer trusted)",
+        "refresh": (
+            "re-indexing scheduled" if result.get("refresh", {}).get("scheduled")
+            else f"{result.get('refresh', {}).get('updated_documents', 0)} chunks re-indexed"
+        ),
+        "watch": (
+            f"{len(result.get('freshness', {}).get('changed', []))} changed, "
+            f"{len(result.get('freshness', {}).get('outdated', []))} outdated chunks"
+        ),
+    }
+    logs = []
+    for span in result.get("trace", {}).get("nodes", []):
+        line = f"[{span['node'].upper()}] {span['wall_ms']}ms"
+        if span["node"] in details:
+            line += f" — {details[span['node']]}"
+        logs.append(line)
+    if result.get("cache", "miss") != "miss":
+        logs.append(f"[CACHE] {result['cache']} hit")
+    return logs
+
+def _build_response(result: Dict[str, Any], include_trace: bool = False) -> QueryResponse:
+    """Shape a final pipeline state into the API response."""
+    val = result.get("validation", {})
+    hal = result.get("hallucination", {})
+    docs = result.get("documents", [])
+    context = result.get("context", {})
+    
+    status = _answer_status(val, hal)
+    citations = _build_citations(docs)
         
-        status = "low_confidence"
-        decision = val.get("decision")
-        if decision == "trusted":
-            status = "trusted"
-        elif hal.get("hallucination"):
-            status = "hallucinated"
-            
-        citations = []
-        for doc in docs:
-            citations.append({
-                "source": doc.get("metadata", {}).get("source", "Unknown"),
-                "similarity": doc.get("score", 0.0), # Assuming score is here
-                "snippet": doc.get("content", "")[:250] + "..." if len(doc.get("content", "")) > 250 else doc.get("content", "")
+    # Parse claims
+    claims_out = []
+    if hal.get("claims"):
+        # Real per-claim evidence from the hallucination detector
+        for claim in hal["claims"]:
+            best_chunk = claim.get("best_chunk")
+            source = None
+            if best_chunk is not None and best_chunk < len(docs):
+                source = docs[best_chunk].get("metadata", {}).get("source", "Unknown")
+            claims_out.append({
+                "text": claim["text"],
+                "status": "supported" if claim["supported"] else "hallucinated",
+                "evidence_count": claim["evidence_count"],
+                "similarity": claim["score"],
+                "source": source
             })
-            
-        # Parse claims
-        claims_out = []
-        # If the answer is split into claims, we can mock the supported ones for the UI
-        # Or just show the unsupported ones. We'll show unsupported as hallucinated,
-        # and if the answer is trusted, we just show a generic 'supported' claim.
-        if hal.get("unsupported_claims"):
-            for claim in hal.get("unsupported_claims"):
-                claims_out.append({
-                    "text": claim,
-                    "status": "hallucinated",
-                    "evidence_count": 0
-                })
-        else:
-            # Provide a generic supported claim derived from the answer if it's trusted
+    elif hal.get("unsupported_claims"):
+        for claim in hal.get("unsupported_claims"):
             claims_out.append({
-                "text": result.get("answer", ""),
-                "status": "supported" if status == "trusted" else "low_confidence",
-                "evidence_count": len(docs)
+                "text": claim,
+                "status": "hallucinated",
+                "evidence_count": 0
             })
-            
-        # Build reasoning log
-        logs = [
-            f"[RETRIEVER] Retrieved {len(docs)} documents dynamically.",
-            f"[VALIDATOR] Trust score computed: {val.get('trust_score', 0)}",
-            f"[VERIFIER] Hallucination detected: {hal.get('hallucination', False)}"
-        ]
-
-        return QueryResponse(
-            answer=result.get("answer", ""),
-            trust_score=val.get("trust_score"),
-            status=status,
-            claims=claims_out,
-            citations=citations,
-            reasoning_log=logs
-        )
+    else:
+        # Claims are only verified on the untrusted path; for a trusted
+        # answer show a generic supported claim derived from the answer
+        claims_out.append({
+            "text": result.get("answer", ""),
+            "status": "supported" if status == "trusted" else "low_confidence",
+            "evidence_count": len(docs)
+        })
+        
+    # Build reasoning log from what actually ran
+    logs = _reasoning_log(result)
+
+    return QueryResponse(
+        answer=result.get("answer", ""),
+        trust_score=val.get("trust_score"),
+        status=status,
+        claims=claims_out,
+        citations=citations,
+        reasoning_log=logs,
+        cached=result.get("cache", "miss") != "miss",
+        refresh_scheduled=result.get("refresh", {}).get("scheduled", False),
+        request_id=result.get("request_id"),
+        token_usage={
+            key: context[key]
+            for key in ("raw_tokens", "tokens", "prompt_tokens", "chunks_in", "blocks_packed")
+            if key in context
+        },
+        trace=result.get("trace") if include_trace else None
+    )
+
+def _sse(event: str, data: Any) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+# ── Routes ──
+
+@router.post("/query", response_model=QueryResponse)
+async def query(request: QueryRequest, x_request_id: Optional[str] = Header(None)):
+    """Execute the full AXIOMAI agentic RAG pipeline."""
+    try:
+        result = await arun_axiomai(request.query, request_id=x_request_id)
+        return _build_response(result, include_trace=request.trace or settings.TRACE_IN_RESPONSE)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/query/stream")
+async def query_stream(request: QueryRequest, x_request_id: Optional[str] = Header(None)):
+    """
+    Execute the pipeline and stream progress as server-sent events:
+    `retrieval` (citations), `token` (answer text as generated),
+    `validation`, `hallucination` (untrusted answers only) and `done`
+    (the same payload `/query` returns).
+    """
+    async def event_stream():
+        try:
+            async for event, payload in astream_axiomai(request.query, request_id=x_request_id):
+                if event == "retrieval":
+                    yield _sse("retrieval", {"citations": _build_citations(payload)})
+                elif event == "token":
+                    yield _sse("token", {"text": payload})
+                elif event == "validation":
+                    yield _sse("validation", payload)
+                elif event == "hallucination":
+                    yield _sse("hallucination", payload)
+                elif event == "done":
+                    response = _build_response(payload, include_trace=request.trace or settings.TRACE_IN_RESPONSE)
+                    yield _sse("done", response.model_dump())
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/query/batch")
+async def query_batch(request: BatchQueryRequest):
+    """
+    Answer many questions and stream one JSON line per item as it completes
+    (application/x-ndjson), each with its id and timings. Items that fail
+    carry an "error" field; resume by resubmitting the ids without a result.
+    """
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BATCH_MAX_ITEMS} items per request; split the input"
+        )
+    items = [
+        {"id": item.id if item.id is not None else str(i), "query": item.query}
+        for i, item in enumerate(request.items)
+    ]
+
+    async def lines():
+        async for record in arun_batch(items, include_trace=request.trace or settings.TRACE_IN_RESPONSE):
+            yield json.dumps(record, default=str) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Query result cache hit/miss counters."""
+    return query_cache.stats()
+
+@router.get("/cache/embeddings")
+async def embedding_cache_stats():
+    """Persistent embedding cache size and hit rate (this worker's lookups)."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return {"enabled": False}
+    from app.rag.embedding_cache import get_embedding_cache
+    return {"enabled": True, **get_embedding_cache().stats()}
+
+@router.get("/refresh/queue")
+async def refresh_queue_stats():
+    """Background refresh queue depth, failures and job latency."""
+    if not settings.REFRESH_QUEUE_ENABLED:
+        return {"enabled": False}
+    from app.rag.refresh_queue import get_refresh_queue
+    return {"enabled": True, **get_refresh_queue().stats()}
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Per-node latency, embedding batch, vector store and LLM token metrics (Prometheus text format)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @router.get("/health", response_model=HealthResponse)
 async def health():
     """Service health check."""
     return HealthResponse(status="ok", service="AXIOMAI")
+
+@router.get("/ready")
+async def ready():
+    """Readiness check: 200 once every agent is warm, 503 until then."""
+    return JSONResponse(
+        status_code=200 if registry.ready else 503,
+        content={"ready": registry.ready, "components": registry.status()}
+    )
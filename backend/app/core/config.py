@@ -1,14 +1,104 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# backend/ — local data lives under it whatever the working directory
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
 class Config:
+    # Local indexes, caches and queues (each path below can also be set on its own)
+    DATA_DIR = os.getenv("DATA_DIR", str(BACKEND_DIR / "data"))
+    # Ingestion manifests: indexed chunk ids and content hashes per source
+    INGEST_MANIFEST_DIR = os.getenv("INGEST_MANIFEST_DIR", os.path.join(DATA_DIR, "ingest"))
+    # Vector store backend: "pinecone" or "local"
+    VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone")
+    LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", os.path.join(DATA_DIR, "vector_index"))
+    LOCAL_INDEX_SEARCH = os.getenv("LOCAL_INDEX_SEARCH", "exact")  # "exact" or "ivf"
+    LOCAL_INDEX_NPROBE = int(os.getenv("LOCAL_INDEX_NPROBE", "16"))
+    LOCAL_INDEX_IVF_MIN_VECTORS = int(os.getenv("LOCAL_INDEX_IVF_MIN_VECTORS", "20000"))
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     PINECONE_INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
     EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "BAAI/bge-large-en-v1.5")
+    # Embedding inference: "torch" (fp32), "int8" (dynamic quantization) or "onnx"
+    # ("onnx" needs onnxruntime, optimum and sentence-transformers>=3.2: requirements-onnx.txt)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+    EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE")  # e.g. onnx/model_qint8_avx512_vnni.onnx
+    # Intra-op threads per worker; 0 = CPU cores / API_WORKERS
+    EMBEDDING_NUM_THREADS = int(os.getenv("EMBEDDING_NUM_THREADS", "0"))
+    # Cross-request micro-batching of embedding forward passes
+    EMBEDDING_BATCHING_ENABLED = os.getenv("EMBEDDING_BATCHING_ENABLED", "true").lower() == "true"
+    EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+    EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
     TOP_K = int(os.getenv("TOP_K", "5"))
+    # Persistent embedding cache of chunk vectors: (model, content hash) → vector
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(DATA_DIR, "embedding_cache.sqlite3"))
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+    # Hybrid retrieval: BM25 keyword index fused with dense results (RRF)
+    HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+    LEXICAL_INDEX_DIR = os.getenv("LEXICAL_INDEX_DIR", os.path.join(DATA_DIR, "lexical_index"))
+    HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+    # Cross-encoder reranking between retrieval and generation (opt-in: loads a second
+    # model per worker and adds CPU latency to every query)
+    RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANKER_MODEL_NAME = os.getenv("RERANKER_MODEL_NAME", "BAAI/bge-reranker-base")
+    RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+    RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "4"))
+    RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "8"))
+    RERANK_MAX_LATENCY_MS = float(os.getenv("RERANK_MAX_LATENCY_MS", "300"))
+    # Run validation and the claim check concurrently (graph "verify" node). Opt-in: the
+    # claim check may already have embedded claims for answers that turn out trusted
+    PARALLEL_VERIFY = os.getenv("PARALLEL_VERIFY", "false").lower() == "true"
+    # Prompt context packing (app/agents/context.py)
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))
+    CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.8"))
+    # Return per-node timing in every API response (requests can also ask with "trace": true)
+    TRACE_IN_RESPONSE = os.getenv("TRACE_IN_RESPONSE", "false").lower() == "true"
+    # Logging (app/core/log.py)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" or "text"
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
     LLM_MODEL_NAME = os.getenv("LLM_MODEL_NAME", "gemini-1.5-flash")
+    # API server; workers > 1 pre-forks from a parent holding the model (Linux)
+    API_HOST = os.getenv("API_HOST", "0.0.0.0")
+    API_PORT = int(os.getenv("API_PORT", "8000"))
+    API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+    # Build agents in a background task at API startup (otherwise on first request)
+    WARM_ON_STARTUP = os.getenv("WARM_ON_STARTUP", "true").lower() == "true"
+    # Bounded thread pools used by the async pipeline
+    CPU_WORKERS = int(os.getenv("CPU_WORKERS", "2"))
+    IO_WORKERS = int(os.getenv("IO_WORKERS", "16"))
+    # Batched embedding and concurrent upserts for knowledge refresh
+    EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+    UPSERT_CONCURRENCY = int(os.getenv("UPSERT_CONCURRENCY", "4"))
+    UPSERT_MAX_RETRIES = int(os.getenv("UPSERT_MAX_RETRIES", "3"))
+    # Background refresh queue (app/rag/refresh_queue.py). Off (default): changed chunks are
+    # re-indexed inside the request and the question is retrieved and answered again.
+    # On: they are queued and the request ends with the current answer and
+    # refresh_scheduled=true; the next request for it sees the new content.
+    REFRESH_QUEUE_ENABLED = os.getenv("REFRESH_QUEUE_ENABLED", "false").lower() == "true"
+    # Also holds the log of re-indexed chunks every worker follows to invalidate cached answers
+    REFRESH_QUEUE_PATH = os.getenv("REFRESH_QUEUE_PATH", os.path.join(DATA_DIR, "refresh_queue.sqlite3"))
+    REFRESH_QUEUE_BATCH_SIZE = int(os.getenv("REFRESH_QUEUE_BATCH_SIZE", "32"))
+    REFRESH_POLL_SECONDS = float(os.getenv("REFRESH_POLL_SECONDS", "5"))
+    REFRESH_LEASE_SECONDS = float(os.getenv("REFRESH_LEASE_SECONDS", "300"))
+    REFRESH_MAX_ATTEMPTS = int(os.getenv("REFRESH_MAX_ATTEMPTS", "5"))
+    REFRESH_RETRY_BASE_SECONDS = float(os.getenv("REFRESH_RETRY_BASE_SECONDS", "30"))
+    REFRESH_RETRY_MAX_SECONDS = float(os.getenv("REFRESH_RETRY_MAX_SECONDS", "900"))
+    # Query result cache (semantic tier disabled when distance is 0)
+    QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+    QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024"))
+    QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600"))
+    # Semantic tier is opt-in: a paraphrase within this cosine distance reuses another
+    # query's answer, which is wrong when a small edit changes the question ("not",
+    # another entity or year). 0 disables it; try ~0.02-0.05 only for FAQ-style traffic.
+    QUERY_CACHE_SEMANTIC_DISTANCE = float(os.getenv("QUERY_CACHE_SEMANTIC_DISTANCE", "0.0"))
+    # Bulk question answering (/query/batch, Scripts/batch_query.py)
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+    BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+    BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "256"))
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
 
 settings = Config()
@@ -0,0 +1,62 @@
+"""
+Bounded executors for the async pipeline.
+
+CPU-bound work (embedding forward passes, similarity math) and blocking
+network clients (Pinecone) are pushed off the event loop onto separate,
+size-limited thread pools so one slow request cannot stall the others.
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from app.core.config import settings
+
+_cpu_executor: ThreadPoolExecutor = None
+_io_executor: ThreadPoolExecutor = None
+_lock = threading.Lock()
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Pool for CPU-bound work, sized by settings.CPU_WORKERS."""
+    global _cpu_executor
+    if _cpu_executor is None:
+        with _lock:
+            if _cpu_executor is None:
+                _cpu_executor = ThreadPoolExecutor(
+                    max_workers=settings.CPU_WORKERS,
+                    thread_name_prefix="axiomai-cpu"
+                )
+    return _cpu_executor
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Pool for blocking network calls, sized by settings.IO_WORKERS."""
+    global _io_executor
+    if _io_executor is None:
+        with _lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=settings.IO_WORKERS,
+                    thread_name_prefix="axiomai-io"
+                )
+    return _io_executor
+
+
+async def _run_in(executor: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    # Copy context so context variables follow the work into the thread
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(executor, call)
+
+
+async def run_cpu(func: Callable, *args, **kwargs) -> Any:
+    """Run a CPU-bound callable on the bounded CPU pool."""
+    return await _run_in(get_cpu_executor(), func, *args, **kwargs)
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking I/O callable on the bounded I/O pool."""
+    return await _run_in(get_io_executor(), func, *args, **kwargs)
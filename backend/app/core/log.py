@@ -0,0 +1,129 @@
+"""
+Structured, non-blocking logging for AXIOMAI.
+
+Loggers under "axiomai" hand records to an in-memory queue
+(`QueueHandler`); a background `QueueListener` thread formats them and
+writes to stdout, so request handlers never wait on console I/O. Each
+record carries the request's correlation id from a context variable,
+which LangGraph tasks and run_cpu/run_io carry along, so lines from
+concurrent requests can be told apart.
+
+Settings:
+    LOG_LEVEL   — DEBUG, INFO (default), WARNING, ...
+    LOG_FORMAT  — "json" (default, one object per line) or "text"
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+ROOT_LOGGER = "axiomai"
+
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("axiomai_request_id", default="-")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class _RequestIdFilter(logging.Filter):
+    """Stamp the caller's correlation id on the record (runs in the calling thread)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra={"fields": {...}}` adds structured fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "pid": record.process,
+            "msg": record.getMessage()
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " | " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def _start_listener() -> None:
+    """(Re)start the queue listener for this process."""
+    global _listener
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.addFilter(_RequestIdFilter())
+    logger.addHandler(handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+    _listener.start()
+
+
+def _stop_listener() -> None:
+    """Drain and stop the listener thread (before fork and at exit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def setup_logging() -> None:
+    """Install the queue-backed handler once per process. Safe to call repeatedly."""
+    with _setup_lock:
+        logger = logging.getLogger(ROOT_LOGGER)
+        if getattr(logger, "_axiomai_configured", False):
+            return
+        logger.setLevel(settings.LOG_LEVEL.upper())
+        logger.propagate = False
+        _start_listener()
+        atexit.register(_stop_listener)
+        if hasattr(os, "register_at_fork"):
+            # Never fork with the listener thread running; each child gets its own
+            os.register_at_fork(
+                before=_stop_listener,
+                after_in_parent=_start_listener,
+                after_in_child=_start_listener
+            )
+        logger._axiomai_configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the "axiomai" hierarchy, e.g. get_logger("graph")."""
+    setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,109 @@
+"""
+Process memory reporting for AXIOMAI.
+
+Used at API startup to show the per-worker footprint of the loaded
+models, so we can size how many workers fit on a host.
+"""
+import sys
+from typing import Dict, Any
+
+from app.core.log import get_logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = get_logger("memory")
+
+
+def _current_rss_mb() -> float:
+    """Current resident set size in MB (Linux /proc, 0.0 if unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _smaps_rollup_mb() -> Dict[str, float]:
+    """
+    Proportional (Pss) and private memory in MB from /proc/self/smaps_rollup.
+    Unlike RSS, these don't count pages shared copy-on-write with other
+    workers in full. Empty if unavailable.
+    """
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] in ("Pss:", "Private_Clean:", "Private_Dirty:"):
+                    fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    except OSError:
+        return {}
+    return {
+        "pss_mb": fields.get("Pss", 0.0),
+        "private_mb": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0)
+    }
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size in MB (0.0 if unavailable)."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _model_size_mb(model) -> float:
+    """Size of a torch module's parameters and buffers in MB."""
+    total = 0
+    for tensor in list(model.parameters()) + list(model.buffers()):
+        total += tensor.numel() * tensor.element_size()
+    return total / (1024 * 1024)
+
+
+def memory_report() -> Dict[str, Any]:
+    """
+    Collect a snapshot of this worker's memory usage.
+
+    Returns:
+        {
+            "rss_mb": float,
+            "pss_mb": float,       # Linux only
+            "private_mb": float,   # Linux only
+            "peak_rss_mb": float,
+            "embedding_model": str | None,
+            "embedding_model_mb": float
+        }
+    """
+    # Imported here so reporting never forces a model load
+    from app.rag import embeddings
+
+    report = {
+        "rss_mb": round(_current_rss_mb(), 1),
+        **{key: round(value, 1) for key, value in _smaps_rollup_mb().items()},
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "embedding_model": None,
+        "embedding_model_mb": 0.0
+    }
+
+    service = embeddings._service
+    if service is not None:
+        report["embedding_model"] = service.model_name
+        report["embedding_model_mb"] = round(_model_size_mb(service.model), 1)
+
+    return report
+
+
+def log_memory_report() -> Dict[str, Any]:
+    """Log the memory report for this worker and return it."""
+    report = memory_report()
+    logger.info("memory report", extra={"fields": report})
+    return report
@@ -0,0 +1,124 @@
+"""
+Prometheus-style metrics for AXIOMAI.
+
+A small in-process registry of counters and histograms rendered in the
+Prometheus text exposition format at /metrics, without adding a client
+library dependency. With pre-forked workers each worker keeps its own
+registry; scrape through the load balancer and aggregate with sum().
+"""
+import threading
+from typing import Dict, List, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192)
+JOB_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+
+def _label_text(labelnames: Tuple[str, ...], labelvalues: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels → (per-bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (bucket_counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    labels = _label_text(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = _label_text(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {count}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "axiomai_request_duration_seconds", "End-to-end pipeline latency.", ("cache",)
+)
+NODE_SECONDS = Histogram(
+    "axiomai_node_duration_seconds", "Wall time per graph node.", ("node",)
+)
+EMBED_BATCH_SIZE = Histogram(
+    "axiomai_embedding_batch_size", "Texts per embedding forward pass.", buckets=SIZE_BUCKETS
+)
+LLM_TOKENS = Histogram(
+    "axiomai_llm_tokens", "Estimated LLM tokens per call.", ("kind",), buckets=TOKEN_BUCKETS
+)
+VECTOR_STORE_CALLS = Counter(
+    "axiomai_vector_store_calls_total", "Vector store round-trips.", ("op",)
+)
+RETRIES = Counter(
+    "axiomai_pipeline_retries_total", "Refresh → retrieve retry loops."
+)
+REFRESH_JOBS = Counter(
+    "axiomai_refresh_jobs_total", "Background refresh jobs by outcome.", ("outcome",)
+)
+REFRESH_JOB_SECONDS = Histogram(
+    "axiomai_refresh_job_latency_seconds", "Time from refresh request to re-indexed chunk.", buckets=JOB_BUCKETS
+)
+
+METRICS = (
+    REQUEST_SECONDS, NODE_SECONDS, EMBED_BATCH_SIZE, LLM_TOKENS, VECTOR_STORE_CALLS, RETRIES,
+    REFRESH_JOBS, REFRESH_JOB_SECONDS
+)
+
+
+def render_metrics() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,82 @@
+"""
+Pre-fork API server for AXIOMAI (Linux).
+
+The parent process loads the model weights once, freezes the GC so the
+loaded objects are never touched again, binds the listening socket and
+then forks the workers. Each worker runs its own uvicorn server on the
+shared socket and reads the same physical model pages copy-on-write, so
+adding workers scales throughput without multiplying model memory.
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+from app.core.log import get_logger
+
+logger = get_logger("server")
+
+
+def serve_prefork(app_path: str, host: str, port: int, workers: int) -> None:
+    """
+    Serve `app_path` (e.g. "main:app") with `workers` forked processes.
+
+    Falls back to a single uvicorn process where fork is unavailable.
+    """
+    if workers <= 1 or not hasattr(os, "fork") or not sys.platform.startswith("linux"):
+        uvicorn.run(app_path, host=host, port=port, reload=False, workers=1)
+        return
+
+    from app.orchestration.agents import registry
+
+    # Load weights before forking. Nothing here may start threads: torch's
+    # intra-op pool is created on the first forward pass, inside the workers.
+    started = time.perf_counter()
+    registry.preload_models()
+    config = uvicorn.Config(app_path, host=host, port=port, reload=False)
+    config.load()
+    gc.collect()
+    gc.freeze()
+    logger.info("models preloaded", extra={"fields": {
+        "preload_s": round(time.perf_counter() - started, 1),
+        "workers": workers
+    }})
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            # Worker: default signal handling, then serve on the shared socket
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            uvicorn.Server(config).run(sockets=[sock])
+            os._exit(0)
+        children.append(pid)
+
+    logger.info("workers started", extra={"fields": {"pids": children, "url": f"http://{host}:{port}"}})
+
+    def _shutdown(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    for pid in children:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    sock.close()
@@ -0,0 +1,49 @@
+"""
+API startup for AXIOMAI.
+
+The FastAPI lifespan starts serving immediately and warms the agents in a
+background task, so /health answers during the cold start and /ready
+reports which components are warm. Cold-start timings are logged.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.memory import log_memory_report
+
+# Reference point for cold-start timing
+PROCESS_START = time.perf_counter()
+
+logger = get_logger("startup")
+
+
+async def _warm_agents() -> None:
+    from app.orchestration.agents import registry
+
+    started = time.perf_counter()
+    await asyncio.to_thread(registry.warm)
+    logger.info("agents warm", extra={"fields": {
+        "warm_s": round(time.perf_counter() - started, 1),
+        "cold_start_s": round(time.perf_counter() - PROCESS_START, 1)
+    }})
+    # Per-worker footprint once the shared embedding model is loaded
+    log_memory_report()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("accepting requests", extra={"fields": {"after_s": round(time.perf_counter() - PROCESS_START, 1)}})
+    warm_task = asyncio.create_task(_warm_agents()) if settings.WARM_ON_STARTUP else None
+    # Follow chunks other processes re-index (and drain queued jobs with REFRESH_QUEUE_ENABLED)
+    from app.orchestration.graph import ensure_refresh_worker
+    ensure_refresh_worker()
+    yield
+    if warm_task is not None and not warm_task.done():
+        warm_task.cancel()
+    if settings.EMBEDDING_CACHE_ENABLED:
+        # Keep the recency of this worker's cache hits for eviction
+        from app.rag.embedding_cache import get_embedding_cache
+        get_embedding_cache().flush()
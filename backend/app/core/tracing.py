@@ -0,0 +1,139 @@
+"""
+Per-request tracing for the AXIOMAI pipeline.
+
+`start_trace()` opens a trace for one request; every graph node decorated
+with `@traced(name)` (or block wrapped in `span(name)`) records a span
+with its wall time and the work done inside it: embedding batch sizes,
+vector store round-trips and LLM token estimates, reported by the
+components via `record_*`. State lives in
+context variables, which run_cpu/run_io copy into worker threads, so
+components need no tracing arguments. Spans also feed the /metrics
+histograms (app/core/metrics.py).
+"""
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.core import metrics
+
+
+class Span:
+    """Timing and counters for one node execution."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.wall_ms = 0.0
+        self.embedding_batches: List[int] = []
+        self.vector_store_calls: Dict[str, int] = {}
+        self.llm_prompt_tokens = 0
+        self.llm_output_tokens = 0
+        self._lock = threading.Lock()
+
+    def to_dict(self) -> Dict[str, Any]:
+        span = {"node": self.name, "wall_ms": self.wall_ms}
+        if self.embedding_batches:
+            span["embedding_batches"] = self.embedding_batches
+        if self.vector_store_calls:
+            span["vector_store_calls"] = self.vector_store_calls
+        if self.llm_prompt_tokens or self.llm_output_tokens:
+            span["llm_tokens"] = {"prompt": self.llm_prompt_tokens, "output": self.llm_output_tokens}
+        return span
+
+
+class Trace:
+    """All spans for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+        self.retries = 0
+        self.total_ms = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total_ms": self.total_ms,
+            "retries": self.retries,
+            "nodes": [span.to_dict() for span in self.spans]
+        }
+
+
+_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("axiomai_trace", default=None)
+_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("axiomai_span", default=None)
+
+
+@contextmanager
+def start_trace() -> Iterator[Trace]:
+    """Trace everything run in this context until the block exits."""
+    trace = Trace()
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.total_ms = round((time.perf_counter() - trace.started) * 1000, 1)
+        _trace.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[Span]:
+    """Record one span: wall time plus whatever components report inside it."""
+    current = Span(name)
+    token = _span.set(current)
+    try:
+        yield current
+    finally:
+        _span.reset(token)
+        elapsed = time.perf_counter() - current.started
+        current.wall_ms = round(elapsed * 1000, 1)
+        metrics.NODE_SECONDS.observe(elapsed, node=name)
+        trace = _trace.get()
+        if trace is not None:
+            trace.spans.append(current)
+
+
+def traced(name: str) -> Callable:
+    """Decorator for async graph nodes: runs each call inside `span(name)`."""
+    def decorator(node: Callable) -> Callable:
+        @functools.wraps(node)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await node(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_embedding(batch_size: int) -> None:
+    """One embedding forward pass over `batch_size` texts."""
+    metrics.EMBED_BATCH_SIZE.observe(batch_size)
+    note_embedding(batch_size)
+
+
+def note_embedding(batch_size: int) -> None:
+    """Add a forward pass to the current span only (shared batches are observed once)."""
+    current = _span.get()
+    if current is not None:
+        with current._lock:
+            current.embedding_batches.append(batch_size)
+
+
+def record_vector_store_call(op: str) -> None:
+    """One vector store round-trip (query, fetch, upsert, delete)."""
+    metrics.VECTOR_STORE_CALLS.inc(op=op)
+    current = _span.get()
+    if current is not None:
+        with current._lock:
+            current.vector_store_calls[op] = current.vector_store_calls.get(op, 0) + 1
+
+
+def record_llm_tokens(prompt_tokens: int, output_tokens: int) -> None:
+    """Token estimates for one LLM call."""
+    metrics.LLM_TOKENS.observe(prompt_tokens, kind="prompt")
+    metrics.LLM_TOKENS.observe(output_tokens, kind="output")
+    current = _span.get()
+    if current is not None:
+        with current._lock:
+            current.llm_prompt_tokens += prompt_tokens
+            current.llm_output_tokens += output_tokens
@@ -10,6 +10,7 @@ import sys
 if sys.platform == "win32":
     sys.stdout.reconfigure(encoding="utf-8")
 
+from app.core.startup import lifespan
 from fastapi import FastAPI
 from app.api.routes import router
 
@@ -17,6 +18,7 @@ app = FastAPI(
     title="AXIOMAI API",
     description="Production-oriented Agentic RAG System",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.include_router(router)
@@ -0,0 +1,189 @@
+"""
+Lazy Agent Registry for AXIOMAI.
+
+Agents are constructed on first use (or warmed in the background at API
+startup) instead of at import time, so the API can accept requests —
+including /health — before any model or vector store client is loaded.
+Agent modules are imported inside the factories to keep heavy imports
+(torch, sentence_transformers, langchain_google_genai) off the import path.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from app.core.config import settings
+from app.core.executors import run_io
+from app.core.log import get_logger
+
+logger = get_logger("startup")
+
+
+def _embeddings():
+    from app.rag.embeddings import get_embedding_service
+    return get_embedding_service()
+
+
+def _retriever():
+    from app.rag.retriever import RetrieverAgent
+    return RetrieverAgent()
+
+
+def _reranker():
+    from app.rag.reranker import RerankerAgent
+    return RerankerAgent()
+
+
+def _generator():
+    from app.agents.generator import LLMGeneratorAgent
+    return LLMGeneratorAgent()
+
+
+def _validator():
+    from app.rag.validator import AnswerValidatorAgent
+    return AnswerValidatorAgent()
+
+
+def _hallucination_detector():
+    from app.rag.hallucination import HallucinationDetectorAgent
+    return HallucinationDetectorAgent()
+
+
+def _watcher():
+    from app.rag.sources import IngestedSources
+    from app.rag.watcher import DocumentWatcherAgent
+    return DocumentWatcherAgent(sources=IngestedSources())
+
+
+def _refresher():
+    from app.rag.refresh import KnowledgeRefreshAgent
+    return KnowledgeRefreshAgent()
+
+
+class AgentRegistry:
+    """
+    Thread-safe, lazily-populated registry of pipeline components.
+
+    Components are listed in warm-up order: the shared embedding model
+    first, since every other agent depends on it.
+    """
+
+    FACTORIES: Dict[str, Callable[[], Any]] = {
+        "embeddings": _embeddings,
+        "retriever": _retriever,
+        "reranker": _reranker,
+        "generator": _generator,
+        "validator": _validator,
+        "hallucination_detector": _hallucination_detector,
+        "watcher": _watcher,
+        "refresher": _refresher,
+    }
+
+    # Components that are pure model weights: safe to load in a parent
+    # process before forking workers (no threads, sockets or clients)
+    MODEL_COMPONENTS = ("embeddings", "reranker")
+
+    # Optional components, skipped by warm/ready/status when disabled
+    CONDITIONS: Dict[str, Callable[[], bool]] = {
+        "reranker": lambda: settings.RERANK_ENABLED,
+    }
+
+    def __init__(self):
+        self._instances: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._load_ms: Dict[str, float] = {}
+        self._locks = {name: threading.Lock() for name in self.FACTORIES}
+        self._hooks: Dict[str, List[Callable[[Any], None]]] = {name: [] for name in self.FACTORIES}
+
+    def enabled(self) -> List[str]:
+        """Component names in warm-up order, without disabled optional ones."""
+        return [name for name in self.FACTORIES if self.CONDITIONS.get(name, lambda: True)()]
+
+    def on_create(self, name: str, hook: Callable[[Any], None]) -> None:
+        """Run `hook(agent)` once the named agent has been constructed."""
+        self._hooks[name].append(hook)
+        if name in self._instances:
+            hook(self._instances[name])
+
+    def get(self, name: str) -> Any:
+        """Return the named agent, constructing it on first use."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._locks[name]:
+            if name not in self._instances:
+                started = time.perf_counter()
+                try:
+                    instance = self.FACTORIES[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._load_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+                self._errors.pop(name, None)
+                for hook in self._hooks[name]:
+                    hook(instance)
+                self._instances[name] = instance
+        return self._instances[name]
+
+    async def aget(self, name: str) -> Any:
+        """Async `get`: a cold construction runs off the event loop."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        return await run_io(self.get, name)
+
+    def override(self, name: str, instance: Any) -> None:
+        """Install a prebuilt instance (e.g. a stand-in for benchmarks)."""
+        with self._locks[name]:
+            for hook in self._hooks[name]:
+                hook(instance)
+            self._instances[name] = instance
+            self._load_ms[name] = 0.0
+
+    def warm(self) -> Dict[str, float]:
+        """
+        Construct every component in order, logging per-component load time.
+        Failures are recorded in `status()` rather than raised.
+
+        Returns:
+            Load time in milliseconds per component
+        """
+        started = time.perf_counter()
+        for name in self.enabled():
+            try:
+                self.get(name)
+                logger.info("component ready", extra={"fields": {"component": name, "load_ms": self._load_ms[name]}})
+            except Exception as e:
+                logger.error("component failed", extra={"fields": {"component": name, "error": str(e)}})
+        total_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info("warm-up finished", extra={"fields": {"total_ms": total_ms}})
+        return dict(self._load_ms)
+
+    def preload_models(self) -> None:
+        """Load only the model-weight components (see MODEL_COMPONENTS)."""
+        for name in self.MODEL_COMPONENTS:
+            if name not in self.enabled():
+                continue
+            if name == "embeddings" and settings.EMBEDDING_BACKEND == "onnx":
+                # ONNX Runtime starts its thread pool with the session; build it after fork
+                continue
+            self.get(name)
+            logger.info("component preloaded", extra={"fields": {"component": name, "load_ms": self._load_ms[name]}})
+
+    @property
+    def ready(self) -> bool:
+        return all(name in self._instances for name in self.enabled())
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-component readiness, load time and last construction error."""
+        return {
+            name: {
+                "ready": name in self._instances,
+                "load_ms": self._load_ms.get(name),
+                "error": self._errors.get(name)
+            }
+            for name in self.enabled()
+        }
+
+
+registry = AgentRegistry()
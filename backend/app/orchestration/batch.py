@@ -0,0 +1,137 @@
+"""
+Bulk question answering for AXIOMAI.
+
+Runs many questions through the same pipeline as /query, sharing work
+where it can:
+
+  1. all queries of a chunk are embedded in one batch
+  2. up to BATCH_MAX_CONCURRENCY pipelines run at once, so their vector
+     searches, validations and claim checks overlap
+  3. LLM calls across the whole run are capped at BATCH_LLM_CONCURRENCY
+     (via `llm_slots` in app/agents/generator.py) to stay within the
+     Gemini rate limit
+
+Results are yielded as each question completes, one flat record per
+item with its timings. Callers resume a large run by resubmitting only
+the ids without a successful record (see Scripts/batch_query.py).
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+from app.agents.generator import llm_slots
+from app.core.config import settings
+from app.core.log import get_logger, new_request_id
+from app.orchestration.agents import registry
+from app.orchestration.graph import arun_axiomai
+
+logger = get_logger("batch")
+
+
+def _record(item: Dict[str, Any], result: Dict[str, Any], elapsed: float, include_trace: bool) -> Dict[str, Any]:
+    """Flatten a final pipeline state into one output line."""
+    validation = result.get("validation", {})
+    hallucination = result.get("hallucination", {})
+    trace = result.get("trace", {})
+    record = {
+        "id": item["id"],
+        "query": item["query"],
+        "answer": result.get("answer", ""),
+        "trust_score": validation.get("trust_score"),
+        "decision": validation.get("decision"),
+        "hallucination": hallucination.get("hallucination", False),
+        "unsupported_claims": hallucination.get("unsupported_claims", []),
+        "sources": sorted({
+            doc.get("metadata", {}).get("source", "Unknown") for doc in result.get("documents", [])
+        }),
+        "cached": result.get("cache", "miss") != "miss",
+        "refresh_scheduled": result.get("refresh", {}).get("scheduled", False),
+        "retries": result.get("retry_count", 0),
+        "request_id": result.get("request_id"),
+        "timings": {
+            "total_ms": round(elapsed * 1000, 1),
+            "nodes": {span["node"]: span["wall_ms"] for span in trace.get("nodes", [])}
+        }
+    }
+    if include_trace:
+        record["trace"] = trace
+    return record
+
+
+async def _run_item(
+    item: Dict[str, Any],
+    query_embedding: List[float],
+    pipelines: asyncio.Semaphore,
+    llm: asyncio.Semaphore,
+    include_trace: bool
+) -> Dict[str, Any]:
+    # Set in this task's own context copy, so it reaches the graph's nodes
+    # without leaking into the caller's context
+    llm_slots.set(llm)
+    async with pipelines:
+        started = time.perf_counter()
+        try:
+            result = await arun_axiomai(
+                item["query"],
+                request_id=item.get("request_id") or new_request_id(),
+                query_embedding=query_embedding
+            )
+        except Exception as e:
+            logger.exception("batch item failed", extra={"fields": {"id": item["id"]}})
+            return {
+                "id": item["id"],
+                "query": item["query"],
+                "error": str(e),
+                "timings": {"total_ms": round((time.perf_counter() - started) * 1000, 1)}
+            }
+        return _record(item, result, time.perf_counter() - started, include_trace)
+
+
+async def arun_batch(
+    items: List[Dict[str, Any]],
+    max_concurrency: int = None,
+    llm_concurrency: int = None,
+    chunk_size: int = None,
+    include_trace: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Answer `items` ({"id", "query"}) and yield one record per item as it completes.
+
+    Items are processed in chunks of `chunk_size` so a large input never
+    holds more than one chunk's query embeddings and pending results.
+    Failed items yield {"id", "query", "error", "timings"}.
+    """
+    max_concurrency = max_concurrency or settings.BATCH_MAX_CONCURRENCY
+    chunk_size = chunk_size or settings.BATCH_CHUNK_SIZE
+    pipelines = asyncio.Semaphore(max_concurrency)
+    # Shared by every item's LLM calls across the run
+    llm = asyncio.Semaphore(llm_concurrency or settings.BATCH_LLM_CONCURRENCY)
+
+    embeddings = await registry.aget("embeddings")
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        started = time.perf_counter()
+        # Same text the retriever embeds (query.strip()); blanks need no embedding
+        texts = [item["query"].strip() for item in chunk]
+        to_embed = [i for i, text in enumerate(texts) if text]
+        vectors = (await embeddings.aembed([texts[i] for i in to_embed], persist=False)).tolist()
+        query_embeddings = [[] for _ in chunk]
+        for i, vector in zip(to_embed, vectors):
+            query_embeddings[i] = vector
+        logger.info("batch chunk embedded", extra={"fields": {
+            "items": len(chunk),
+            "offset": start,
+            "embed_ms": round((time.perf_counter() - started) * 1000, 1)
+        }})
+
+        tasks = [
+            asyncio.create_task(_run_item(item, embedding, pipelines, llm, include_trace))
+            for item, embedding in zip(chunk, query_embeddings)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # Client went away mid-stream: stop the remaining work
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,192 @@
+"""
+Query Result Cache for AXIOMAI.
+
+Sits in front of the LangGraph pipeline so repeated questions skip
+retrieval, generation and validation entirely.
+
+Two lookup tiers:
+1. Exact: normalized query text (case, whitespace, trailing punctuation).
+2. Semantic: a cached query whose embedding is within a cosine distance
+   of the incoming query embedding.
+
+Entries expire after a TTL, the least recently used entry is evicted when
+full, and entries are invalidated when any chunk they were answered from
+is refreshed or re-ingested by any process (see app/rag/refresh_queue.py).
+
+Only the response payload is kept (answer, verdicts, source chunks and
+context stats), copied so the caller's state can change afterwards;
+per-request embeddings and traces are dropped. The query vector for the
+semantic tier is stored separately on the entry.
+"""
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Optional
+
+import numpy as np
+
+# Final-state keys kept in a cached payload
+CACHED_KEYS = ("query", "answer", "validation", "hallucination", "context", "retry_count", "freshness", "refresh")
+# Per-chunk fields kept for citations and claim evidence
+DOCUMENT_KEYS = ("id", "content", "metadata", "score", "rerank_score")
+
+
+class _CacheEntry:
+    __slots__ = ("result", "embedding", "doc_ids", "expires_at")
+
+    def __init__(self, result: Dict[str, Any], embedding: Optional[np.ndarray], doc_ids: set, expires_at: float):
+        self.result = result
+        self.embedding = embedding
+        self.doc_ids = doc_ids
+        self.expires_at = expires_at
+
+
+class QueryCache:
+    """Thread-safe LRU/TTL cache of trimmed pipeline results keyed by query."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, semantic_distance: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.semantic_distance = semantic_distance
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.semantic_distance > 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Lowercase, collapse whitespace and drop trailing punctuation."""
+        normalized = re.sub(r"\s+", " ", query.strip().lower())
+        return normalized.rstrip("?!. ")
+
+    def get(self, query: str, query_embedding: List[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Returns:
+            {"result": final state dict, "tier": "exact" | "semantic"} or None
+        """
+        key = self.normalize(query)
+        now = time.monotonic()
+
+        with self._lock:
+            self._expire(now)
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return {"result": entry.result, "tier": "exact"}
+
+            # An empty query is embedded as []: nothing to compare against
+            if self.semantic_enabled and query_embedding is not None and len(query_embedding):
+                match = self._nearest(self._unit(query_embedding))
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self.hits += 1
+                    self.semantic_hits += 1
+                    return {"result": self._entries[match].result, "tier": "semantic"}
+
+            self.misses += 1
+            return None
+
+    def put(self, query: str, result: Dict[str, Any], query_embedding: List[float] = None) -> None:
+        """Cache a final pipeline state for this query."""
+        key = self.normalize(query)
+        doc_ids = {doc["id"] for doc in result.get("documents", []) if doc.get("id")}
+        embedding = self._unit(query_embedding) if query_embedding else None
+        payload = self.payload(result)
+
+        with self._lock:
+            self._entries[key] = _CacheEntry(
+                result=payload,
+                embedding=embedding,
+                doc_ids=doc_ids,
+                expires_at=time.monotonic() + self.ttl_seconds
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    @staticmethod
+    def payload(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Trimmed deep copy of a final state: what a cache hit needs to answer."""
+        payload = {key: copy.deepcopy(result[key]) for key in CACHED_KEYS if key in result}
+        payload["documents"] = [
+            {key: copy.deepcopy(doc[key]) for key in DOCUMENT_KEYS if key in doc}
+            for doc in result.get("documents", [])
+        ]
+        return payload
+
+    def invalidate_documents(self, doc_ids: Iterable[str]) -> int:
+        """
+        Evict every cached answer that was built from any of these chunks.
+        Registered as a KnowledgeRefreshAgent listener.
+
+        Returns:
+            Number of entries evicted
+        """
+        doc_ids = set(doc_ids)
+        if not doc_ids:
+            return 0
+
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry.doc_ids & doc_ids]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+    # ── Internals (called with the lock held) ──
+
+    def _expire(self, now: float) -> None:
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        self.evictions += len(expired)
+
+    def _nearest(self, embedding: np.ndarray) -> Optional[str]:
+        keys = [key for key, entry in self._entries.items() if entry.embedding is not None]
+        if not keys:
+            return None
+        matrix = np.stack([self._entries[key].embedding for key in keys])
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        if 1.0 - float(similarities[best]) <= self.semantic_distance:
+            return keys[best]
+        return None
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
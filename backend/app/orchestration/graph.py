@@ -1,22 +1,45 @@
 """
 AXIOMAI LangGraph Orchestration Layer.
 
-Orchestrates all agents into a stateful graph-based pipeline:
-  START → retrieve → generate → validate
+Orchestrates all agents into a stateful graph-based pipeline.
+Nodes are async: LLM calls are awaited natively, while embedding and
+Pinecone work run on bounded executors (app/core/executors.py).
+
+  START → retrieve → rerank → generate → validate
     ├── trusted → END
     └── untrusted → hallucination
-        ├── hallucination detected → refresh → retrieve (loop)
+        ├── hallucination detected → watch
+        │   ├── chunks changed since indexing → refresh (those only)
+        │   │   ├── queued (REFRESH_QUEUE_ENABLED) → END, "refresh scheduled"
+        │   │   └── inline → retrieve (loop)
+        │   └── nothing changed → END (re-embedding would return the same chunks)
         └── no hallucination → END (with warning)
+
+The rerank node is only wired in when settings.RERANK_ENABLED; the
+retriever then over-fetches RERANK_CANDIDATES chunks for it to score.
+
+With settings.PARALLEL_VERIFY, validate and hallucination are replaced by
+one verify node that runs both checks concurrently and applies the same
+routing to their merged result; the claim check is cancelled as soon as
+validation comes back trusted.
 """
-import sys
-from typing import TypedDict, List, Dict, Any
+import asyncio
+import contextlib
+import copy
+import logging
+import threading
+from typing import TypedDict, List, Dict, Any, AsyncIterator, Optional, Tuple
 from langgraph.graph import StateGraph, END
 
-from app.rag.retriever import RetrieverAgent
-from app.agents.generator import LLMGeneratorAgent
-from app.rag.validator import AnswerValidatorAgent
-from app.rag.hallucination import HallucinationDetectorAgent
-from app.rag.refresh import KnowledgeRefreshAgent
+from app.core import metrics
+from app.core.executors import run_cpu, run_io
+from app.core.log import get_logger, new_request_id, request_id_var
+from app.core.tracing import span, start_trace, traced
+from app.core.config import settings
+from app.orchestration.agents import registry
+from app.orchestration.cache import QueryCache
+
+logger = get_logger("graph")
 
 # ── Max loop guard to prevent infinite cycles ──
 MAX_RETRIES = 2
@@ -25,65 +48,294 @@ MAX_RETRIES = 2
 # ── State Schema ──
 class AXIOMAIState(TypedDict):
     query: str
+    # Correlation id stamped on every log line for this request
+    request_id: str
     documents: List[Dict[str, Any]]
     answer: str
     validation: Dict[str, Any]
     hallucination: Dict[str, Any]
     retry_count: int
+    # Embeddings reused across nodes within one request
+    query_embedding: List[float]
+    document_embeddings: List[List[float]]
+    answer_embedding: List[float]
+    # Prompt context stats for the last generation (see app/agents/context.py)
+    context: Dict[str, Any]
+    # Watcher verdict on the retrieved chunks: the changed ones are refreshed
+    stale_documents: List[Dict[str, Any]]
+    freshness: Dict[str, Any]
+    # Outcome of the last refresh: {"scheduled": bool, ...}
+    refresh: Dict[str, Any]
+
+
+# Agents are built lazily (or warmed at startup) by the registry
+# in app/orchestration/agents.py — nothing heavy loads at import time.
+
+# ── Query Result Cache (refreshed chunks evict dependent answers) ──
+query_cache = QueryCache(
+    max_entries=settings.QUERY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.QUERY_CACHE_TTL_SECONDS,
+    semantic_distance=settings.QUERY_CACHE_SEMANTIC_DISTANCE
+)
+registry.on_create("refresher", lambda refresher: refresher.add_listener(query_cache.invalidate_documents))
+
+
+# ── Embedding Reuse ──
+
+async def _request_embeddings(state: AXIOMAIState) -> dict:
+    """
+    Return the answer and document embeddings for this request, computing
+    only the ones not already carried in the state, in a single batch.
+    """
+    answer = state["answer"]
+    documents = state["documents"]
+    answer_embedding = state.get("answer_embedding") or []
+    document_embeddings = state.get("document_embeddings") or []
+
+    texts, persist = [], []
+    if not answer_embedding:
+        texts.append(answer)
+        persist.append(False)
+    docs_missing = len(document_embeddings) != len(documents) or any(len(e) == 0 for e in document_embeddings)
+    if docs_missing:
+        texts.extend(doc.get("content", "") for doc in documents)
+        persist.extend(True for _ in documents)
+
+    if texts:
+        embeddings = await registry.aget("embeddings")
+        # Only chunk vectors go to the persistent embedding cache
+        vectors = (await embeddings.aembed(texts, persist=persist)).tolist()
+        if not answer_embedding:
+            answer_embedding = vectors.pop(0)
+        if docs_missing:
+            document_embeddings = vectors
+
+    return {
+        "answer_embedding": answer_embedding,
+        "document_embeddings": document_embeddings
+    }
 
 
-# ── Agent Instances (initialized once) ──
-retriever = RetrieverAgent()
-generator = LLMGeneratorAgent()
-validator = AnswerValidatorAgent()
-hallucination_detector = HallucinationDetectorAgent()
-refresher = KnowledgeRefreshAgent()
+def _context_stats(context: dict) -> dict:
+    """Context packing stats kept in the state (everything but the prompt text)."""
+    return {key: value for key, value in context.items() if key != "text"}
 
 
 # ── Node Functions ──
 
-def retrieve_node(state: AXIOMAIState) -> dict:
-    """Retrieve relevant documents from the vector database."""
+@traced("retrieve")
+async def retrieve_node(state: AXIOMAIState) -> dict:
+    """Retrieve relevant documents (and their stored vectors) from the vector database."""
     query = state["query"]
-    documents = retriever.retrieve(query)
-    print(f"[RETRIEVE] Retrieved {len(documents)} chunks")
-    return {"documents": documents}
+    retriever = await registry.aget("retriever")
+    # Over-fetch candidates when a reranker will narrow them down
+    top_k = settings.RERANK_CANDIDATES if settings.RERANK_ENABLED else None
+    result = await retriever.aretrieve_with_embeddings(query, state.get("query_embedding"), top_k=top_k)
+    documents = result["documents"]
+    logger.info("retrieved", extra={"fields": {"node": "retrieve", "chunks": len(documents)}})
+    return result
 
 
-def generate_node(state: AXIOMAIState) -> dict:
+@traced("rerank")
+async def rerank_node(state: AXIOMAIState) -> dict:
+    """Rescore retrieved candidates with the cross-encoder and keep the best."""
+    reranker = await registry.aget("reranker")
+    result = await run_cpu(
+        reranker.rerank,
+        state["query"],
+        state["documents"],
+        state.get("document_embeddings")
+    )
+    logger.info("reranked", extra={"fields": {
+        "node": "rerank",
+        "kept": len(result["documents"]),
+        "candidates": len(state["documents"]),
+        "scored": result["scored"],
+        "latency_ms": result["latency_ms"]
+    }})
+    return {"documents": result["documents"], "document_embeddings": result["document_embeddings"]}
+
+
+@traced("generate")
+async def generate_node(state: AXIOMAIState) -> dict:
     """Generate an answer using the LLM based on retrieved documents."""
     query = state["query"]
     documents = state["documents"]
-    answer = generator.generate(query, documents)
-    print(f"[GENERATE] Answer generated")
-    return {"answer": answer}
+    generator = await registry.aget("generator")
+    context = generator.build_context(query, documents)
+    answer = await generator.agenerate(query, documents, context=context)
+    logger.info("generated", extra={"fields": {"node": "generate", **_context_stats(context)}})
+    # A new answer invalidates any previous answer embedding
+    return {"answer": answer, "answer_embedding": [], "context": _context_stats(context)}
 
 
-def validate_node(state: AXIOMAIState) -> dict:
+@traced("validate")
+async def validate_node(state: AXIOMAIState) -> dict:
     """Validate the answer and compute trust score."""
     answer = state["answer"]
     documents = state["documents"]
-    validation = validator.validate(answer, documents)
-    print(f"[VALIDATE] Trust Score: {validation['trust_score']} | Decision: {validation['decision']}")
-    return {"validation": validation}
+    embeddings = await _request_embeddings(state)
+    validator = await registry.aget("validator")
+    validation = await run_cpu(
+        validator.validate,
+        answer,
+        documents,
+        answer_embedding=embeddings["answer_embedding"],
+        document_embeddings=embeddings["document_embeddings"]
+    )
+    logger.info("validated", extra={"fields": {
+        "node": "validate",
+        "trust_score": validation["trust_score"],
+        "decision": validation["decision"]
+    }})
+    return {"validation": validation, **embeddings}
+
+
+async def _detect_hallucination(state: AXIOMAIState, cancel: threading.Event = None) -> dict:
+    hallucination_detector = await registry.aget("hallucination_detector")
+    return await run_cpu(
+        hallucination_detector.detect,
+        state["answer"],
+        state["documents"],
+        document_embeddings=state.get("document_embeddings"),
+        cancel=cancel
+    )
 
 
-def hallucination_node(state: AXIOMAIState) -> dict:
+@traced("hallucination")
+async def hallucination_node(state: AXIOMAIState) -> dict:
     """Detect hallucinations in an untrusted answer."""
-    answer = state["answer"]
-    documents = state["documents"]
-    result = hallucination_detector.detect(answer, documents)
-    print(f"[HALLUCINATION] Detected: {result['hallucination']} | Unsupported: {len(result['unsupported_claims'])} claims")
+    result = await _detect_hallucination(state)
+    logger.info("hallucination checked", extra={"fields": {
+        "node": "hallucination",
+        "hallucination": result["hallucination"],
+        "unsupported_claims": len(result["unsupported_claims"])
+    }})
     return {"hallucination": result}
 
 
-def refresh_node(state: AXIOMAIState) -> dict:
-    """Refresh stale knowledge and increment retry counter."""
-    documents = state["documents"]
+@traced("verify")
+async def verify_node(state: AXIOMAIState) -> dict:
+    """
+    Validate the answer and check its claims concurrently (PARALLEL_VERIFY).
+
+    Both checks share the answer and document embeddings, computed once
+    up front. A trusted verdict cancels the claim check: the awaiting task
+    immediately, and the detector before it embeds the claims.
+    """
+    embeddings = await _request_embeddings(state)
+    state = {**state, **embeddings}
+    cancel = threading.Event()
+
+    async def check_claims() -> dict:
+        with span("hallucination") as current:
+            try:
+                result = await _detect_hallucination(state, cancel=cancel)
+            except asyncio.CancelledError:
+                current.name = "hallucination_cancelled"
+                raise
+            if result.get("cancelled"):
+                current.name = "hallucination_cancelled"
+            return result
+
+    claims = asyncio.create_task(check_claims())
+    try:
+        validation = (await validate_node(state))["validation"]
+    except BaseException:
+        cancel.set()
+        claims.cancel()
+        raise
+
+    if validation["decision"] == "trusted":
+        cancel.set()
+        claims.cancel()
+        # Whatever the claim check did (finished, failed, cancelled) no longer matters
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await claims
+        logger.info("verified", extra={"fields": {"node": "verify", "claim_check": "cancelled"}})
+        # Replace a previous attempt's verdict: this answer's claims were never checked
+        hallucination = {"hallucination": False, "unsupported_claims": [], "claims": [], "cancelled": True}
+        return {"validation": validation, "hallucination": hallucination, **embeddings}
+
+    hallucination = await claims
+    logger.info("verified", extra={"fields": {
+        "node": "verify",
+        "hallucination": hallucination["hallucination"],
+        "unsupported_claims": len(hallucination["unsupported_claims"])
+    }})
+    return {"validation": validation, "hallucination": hallucination, **embeddings}
+
+
+@traced("watch")
+async def watch_node(state: AXIOMAIState) -> dict:
+    """Check the retrieved chunks against their ingested sources and publication dates."""
+    watcher = await registry.aget("watcher")
+    stale = await run_cpu(watcher.find_stale, state["documents"])
+    freshness = {
+        "changed": [doc.get("id") for doc in stale["changed"]],
+        "outdated": [doc.get("id") for doc in stale["outdated"]]
+    }
+    logger.info("documents watched", extra={"fields": {
+        "node": "watch",
+        "changed": len(freshness["changed"]),
+        "outdated": len(freshness["outdated"])
+    }})
+    return {"stale_documents": stale["changed"], "freshness": freshness}
+
+
+# Follows the refreshed log, and drains the refresh queue when it is enabled (started by ensure_refresh_worker)
+_refresh_worker = None
+
+
+def _refresh_in_background(reason: str, documents: List[Dict[str, Any]]) -> Any:
+    return registry.get("refresher").refresh(reason=reason, documents=documents)
+
+
+def ensure_refresh_worker() -> None:
+    """Start this process's refresh queue worker (idempotent)."""
+    global _refresh_worker
+    if _refresh_worker is None:
+        from app.rag.refresh_queue import RefreshWorker, get_refresh_queue
+        # Every worker evicts answers built from chunks any process re-indexed
+        _refresh_worker = RefreshWorker(
+            get_refresh_queue(),
+            _refresh_in_background if settings.REFRESH_QUEUE_ENABLED else None,
+            on_refreshed=query_cache.invalidate_documents
+        )
+    _refresh_worker.start()
+
+
+@traced("refresh")
+async def refresh_node(state: AXIOMAIState) -> dict:
+    """
+    Re-index the chunks the watcher found changed: queued for the background
+    worker (the request ends), or inline followed by another retrieval.
+    """
+    documents = state.get("stale_documents") or []
     retry_count = state.get("retry_count", 0)
-    result = refresher.refresh(reason="hallucination_detected", documents=documents)
-    print(f"[REFRESH] Type: {result['refresh_type']} | Updated: {result['updated_documents']} docs")
-    return {"retry_count": retry_count + 1}
+
+    if settings.REFRESH_QUEUE_ENABLED:
+        from app.rag.refresh_queue import get_refresh_queue
+        queued = await run_io(get_refresh_queue().enqueue, "hallucination_detected", documents)
+        ensure_refresh_worker()
+        _refresh_worker.wake()
+        logger.info("refresh scheduled", extra={"fields": {"node": "refresh", **queued}})
+        return {"refresh": {"scheduled": True, **queued}}
+
+    refresher = await registry.aget("refresher")
+    result = await run_io(refresher.refresh, reason="hallucination_detected", documents=documents)
+    # This process's cache was invalidated by the refresher listener; tell the others
+    from app.rag.refresh_queue import get_refresh_queue
+    await run_io(get_refresh_queue().mark_refreshed, [doc.get("id") for doc in documents])
+    logger.info("refreshed", extra={"fields": {
+        "node": "refresh",
+        "refresh_type": result["refresh_type"],
+        "updated_documents": result["updated_documents"]
+    }})
+    return {
+        "retry_count": retry_count + 1,
+        "refresh": {"scheduled": False, "updated_documents": result["updated_documents"]}
+    }
 
 
 # ── Conditional Edge Functions ──
@@ -96,14 +348,35 @@ def after_validate(state: AXIOMAIState) -> str:
 
 
 def after_hallucination(state: AXIOMAIState) -> str:
-    """Route after hallucination detection: detected → refresh, safe → end."""
+    """Route after hallucination detection: detected → watch, safe → end."""
     retry_count = state.get("retry_count", 0)
 
     if state["hallucination"]["hallucination"] and retry_count < MAX_RETRIES:
+        return "watch"
+    return "end"
+
+
+def after_verify(state: AXIOMAIState) -> str:
+    """Route the merged verify result: after_validate, then after_hallucination."""
+    if after_validate(state) == "end":
+        return "end"
+    return after_hallucination(state)
+
+
+def after_watch(state: AXIOMAIState) -> str:
+    """Route after the watcher: changed chunks → refresh, nothing changed → end."""
+    if state.get("stale_documents"):
         return "refresh"
     return "end"
 
 
+def after_refresh(state: AXIOMAIState) -> str:
+    """Route after refresh: scheduled in the background → end, re-indexed inline → retrieve."""
+    if state.get("refresh", {}).get("scheduled"):
+        return "end"
+    return "retrieve"
+
+
 # ── Build the Graph ──
 
 def build_graph() -> StateGraph:
@@ -112,41 +385,82 @@ def build_graph() -> StateGraph:
 
     # Add nodes
     graph.add_node("retrieve", retrieve_node)
+    if settings.RERANK_ENABLED:
+        graph.add_node("rerank", rerank_node)
     graph.add_node("generate", generate_node)
-    graph.add_node("validate", validate_node)
-    graph.add_node("hallucination", hallucination_node)
+    if settings.PARALLEL_VERIFY:
+        graph.add_node("verify", verify_node)
+    else:
+        graph.add_node("validate", validate_node)
+        graph.add_node("hallucination", hallucination_node)
+    graph.add_node("watch", watch_node)
     graph.add_node("refresh", refresh_node)
 
     # Set entry point
     graph.set_entry_point("retrieve")
 
     # Linear edges
-    graph.add_edge("retrieve", "generate")
-    graph.add_edge("generate", "validate")
-
-    # Conditional: after validate
+    if settings.RERANK_ENABLED:
+        graph.add_edge("retrieve", "rerank")
+        graph.add_edge("rerank", "generate")
+    else:
+        graph.add_edge("retrieve", "generate")
+
+    if settings.PARALLEL_VERIFY:
+        graph.add_edge("generate", "verify")
+
+        # Conditional: after the merged validate + hallucination result
+        graph.add_conditional_edges(
+            "verify",
+            after_verify,
+            {
+                "watch": "watch",
+                "end": END
+            }
+        )
+    else:
+        graph.add_edge("generate", "validate")
+
+        # Conditional: after validate
+        graph.add_conditional_edges(
+            "validate",
+            after_validate,
+            {
+                "end": END,
+                "hallucination": "hallucination"
+            }
+        )
+
+        # Conditional: after hallucination
+        graph.add_conditional_edges(
+            "hallucination",
+            after_hallucination,
+            {
+                "watch": "watch",
+                "end": END
+            }
+        )
+
+    # Conditional: after watch
     graph.add_conditional_edges(
-        "validate",
-        after_validate,
+        "watch",
+        after_watch,
         {
-            "end": END,
-            "hallucination": "hallucination"
+            "refresh": "refresh",
+            "end": END
         }
     )
 
-    # Conditional: after hallucination
+    # Conditional: after refresh (loop back to retrieve unless queued)
     graph.add_conditional_edges(
-        "hallucination",
-        after_hallucination,
+        "refresh",
+        after_refresh,
         {
-            "refresh": "refresh",
+            "retrieve": "retrieve",
             "end": END
         }
     )
 
-    # Loop: refresh → retrieve
-    graph.add_edge("refresh", "retrieve")
-
     return graph.compile()
 
 
@@ -156,33 +470,91 @@ def build_graph() -> StateGraph:
 _compiled_graph = build_graph()
 
 
-def run_axiomai(query: str) -> dict:
-    """
-    Execute the full AXIOMAI pipeline.
-
-    Args:
-        query: User question string
-
-    Returns:
-        Final state dict with: query, answer, documents, validation, hallucination
-    """
-    initial_state: AXIOMAIState = {
+def _initial_state(query: str, query_embedding: List[float] = None) -> AXIOMAIState:
+    return {
         "query": query,
+        "request_id": request_id_var.get(),
         "documents": [],
         "answer": "",
         "validation": {},
         "hallucination": {},
-        "retry_count": 0
+        "retry_count": 0,
+        "query_embedding": query_embedding or [],
+        "document_embeddings": [],
+        "answer_embedding": [],
+        "context": {},
+        "stale_documents": [],
+        "freshness": {},
+        "refresh": {}
     }
 
-    print(f"\n{'=' * 60}")
-    print(f"AXIOMAI Pipeline")
-    print(f"Query: {query}")
-    print(f"{'=' * 60}\n")
 
-    result = _compiled_graph.invoke(initial_state)
+async def _cache_lookup(query: str, query_embedding: List[float] = None) -> Tuple[Optional[dict], List[float]]:
+    """
+    Check the query cache before running the graph.
 
-    # Format output
+    Args:
+        query: User question string
+        query_embedding: Precomputed embedding (batch runs), if any
+
+    Returns:
+        (cached final state or None, query embedding computed for the
+        semantic tier — reused by the retriever on a miss)
+    """
+    query_embedding = query_embedding or []
+    if not settings.QUERY_CACHE_ENABLED:
+        return None, query_embedding
+
+    with span("cache_lookup"):
+        if query_cache.semantic_enabled and query.strip() and not query_embedding:
+            embeddings = await registry.aget("embeddings")
+            query_embedding = await embeddings.aembed_query(query.strip())
+
+        hit = query_cache.get(query, query_embedding)
+    if hit is not None:
+        logger.info("cache hit", extra={"fields": {"tier": hit["tier"]}})
+        # Copy: the request attaches its own trace and request id
+        return {**copy.deepcopy(hit["result"]), "cache": hit["tier"]}, query_embedding
+    return None, query_embedding
+
+
+def _cache_store(query: str, result: dict) -> None:
+    """Cache a final state; hallucinated answers are never cached."""
+    if settings.QUERY_CACHE_ENABLED and not result.get("hallucination", {}).get("hallucination"):
+        query_cache.put(query, result, result.get("query_embedding"))
+
+
+def _record_request(result: dict, trace) -> None:
+    """Attach the trace to the final state and feed the request-level metrics."""
+    result["trace"] = trace.to_dict()
+    result["request_id"] = request_id_var.get()
+    metrics.REQUEST_SECONDS.observe(trace.total_ms / 1000, cache=result.get("cache", "miss"))
+    if trace.retries:
+        metrics.RETRIES.inc(trace.retries)
+
+
+def _log_result(result: dict) -> None:
+    """One summary line per request; the answer itself only at DEBUG."""
+    validation = result.get("validation", {})
+    hallucination = result.get("hallucination", {})
+    logger.info("request complete", extra={"fields": {
+        "trust_score": validation.get("trust_score"),
+        "decision": validation.get("decision"),
+        "hallucination": hallucination.get("hallucination", False),
+        "unsupported_claims": len(hallucination.get("unsupported_claims", [])),
+        "retries": result.get("retry_count", 0),
+        "cache": result.get("cache", "miss"),
+        "total_ms": result.get("trace", {}).get("total_ms")
+    }})
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("answer", extra={"fields": {
+            "answer": result.get("answer", ""),
+            "unsupported": hallucination.get("unsupported_claims", [])
+        }})
+
+
+def _print_result(result: dict) -> None:
+    """Human-readable result for CLI use (`run_axiomai`)."""
     print(f"\n{'=' * 60}")
     print("RESULT:")
     print(f"{'=' * 60}")
@@ -198,4 +570,112 @@ def run_axiomai(query: str) -> dict:
 
     print(f"{'=' * 60}\n")
 
+
+async def arun_axiomai(query: str, request_id: str = None, query_embedding: List[float] = None) -> dict:
+    """
+    Execute the full AXIOMAI pipeline without blocking the event loop.
+
+    Args:
+        query: User question string
+        request_id: Optional correlation id (default: a new one)
+        query_embedding: Precomputed embedding of query.strip() (batch runs)
+
+    Returns:
+        Final state dict with: query, answer, documents, validation, hallucination
+    """
+    request_id_var.set(request_id or new_request_id())
+    logger.debug("pipeline start", extra={"fields": {"query": query}})
+
+    with start_trace() as trace:
+        cached, query_embedding = await _cache_lookup(query, query_embedding)
+        if cached is not None:
+            result = cached
+        else:
+            result = await _compiled_graph.ainvoke(_initial_state(query, query_embedding))
+            _cache_store(query, result)
+            result["cache"] = "miss"
+            trace.retries = result.get("retry_count", 0)
+    _record_request(result, trace)
+
+    _log_result(result)
+    return result
+
+
+async def astream_axiomai(query: str, request_id: str = None) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Execute one pass of the pipeline, yielding progress as it happens.
+
+    Runs the same nodes and routing as the graph, but generation streams
+    tokens via `LLMGeneratorAgent.astream`. Because the answer has already
+    been sent to the client, a hallucination verdict triggers the watcher
+    check (and a refresh of changed chunks) without the retrieve → generate
+    retry loop.
+
+    Yields (event, payload) tuples:
+        ("retrieval", documents)
+        ("token", str)
+        ("validation", validation dict)
+        ("hallucination", hallucination dict)   # untrusted answers only
+        ("done", final state dict)
+    """
+    request_id_var.set(request_id or new_request_id())
+    with start_trace() as trace:
+        cached, query_embedding = await _cache_lookup(query)
+        if cached is not None:
+            yield "retrieval", cached["documents"]
+            yield "token", cached["answer"]
+            yield "validation", cached["validation"]
+            if cached.get("hallucination"):
+                yield "hallucination", cached["hallucination"]
+            state = cached
+        else:
+            state = _initial_state(query, query_embedding)
+
+            state.update(await retrieve_node(state))
+            if settings.RERANK_ENABLED:
+                state.update(await rerank_node(state))
+            yield "retrieval", state["documents"]
+
+            tokens = []
+            generator = await registry.aget("generator")
+            with span("generate"):
+                context = generator.build_context(query, state["documents"])
+                async for token in generator.astream(query, state["documents"], context=context):
+                    tokens.append(token)
+                    yield "token", token
+            state.update({"answer": "".join(tokens), "answer_embedding": [], "context": _context_stats(context)})
+            logger.info("generated", extra={"fields": {"node": "generate", "streamed": True, **_context_stats(context)}})
+
+            if settings.PARALLEL_VERIFY:
+                state.update(await verify_node(state))
+                yield "validation", state["validation"]
+                if after_validate(state) == "hallucination":
+                    yield "hallucination", state["hallucination"]
+            else:
+                state.update(await validate_node(state))
+                yield "validation", state["validation"]
+                if after_validate(state) == "hallucination":
+                    state.update(await hallucination_node(state))
+                    yield "hallucination", state["hallucination"]
+
+            if after_validate(state) == "hallucination" and after_hallucination(state) == "watch":
+                state.update(await watch_node(state))
+                if after_watch(state) == "refresh":
+                    state.update(await refresh_node(state))
+
+            _cache_store(query, state)
+            state["cache"] = "miss"
+            trace.retries = state.get("retry_count", 0)
+    _record_request(state, trace)
+    _log_result(state)
+    yield "done", state
+
+
+def run_axiomai(query: str) -> dict:
+    """
+    Execute the full AXIOMAI pipeline synchronously (scripts and CLI use).
+    Must not be called from inside a running event loop; use `arun_axiomai`.
+    """
+    result = asyncio.run(arun_axiomai(query))
+    _print_result(result)
     return result
@@ -0,0 +1,135 @@
+"""
+Cross-request micro-batching for the embedding model.
+
+Concurrent requests each embed a query, an answer, a few chunks or claims
+— many small forward passes that leave the CPU underused. Callers submit
+texts to `EmbeddingBatcher` and get a future back; one worker thread
+collects submissions for up to `max_wait_ms` (or until `max_batch_size`
+texts are queued) and runs them through the model as a single batch.
+Async callers await the future without holding a CPU pool thread, so
+every in-flight /query can join the same batch.
+
+Settings:
+    EMBEDDING_BATCHING_ENABLED
+    EMBEDDING_BATCH_MAX_WAIT_MS   — how long the first text waits for company
+    EMBEDDING_BATCH_MAX_SIZE      — texts per forward pass
+"""
+import contextvars
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Callable, List
+
+import numpy as np
+
+from app.core import metrics
+from app.core.log import get_logger
+from app.core.tracing import note_embedding
+
+logger = get_logger("embeddings")
+
+
+class _Pending:
+    """One caller's texts, its future and context (for its trace span)."""
+
+    __slots__ = ("texts", "future", "context")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.context = contextvars.copy_context()
+
+
+class EmbeddingBatcher:
+    """Coalesces embed calls from concurrent callers into shared forward passes."""
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch_size: int, max_wait_ms: float):
+        self._encode = encode
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._lock = threading.Lock()
+        self._queue: queue.SimpleQueue = None
+        self._pid = None
+        self.batches = 0
+        self.texts = 0
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue `texts`; the future resolves to their float32 vectors."""
+        pending = _Pending(list(texts))
+        self._ensure_worker().put(pending)
+        return pending.future
+
+    def _ensure_worker(self) -> queue.SimpleQueue:
+        """Start the worker lazily, and again after a fork: threads do not survive it."""
+        if self._queue is None or self._pid != os.getpid():
+            with self._lock:
+                if self._queue is None or self._pid != os.getpid():
+                    self._queue = queue.SimpleQueue()
+                    self._pid = os.getpid()
+                    threading.Thread(
+                        target=self._run,
+                        args=(self._queue,),
+                        name="axiomai-embed-batcher",
+                        daemon=True
+                    ).start()
+        return self._queue
+
+    def _collect(self, pending_queue: queue.SimpleQueue) -> List[_Pending]:
+        """Block for the first submission, then gather more until full or the wait expires.
+
+        Each future is claimed as it is taken off the queue, so a caller that
+        cancels (e.g. a disconnected request) is dropped here and cannot cancel
+        it later while its vectors are being delivered.
+        """
+        batch = []
+        while not batch:
+            item = pending_queue.get()
+            if item.future.set_running_or_notify_cancel():
+                batch.append(item)
+        size = len(batch[0].texts)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = pending_queue.get(timeout=remaining) if remaining > 0 else pending_queue.get_nowait()
+            except queue.Empty:
+                break
+            if not item.future.set_running_or_notify_cancel():
+                continue
+            batch.append(item)
+            size += len(item.texts)
+        return batch
+
+    @staticmethod
+    def _deliver(item: _Pending, result=None, error: Exception = None) -> None:
+        """Resolve one caller's future; a future that is already done must not stop the worker."""
+        try:
+            if error is not None:
+                item.future.set_exception(error)
+            else:
+                item.future.set_result(result)
+        except InvalidStateError:
+            logger.warning("embedding future already resolved")
+
+    def _run(self, pending_queue: queue.SimpleQueue) -> None:
+        while True:
+            batch = self._collect(pending_queue)
+            texts = [text for item in batch for text in item.texts]
+            try:
+                vectors = self._encode(texts)
+            except Exception as e:
+                logger.exception("embedding batch failed", extra={"fields": {"texts": len(texts)}})
+                for item in batch:
+                    self._deliver(item, error=e)
+                continue
+
+            self.batches += 1
+            self.texts += len(texts)
+            metrics.EMBED_BATCH_SIZE.observe(len(texts))
+            offset = 0
+            for item in batch:
+                item.context.run(note_embedding, len(texts))
+                self._deliver(item, vectors[offset:offset + len(item.texts)])
+                offset += len(item.texts)
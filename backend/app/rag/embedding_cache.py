@@ -0,0 +1,181 @@
+"""
+Persistent Embedding Cache for AXIOMAI.
+
+Maps (embedding model and backend, content hash) → float32 vector in a SQLite file,
+so the same chunk text is embedded once across validation, hallucination
+checks, refreshes and re-ingestions — and across restarts. The content
+hash is the same SHA-256 the watcher and ingestion store as
+`content_hash`. The least recently used entries are evicted once the
+cache exceeds `max_entries`.
+
+Only chunk vectors are stored (EmbeddingService skips per-request text),
+and a hit never writes: `last_used` times are collected in memory and
+written in one batch every TOUCH_FLUSH_SECONDS or TOUCH_FLUSH_EVERY keys,
+and before eviction.
+
+Each process (including every pre-forked API worker) opens its own
+connection; WAL mode lets them read and write the same file concurrently.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from app.core.config import settings
+
+# Entries written between eviction checks (the cache may overshoot max_entries by this much)
+EVICT_CHECK_EVERY = 1000
+# Pending last_used updates are written once either limit is reached
+TOUCH_FLUSH_EVERY = 1000
+TOUCH_FLUSH_SECONDS = 30.0
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the text (same digest as DocumentWatcherAgent._compute_hash)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite blob store of embedding vectors with LRU eviction and hit-rate stats."""
+
+    def __init__(self, path: str = None, max_entries: int = None):
+        self.path = path or settings.EMBEDDING_CACHE_PATH
+        self.max_entries = max_entries or settings.EMBEDDING_CACHE_MAX_ENTRIES
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection = None
+        self._pid = None
+        self._writes_since_check = 0
+        # key → last hit time, not yet written
+        self._touched: Dict[str, float] = {}
+        self._touched_since = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(model_key: str, text: str) -> str:
+        return f"{model_key}:{content_hash(text)}"
+
+    def get_many(self, keys: List[str], dimension: int) -> Dict[str, np.ndarray]:
+        """Return cached vectors for whichever keys are present."""
+        unique = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    if vector.shape[0] == dimension:
+                        found[key] = vector
+            if found:
+                now = time.time()
+                self._touched.update((key, now) for key in found)
+                if (len(self._touched) >= TOUCH_FLUSH_EVERY
+                        or time.monotonic() - self._touched_since >= TOUCH_FLUSH_SECONDS):
+                    self._flush_touched(conn)
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+            )
+            conn.commit()
+            self._writes_since_check += len(rows)
+            if self._writes_since_check >= EVICT_CHECK_EVERY:
+                self._evict(conn)
+
+    def flush(self) -> None:
+        """Write pending last_used updates now."""
+        with self._lock:
+            self._flush_touched(self._connection())
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+    def _flush_touched(self, conn: sqlite3.Connection) -> None:
+        """Write the batched last_used times (lock held)."""
+        self._touched_since = time.monotonic()
+        if not self._touched:
+            return
+        conn.executemany(
+            "UPDATE embeddings SET last_used = MAX(last_used, ?) WHERE key = ?",
+            [(used, key) for key, used in self._touched.items()]
+        )
+        conn.commit()
+        self._touched.clear()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used entries beyond max_entries (lock held)."""
+        self._writes_since_check = 0
+        # Recency must be current before choosing what to drop
+        self._flush_touched(conn)
+        entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = entries - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+            conn.commit()
+            self.evictions += excess
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open lazily, and again after a fork: connections must not cross processes (lock held)."""
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+
+_cache: EmbeddingCache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide embedding cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache()
+    return _cache
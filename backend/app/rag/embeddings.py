@@ -0,0 +1,244 @@
+"""
+Shared Embedding Service for AXIOMAI.
+
+Every agent that needs vectors (retriever, validator, hallucination
+detector, knowledge refresh) goes through one process-wide model
+instance instead of loading its own copy of the embedding model.
+"""
+import asyncio
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.core.config import settings
+
+
+def embedding_threads() -> int:
+    """
+    Intra-op threads for embedding inference. One on Windows (OSError 1455);
+    elsewhere settings.EMBEDDING_NUM_THREADS, or the host's cores split
+    evenly across API workers.
+    """
+    if sys.platform == "win32":
+        return 1
+    if settings.EMBEDDING_NUM_THREADS > 0:
+        return settings.EMBEDDING_NUM_THREADS
+    return max(1, (os.cpu_count() or 1) // max(settings.API_WORKERS, 1))
+
+
+# Fix Windows OSError 1455 by disabling symlinks and safetensors aggressive usage;
+# must be set before torch is imported
+os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "1"
+os.environ["SAFETENSORS_FAST_GPU"] = "0"
+os.environ.setdefault("OMP_NUM_THREADS", str(embedding_threads()))
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+os.environ["HF_HUB_ENABLE_HF_TRANSFER"] = "0"
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from app.core.executors import run_cpu, run_io
+from app.core.tracing import record_embedding
+from app.rag.embedding_batcher import EmbeddingBatcher
+from app.rag.embedding_cache import EmbeddingCache, get_embedding_cache
+
+
+class EmbeddingService(Embeddings):
+    """
+    Thread-safe wrapper around a single SentenceTransformer model.
+
+    The inference backend is selected by settings.EMBEDDING_BACKEND:
+    - "torch": full-precision PyTorch (default)
+    - "int8":  PyTorch with dynamic int8 quantization of the Linear layers
+    - "onnx":  ONNX Runtime (EMBEDDING_ONNX_FILE may point at a quantized export)
+    Use Scripts/check_embedding_accuracy.py to compare a backend against fp32.
+
+    With settings.EMBEDDING_BATCHING_ENABLED, forward passes go through an
+    EmbeddingBatcher that merges concurrent callers' texts into one batch.
+
+    `embed(texts)` is the one batched entry point; it returns a float32
+    matrix of L2-normalized vectors, so cosine similarity is a plain dot
+    product. The LangChain `Embeddings` interface is implemented on top
+    of it so vector stores can use the same instance. Chunk vectors are
+    looked up in the persistent embedding cache first
+    (app/rag/embedding_cache.py); only uncached texts reach the model.
+    Queries, answers and claims bypass the cache (`persist=False`).
+    """
+
+    BACKENDS = ("torch", "int8", "onnx")
+
+    def __init__(self, model_name: str = None, backend: str = None):
+        self.model_name = model_name or settings.EMBEDDING_MODEL_NAME
+        self.backend = backend or settings.EMBEDDING_BACKEND
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND: {self.backend}")
+        self.model = self._load_model()
+        self._lock = threading.Lock()
+        self.cache = get_embedding_cache() if settings.EMBEDDING_CACHE_ENABLED else None
+        self.batcher = EmbeddingBatcher(
+            self._forward,
+            max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS
+        ) if settings.EMBEDDING_BATCHING_ENABLED else None
+
+    def _load_model(self):
+        """Load the SentenceTransformer for this model name and backend."""
+        # Deferred: importing sentence_transformers pulls in torch
+        from sentence_transformers import SentenceTransformer
+
+        threads = embedding_threads()
+        if self.backend == "onnx":
+            import onnxruntime
+
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = threads
+            model_kwargs = {"provider": "CPUExecutionProvider", "session_options": session_options}
+            if settings.EMBEDDING_ONNX_FILE:
+                model_kwargs["file_name"] = settings.EMBEDDING_ONNX_FILE
+            return SentenceTransformer(
+                self.model_name,
+                device="cpu",
+                backend="onnx",
+                model_kwargs=model_kwargs,
+                trust_remote_code=True
+            )
+
+        import torch
+
+        torch.set_num_threads(threads)
+        # Force CPU to avoid the Windows paging file overload (OS Error 1455)
+        model = SentenceTransformer(
+            self.model_name,
+            device="cpu",
+            trust_remote_code=True
+        )
+        if self.backend == "int8":
+            torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+        return model
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies vectors produced by this model and backend in the embedding cache."""
+        return f"{self.model_name}:{self.backend}"
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str], persist: Union[bool, List[bool]] = True) -> np.ndarray:
+        """
+        Embed a batch of texts; cache misses go through a single forward pass.
+
+        Args:
+            texts: List of strings to embed
+            persist: Whether each text goes through the embedding cache (one
+                flag for all, or one per text). Pass False for per-request
+                text (queries, answers, claims): it is never seen again, so it
+                is neither looked up nor written.
+
+        Returns:
+            float32 array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        keys, cached, missing = self._lookup(texts, persist)
+        encoded = self._encode([texts[i] for i in missing]) if missing else None
+        return self._assemble(keys, cached, missing, encoded)
+
+    async def aembed(self, texts: List[str], persist: Union[bool, List[bool]] = True) -> np.ndarray:
+        """
+        Async `embed`. With batching, waits on the batcher's future instead of
+        holding a CPU pool thread, so concurrent requests share forward passes.
+        """
+        if self.batcher is None:
+            return await run_cpu(self.embed, texts, persist)
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        keys, cached, missing = await run_io(self._lookup, texts, persist)
+        encoded = None
+        if missing:
+            encoded = await asyncio.wrap_future(self.batcher.submit([texts[i] for i in missing]))
+        return await run_io(self._assemble, keys, cached, missing, encoded)
+
+    def _lookup(
+        self,
+        texts: List[str],
+        persist: Union[bool, List[bool]] = True
+    ) -> Tuple[Optional[List[Optional[str]]], Dict[str, np.ndarray], List[int]]:
+        """Cache keys (None for transient texts), cached vectors and the indices of texts to encode."""
+        if isinstance(persist, bool):
+            persist = [persist] * len(texts)
+        if self.cache is None or not any(persist):
+            return None, {}, list(range(len(texts)))
+        keys = [EmbeddingCache.key(self.cache_key, text) if keep else None for text, keep in zip(texts, persist)]
+        cached = self.cache.get_many([key for key in keys if key is not None], self.dimension)
+        return keys, cached, [i for i, key in enumerate(keys) if key not in cached]
+
+    def _assemble(
+        self,
+        keys: Optional[List[str]],
+        cached: Dict[str, np.ndarray],
+        missing: List[int],
+        encoded: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """Store freshly encoded vectors and merge them with the cached ones in input order."""
+        if keys is None:
+            return encoded
+        if not missing:
+            return np.stack([cached[key] for key in keys])
+        self.cache.put_many((keys[i], vector) for i, vector in zip(missing, encoded) if keys[i] is not None)
+
+        vectors = np.empty((len(keys), encoded.shape[1]), dtype=np.float32)
+        for i, key in enumerate(keys):
+            if key in cached:
+                vectors[i] = cached[key]
+        vectors[missing] = encoded
+        return vectors
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode `texts`, through the batcher when enabled."""
+        if self.batcher is None:
+            record_embedding(len(texts))
+            return self._forward(texts)
+        return self.batcher.submit(texts).result()
+
+    def _forward(self, texts: List[str]) -> np.ndarray:
+        """One model forward pass over `texts`."""
+        with self._lock:
+            vectors = self.model.encode(
+                list(texts),
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        return np.asarray(vectors, dtype=np.float32)
+
+    # ── LangChain Embeddings interface ──
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed([text], persist=False)[0].tolist()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return (await self.aembed(texts)).tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed([text], persist=False))[0].tolist()
+
+
+_service: EmbeddingService = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Return the process-wide EmbeddingService, loading the model on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = EmbeddingService()
+    return _service
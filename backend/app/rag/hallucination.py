@@ -1,19 +1,35 @@
+import threading
 from typing import List, Dict, Any
 import numpy as np
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.utils.math import cosine_similarity
-from app.core.config import settings
+from app.rag.embeddings import get_embedding_service
 
 class HallucinationDetectorAgent:
     def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL_NAME)
+        self.embeddings = get_embedding_service()
         # Threshold as per design philosophy (can be tuned)
         self.similarity_threshold = 0.76 
 
-    def detect(self, answer: str, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def detect(
+        self,
+        answer: str,
+        documents: List[Dict[str, Any]],
+        document_embeddings: List[List[float]] = None,
+        cancel: threading.Event = None
+    ) -> Dict[str, Any]:
         """
         Splits answer into claims and verifies each against retrieved documents.
-        Returns dictionary with hallucination flag and list of unsupported claims.
+        Precomputed document embeddings are reused when provided. Setting
+        `cancel` (parallel verification found the answer trusted) skips the
+        embedding work not yet started; the result then has "cancelled": True.
+        Returns dictionary with hallucination flag, list of unsupported claims
+        and per-claim evidence:
+            "claims": [{
+                "text": str,
+                "score": float,         # best similarity against any chunk
+                "best_chunk": int,      # index into documents of that chunk
+                "evidence_count": int,  # chunks at or above the threshold
+                "supported": bool
+            }]
         """
         # 1. Claim Extraction - Simple sentence splitting
         # Filter out empty strings
@@ -22,7 +38,8 @@ class HallucinationDetectorAgent:
         if not claims:
             return {
                 "hallucination": False,
-                "unsupported_claims": []
+                "unsupported_claims": [],
+                "claims": []
             }
 
         # Extract text content from documents (handle both dict and object formats)
@@ -37,33 +54,57 @@ class HallucinationDetectorAgent:
             # If no documents retrieved, everything is technically unsupported/hallucination
             return {
                 "hallucination": True,
-                "unsupported_claims": claims
+                "unsupported_claims": claims,
+                "claims": [
+                    {"text": claim, "score": 0.0, "best_chunk": None, "evidence_count": 0, "supported": False}
+                    for claim in claims
+                ]
             }
 
         # 2. Claim Verification
-        # Embed all documents once for efficiency
-        doc_embeddings = self.embeddings.embed_documents(doc_texts)
-        
-        unsupported_claims = []
-        is_hallucination = False
+        # Embed all documents once for efficiency, unless already embedded upstream
+        if document_embeddings is not None and len(document_embeddings) == len(doc_texts):
+            doc_embeddings = np.asarray(document_embeddings, dtype=np.float32)
+        else:
+            doc_embeddings = self.embeddings.embed(doc_texts)
+
+        if cancel is not None and cancel.is_set():
+            return {"hallucination": False, "unsupported_claims": [], "claims": [], "cancelled": True}
+
+        # Embed all claims in a single batch
+        claim_embeddings = self.embeddings.embed(claims, persist=False)
+
+        # One claims x documents cosine similarity matrix
+        doc_embeddings = doc_embeddings / np.maximum(
+            np.linalg.norm(doc_embeddings, axis=1, keepdims=True), 1e-12
+        )
+        claim_embeddings = claim_embeddings / np.maximum(
+            np.linalg.norm(claim_embeddings, axis=1, keepdims=True), 1e-12
+        )
+        scores = claim_embeddings @ doc_embeddings.T
 
-        for claim in claims:
-            # Embed the single claim
-            claim_embedding = self.embeddings.embed_query(claim)
-            
-            # Calculate cosine similarity between claim and ALL docs
-            # result is [[score1, score2, ...]]
-            scores = cosine_similarity([claim_embedding], doc_embeddings)[0]
-            
-            # 3. Decision Logic
-            # Check if ANY document supports this claim with high similarity
-            best_score = float(np.max(scores))
-            
-            if best_score < self.similarity_threshold:
+        # 3. Decision Logic
+        # A claim is supported if ANY document matches it with high similarity
+        best_chunks = np.argmax(scores, axis=1)
+        best_scores = scores[np.arange(len(claims)), best_chunks]
+        evidence_counts = np.sum(scores >= self.similarity_threshold, axis=1)
+        supported = best_scores >= self.similarity_threshold
+
+        claim_results = []
+        unsupported_claims = []
+        for i, claim in enumerate(claims):
+            claim_results.append({
+                "text": claim,
+                "score": round(float(best_scores[i]), 3),
+                "best_chunk": int(best_chunks[i]),
+                "evidence_count": int(evidence_counts[i]),
+                "supported": bool(supported[i])
+            })
+            if not supported[i]:
                 unsupported_claims.append(claim)
-                is_hallucination = True
-        
+
         return {
-            "hallucination": is_hallucination,
-            "unsupported_claims": unsupported_claims
+            "hallucination": bool(unsupported_claims),
+            "unsupported_claims": unsupported_claims,
+            "claims": claim_results
         }
@@ -0,0 +1,114 @@
+"""
+Batched vector upserts for AXIOMAI.
+
+Shared by ingestion and knowledge refresh: upsert batches are sent
+concurrently on a small thread pool, each retried with exponential
+backoff, so network round-trips overlap with embedding work.
+"""
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import List, Dict, Any
+
+from app.rag.vector_store import VectorStore
+
+# Pinecone limits an upsert request to 1000 vectors and 2MB
+MAX_VECTORS_PER_REQUEST = 100
+MAX_BYTES_PER_REQUEST = 2 * 1024 * 1024
+
+
+def _estimate_bytes(vector: Dict[str, Any]) -> int:
+    """Rough serialized size of one vector record."""
+    metadata = json.dumps(vector.get("metadata", {}), default=str)
+    # values serialize to roughly 10-12 characters per float in JSON
+    return len(vector["id"]) + len(metadata) + 12 * len(vector["values"])
+
+
+def split_upsert_requests(
+    vectors: List[Dict[str, Any]],
+    max_vectors: int = MAX_VECTORS_PER_REQUEST,
+    max_bytes: int = MAX_BYTES_PER_REQUEST
+) -> List[List[Dict[str, Any]]]:
+    """Split vectors into requests bounded by count and approximate payload size."""
+    requests = []
+    current, current_bytes = [], 0
+    for vector in vectors:
+        size = _estimate_bytes(vector)
+        if current and (len(current) >= max_vectors or current_bytes + size > max_bytes):
+            requests.append(current)
+            current, current_bytes = [], 0
+        current.append(vector)
+        current_bytes += size
+    if current:
+        requests.append(current)
+    return requests
+
+
+class BatchUpserter:
+    """
+    Concurrent, retrying upserts into a VectorStore.
+
+    Usage:
+        upserter = BatchUpserter(store, max_workers=4)
+        future = upserter.submit(vectors)   # returns immediately
+        ...
+        upserter.close()                    # waits for in-flight batches
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        max_workers: int = 4,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5
+    ):
+        self.store = store
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="axiomai-upsert")
+        self._lock = threading.Lock()
+        self.upserted = 0
+        self.retries = 0
+
+    def submit(self, vectors: List[Dict[str, Any]]) -> Future:
+        """Queue one upsert request; the future resolves to the number written."""
+        return self._executor.submit(self._upsert_with_retry, vectors)
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> int:
+        """Upsert one request synchronously, with retries."""
+        return self._upsert_with_retry(vectors)
+
+    def upsert_all(self, vectors: List[Dict[str, Any]]) -> int:
+        """
+        Split vectors into size-bounded requests, send them concurrently and
+        wait for all of them. Raises the first failure after retries.
+        """
+        futures = [self.submit(request) for request in split_upsert_requests(vectors)]
+        wait(futures)
+        return sum(future.result() for future in futures)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _upsert_with_retry(self, vectors: List[Dict[str, Any]]) -> int:
+        attempt = 0
+        while True:
+            try:
+                written = self.store.upsert(vectors)
+                with self._lock:
+                    self.upserted += written
+                return written
+            except Exception:
+                if attempt >= self.max_retries:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                time.sleep(self.backoff_seconds * (2 ** attempt))
+                attempt += 1
@@ -0,0 +1,274 @@
+"""
+Lexical (BM25) Index for AXIOMAI.
+
+A keyword index over the same chunks as the vector store, built at
+ingestion time. Dense embeddings tend to blur exact technical tokens
+("IPSec", "TCP/IP", "OSI"); BM25 matches them literally, and the retriever
+fuses both rankings (see RetrieverAgent).
+
+On disk the index is a compact inverted file:
+    lexicon.json  — sorted terms and chunk ids
+    postings.npz  — per-term offsets into flat int32 chunk-row / uint16
+                    term-frequency arrays, plus per-chunk lengths
+A query touches only the postings of its own terms.
+
+Ingestion runs in its own process, so each API worker notices a newer
+postings file (by mtime) on its next search and reloads it.
+"""
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from app.core.config import settings
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Question words and glue that carry no lexical signal
+STOPWORDS = frozenset(
+    "a an and are as at be by can does do for from how in is it of on or "
+    "that the this to was what when where which who why with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens, stopwords removed ("TCP/IP" → tcp, ip)."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over chunk ids.
+
+    Reads use the compiled arrays; `update`/`remove` edit a per-chunk term
+    count view that is recompiled on the next search or `save()`.
+    """
+
+    LEXICON_FILE = "lexicon.json"
+    POSTINGS_FILE = "postings.npz"
+
+    def __init__(self, path: str = None, k1: float = 1.2, b: float = 0.75):
+        self.path = path or settings.LEXICAL_INDEX_DIR
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._terms: Dict[str, int] = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._rows = np.zeros(0, dtype=np.int32)
+        self._frequencies = np.zeros(0, dtype=np.uint16)
+        self._lengths = np.zeros(0, dtype=np.int32)
+        # id → term counts; only materialized once the index is edited
+        self._forward: Optional[Dict[str, Counter]] = None
+        self._dirty = False
+        # (mtime_ns, size) of the files last loaded or saved
+        self._signature = None
+
+        self._load()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._reload_if_changed()
+            return len(self._forward) if self._forward is not None else len(self._ids)
+
+    def contains(self, ids: Iterable[str]) -> bool:
+        """True if every id is indexed."""
+        with self._lock:
+            known = self._forward.keys() if self._forward is not None else set(self._ids)
+            return all(vector_id in known for vector_id in ids)
+
+    # ── Search ──
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """
+        Return up to top_k (chunk id, BM25 score) pairs, best first.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            if self._dirty:
+                self._compile()
+            ids, terms, offsets = self._ids, self._terms, self._offsets
+            rows, frequencies, lengths = self._rows, self._frequencies, self._lengths
+
+        if not ids or top_k <= 0:
+            return []
+
+        n = len(ids)
+        average_length = max(float(lengths.mean()), 1.0)
+        hit_rows, hit_scores = [], []
+        for term in set(tokenize(query)):
+            term_index = terms.get(term)
+            if term_index is None:
+                continue
+            start, end = offsets[term_index], offsets[term_index + 1]
+            df = end - start
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            term_rows = rows[start:end]
+            tf = frequencies[start:end].astype(np.float32)
+            norm = self.k1 * (1 - self.b + self.b * lengths[term_rows] / average_length)
+            hit_rows.append(term_rows)
+            hit_scores.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+        if not hit_rows:
+            return []
+
+        candidates, inverse = np.unique(np.concatenate(hit_rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(hit_scores))
+        if top_k < len(scores):
+            top = np.argpartition(-scores, top_k)[:top_k]
+            order = top[np.argsort(-scores[top])]
+        else:
+            order = np.argsort(-scores)
+        return [(ids[int(candidates[i])], float(scores[i])) for i in order]
+
+    # ── Editing ──
+
+    def update(self, documents: Dict[str, str]) -> None:
+        """Index or re-index chunks, given as {chunk id: text}."""
+        with self._lock:
+            forward = self._materialize()
+            for vector_id, text in documents.items():
+                forward[vector_id] = Counter(tokenize(text))
+            self._dirty = True
+
+    def remove(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            forward = self._materialize()
+            for vector_id in ids:
+                forward.pop(vector_id, None)
+            self._dirty = True
+
+    def save(self) -> None:
+        """Compile pending edits and write the index atomically."""
+        with self._lock:
+            if self._dirty:
+                self._compile()
+            os.makedirs(self.path, exist_ok=True)
+            self._atomic_write(
+                self.LEXICON_FILE,
+                lambda f: f.write(json.dumps({
+                    "terms": sorted(self._terms, key=self._terms.get),
+                    "ids": self._ids
+                }).encode("utf-8"))
+            )
+            self._atomic_write(
+                self.POSTINGS_FILE,
+                lambda f: np.savez(
+                    f,
+                    offsets=self._offsets,
+                    rows=self._rows,
+                    frequencies=self._frequencies,
+                    lengths=self._lengths
+                )
+            )
+            self._signature = self._disk_signature()
+
+    def reload(self) -> bool:
+        """Load the index from disk if another process saved a newer one; True if reloaded."""
+        with self._lock:
+            return self._reload_if_changed()
+
+    # ── Internals ──
+
+    def _disk_signature(self) -> Optional[Tuple]:
+        """Identifies the saved index files; postings are written last (lock held)."""
+        try:
+            lexicon = os.stat(os.path.join(self.path, self.LEXICON_FILE))
+            postings = os.stat(os.path.join(self.path, self.POSTINGS_FILE))
+        except OSError:
+            return None
+        return (lexicon.st_mtime_ns, lexicon.st_size, postings.st_mtime_ns, postings.st_size)
+
+    def _reload_if_changed(self) -> bool:
+        """Reload after another process saved; unsaved local edits win (lock held)."""
+        if self._dirty:
+            return False
+        signature = self._disk_signature()
+        if signature is None or signature == self._signature:
+            return False
+        self._forward = None
+        self._load()
+        return True
+
+    def _materialize(self) -> Dict[str, Counter]:
+        """Rebuild per-chunk term counts from the postings (lock held)."""
+        if self._forward is None:
+            forward = {vector_id: Counter() for vector_id in self._ids}
+            for term, term_index in self._terms.items():
+                start, end = self._offsets[term_index], self._offsets[term_index + 1]
+                for row, tf in zip(self._rows[start:end], self._frequencies[start:end]):
+                    forward[self._ids[row]][term] = int(tf)
+            self._forward = forward
+        return self._forward
+
+    def _compile(self) -> None:
+        """Turn the per-chunk term counts into sorted postings (lock held)."""
+        forward = self._forward or {}
+        ids = list(forward)
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for row, vector_id in enumerate(ids):
+            for term, tf in forward[vector_id].items():
+                postings.setdefault(term, []).append((row, min(tf, 65535)))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(postings[term])
+        flat = [entry for term in terms for entry in postings[term]]
+
+        self._ids = ids
+        self._terms = {term: i for i, term in enumerate(terms)}
+        self._offsets = offsets
+        self._rows = np.fromiter((row for row, _ in flat), dtype=np.int32, count=len(flat))
+        self._frequencies = np.fromiter((tf for _, tf in flat), dtype=np.uint16, count=len(flat))
+        self._lengths = np.fromiter(
+            (sum(forward[vector_id].values()) for vector_id in ids), dtype=np.int32, count=len(ids)
+        )
+        self._dirty = False
+
+    def _load(self) -> None:
+        signature = self._disk_signature()
+        if signature is None:
+            return
+
+        with open(os.path.join(self.path, self.LEXICON_FILE), encoding="utf-8") as f:
+            lexicon = json.load(f)
+        with np.load(os.path.join(self.path, self.POSTINGS_FILE)) as data:
+            offsets, rows = data["offsets"], data["rows"]
+            frequencies, lengths = data["frequencies"], data["lengths"]
+        if self._disk_signature() != signature or len(lengths) != len(lexicon["ids"]):
+            return  # caught mid-save; the next check loads the finished files
+
+        self._ids = lexicon["ids"]
+        self._terms = {term: i for i, term in enumerate(lexicon["terms"])}
+        self._offsets, self._rows = offsets, rows
+        self._frequencies, self._lengths = frequencies, lengths
+        self._signature = signature
+
+    def _atomic_write(self, filename: str, write) -> None:
+        final_path = os.path.join(self.path, filename)
+        tmp_path = final_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, final_path)
+
+
+# ── Factory ──
+
+_index: BM25Index = None
+_index_lock = threading.Lock()
+
+
+def get_lexical_index() -> BM25Index:
+    """Return the process-wide BM25 index (empty if none has been built yet)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = BM25Index()
+    return _index
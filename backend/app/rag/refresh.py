@@ -4,11 +4,17 @@ Knowledge Refresh Agent for AXIOMAI.
 This agent handles re-indexing of documents in the vector database
 when knowledge is detected as stale or causing hallucinations.
 """
-from datetime import datetime
-from typing import List, Dict, Any
-from langchain_huggingface import HuggingFaceEmbeddings
-from pinecone import Pinecone
+import time
+from typing import List, Dict, Any, Callable, Iterable
 from app.core.config import settings
+from app.core.log import get_logger
+from app.rag.embedding_cache import content_hash
+from app.rag.embeddings import get_embedding_service
+from app.rag.indexing import BatchUpserter
+from app.rag.lexical import get_lexical_index
+from app.rag.vector_store import TEXT_KEY, get_vector_store
+
+logger = get_logger("refresh")
 
 
 class KnowledgeRefreshAgent:
@@ -20,15 +26,32 @@ class KnowledgeRefreshAgent:
     - Documents are stale
     
     Decides between partial re-index (1-2 docs) or full re-index (>2 docs).
+    Documents are embedded in batches; a full re-index splits upserts into
+    size-bounded requests sent concurrently, with retries and backoff.
+    Re-indexed chunks get a fresh "content_hash" and, with hybrid search,
+    are re-tokenized in the lexical index.
     """
     
     PARTIAL_THRESHOLD = 2  # Documents affected threshold for partial vs full refresh
     
     def __init__(self):
-        """Initialize embeddings and Pinecone connection."""
-        self.embeddings = HuggingFaceEmbeddings(model_name=settings.EMBEDDING_MODEL_NAME)
-        self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
-        self.index = self.pc.Index(settings.PINECONE_INDEX_NAME)
+        """Initialize embeddings and the vector store connection."""
+        self.embeddings = get_embedding_service()
+        self.store = get_vector_store()
+        self.lexical = get_lexical_index() if settings.HYBRID_SEARCH_ENABLED else None
+        self.upserter = BatchUpserter(
+            self.store,
+            max_workers=settings.UPSERT_CONCURRENCY,
+            max_retries=settings.UPSERT_MAX_RETRIES
+        )
+        self._listeners: List[Callable[[Iterable[str]], Any]] = []
+
+    def add_listener(self, callback: Callable[[Iterable[str]], Any]) -> None:
+        """
+        Register a callback invoked with the ids of re-indexed documents
+        after every refresh (e.g. to invalidate cached answers).
+        """
+        self._listeners.append(callback)
     
     def refresh(self, reason: str, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -45,15 +68,19 @@ class KnowledgeRefreshAgent:
             {
                 "refresh_type": "partial" | "full",
                 "updated_documents": int,
-                "status": "completed"
+                "status": "completed",
+                "timings": {"embed_ms": float, "upsert_ms": float, "total_ms": float}
             }
         """
+        started = time.perf_counter()
+        timings = {"embed_ms": 0.0, "upsert_ms": 0.0}
         if not documents:
             self._log(reason, "none", 0)
             return {
                 "refresh_type": "none",
                 "updated_documents": 0,
-                "status": "completed"
+                "status": "completed",
+                "timings": {**timings, "total_ms": 0.0}
             }
         
         # Decide refresh type based on document count
@@ -61,89 +88,118 @@ class KnowledgeRefreshAgent:
         
         # Perform the appropriate refresh
         if refresh_type == "partial":
-            updated_count = self._partial_reindex(documents)
+            updated_count = self._partial_reindex(documents, timings)
         else:
-            updated_count = self._full_reindex(documents)
+            updated_count = self._full_reindex(documents, timings)
+        self._reindex_lexical(documents)
+        timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
         
         # Log the refresh activity
-        self._log(reason, refresh_type, updated_count)
+        self._log(reason, refresh_type, updated_count, timings)
+
+        # Notify dependents that these documents changed
+        refreshed_ids = [doc.get("id") for doc in documents if doc.get("id") and doc.get("content")]
+        self._notify(refreshed_ids)
         
         return {
             "refresh_type": refresh_type,
             "updated_documents": updated_count,
-            "status": "completed"
+            "status": "completed",
+            "timings": timings
         }
     
-    def _partial_reindex(self, documents: List[Dict[str, Any]]) -> int:
+    def _partial_reindex(self, documents: List[Dict[str, Any]], timings: Dict[str, float]) -> int:
         """
-        Re-embed and update only the affected documents.
+        Re-embed and update only the affected documents in a single request.
         
         Args:
             documents: List of documents to re-index
+            timings: Per-phase timings, updated in place
             
         Returns:
             Number of documents updated
         """
-        updated = 0
-        for doc in documents:
-            doc_id = doc.get("id")
-            content = doc.get("content", "")
-            metadata = doc.get("metadata", {})
-            
-            if not doc_id or not content:
-                continue
-            
-            # Generate new embedding
-            embedding = self.embeddings.embed_query(content)
-            
-            # Upsert to Pinecone (update if exists, insert if new)
-            self.index.upsert(
-                vectors=[{
-                    "id": doc_id,
-                    "values": embedding,
-                    "metadata": {**metadata, "content": content}
-                }]
-            )
-            updated += 1
+        vectors = self._embed_documents(documents, timings)
+        
+        started = time.perf_counter()
+        updated = self.upserter.upsert(vectors) if vectors else 0
+        self.store.flush()
+        timings["upsert_ms"] = round((time.perf_counter() - started) * 1000, 1)
         
         return updated
     
-    def _full_reindex(self, documents: List[Dict[str, Any]]) -> int:
+    def _full_reindex(self, documents: List[Dict[str, Any]], timings: Dict[str, float]) -> int:
         """
-        Re-embed and rebuild all provided documents in the vector database.
+        Re-embed and rebuild all provided documents in the vector database,
+        sending size-bounded upsert requests concurrently.
         
         Args:
             documents: List of documents to re-index
+            timings: Per-phase timings, updated in place
             
         Returns:
             Number of documents updated
         """
-        vectors_to_upsert = []
+        vectors = self._embed_documents(documents, timings)
         
-        for doc in documents:
-            doc_id = doc.get("id")
-            content = doc.get("content", "")
-            metadata = doc.get("metadata", {})
-            
-            if not doc_id or not content:
-                continue
-            
-            # Generate new embedding
-            embedding = self.embeddings.embed_query(content)
-            
-            vectors_to_upsert.append({
-                "id": doc_id,
-                "values": embedding,
-                "metadata": {**metadata, "content": content}
-            })
+        started = time.perf_counter()
+        updated = self.upserter.upsert_all(vectors) if vectors else 0
+        self.store.flush()
+        timings["upsert_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        
+        return updated
+    
+    def _embed_documents(self, documents: List[Dict[str, Any]], timings: Dict[str, float]) -> List[Dict[str, Any]]:
+        """
+        Embed documents in batches of settings.EMBED_BATCH_SIZE.
+        Documents without an id or content are skipped.
+        
+        Returns:
+            Vector records ready to upsert
+        """
+        started = time.perf_counter()
+        valid = [doc for doc in documents if doc.get("id") and doc.get("content")]
         
-        # Batch upsert for efficiency
-        if vectors_to_upsert:
-            self.index.upsert(vectors=vectors_to_upsert)
+        vectors = []
+        batch_size = max(settings.EMBED_BATCH_SIZE, 1)
+        for start in range(0, len(valid), batch_size):
+            batch = valid[start:start + batch_size]
+            embeddings = self.embeddings.embed([doc["content"] for doc in batch])
+            for doc, embedding in zip(batch, embeddings):
+                vectors.append({
+                    "id": doc["id"],
+                    "values": embedding.tolist(),
+                    "metadata": {
+                        **doc.get("metadata", {}),
+                        TEXT_KEY: doc["content"],
+                        # The watcher compares against this; it now matches the indexed text
+                        "content_hash": content_hash(doc["content"])
+                    }
+                })
         
-        return len(vectors_to_upsert)
+        timings["embed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return vectors
     
-    def _log(self, reason: str, refresh_type: str, doc_count: int) -> None:
+    def _reindex_lexical(self, documents: List[Dict[str, Any]]) -> None:
+        """Re-tokenize refreshed chunks so BM25 matches the text now in the vector store."""
+        if self.lexical is None:
+            return
+        texts = {doc["id"]: doc["content"] for doc in documents if doc.get("id") and doc.get("content")}
+        if texts:
+            self.lexical.update(texts)
+            self.lexical.save()
+
+    def _notify(self, doc_ids: List[str]) -> None:
+        """Call every registered listener; a failing listener never fails the refresh."""
+        if not doc_ids:
+            return
+        for callback in self._listeners:
+            try:
+                callback(doc_ids)
+            except Exception as e:
+                logger.warning("refresh listener failed", extra={"fields": {"error": str(e)}})
+
+    def _log(self, reason: str, refresh_type: str, doc_count: int, timings: Dict[str, float] = None) -> None:
         """
         Log refresh activity for traceability.
         
@@ -151,13 +207,11 @@ class KnowledgeRefreshAgent:
             reason: Why refresh was triggered
             refresh_type: "partial", "full", or "none"
             doc_count: Number of documents updated
+            timings: Optional per-phase timings in milliseconds
         """
-        timestamp = datetime.now().isoformat()
-        log_entry = (
-            f"[KNOWLEDGE REFRESH] "
-            f"Timestamp: {timestamp} | "
-            f"Reason: {reason} | "
-            f"Type: {refresh_type} | "
-            f"Documents Updated: {doc_count}"
-        )
-        print(log_entry)
+        logger.info("knowledge refresh", extra={"fields": {
+            "reason": reason,
+            "refresh_type": refresh_type,
+            "documents_updated": doc_count,
+            **(timings or {})
+        }})
@@ -0,0 +1,380 @@
+"""
+Background Knowledge-Refresh Queue for AXIOMAI.
+
+Refreshes requested by the graph are written to a SQLite job table and
+drained by a `RefreshWorker` thread, so re-embedding and upserting never
+run inside a user's request. One row per chunk id: a second request for
+a chunk that is already queued replaces its content and counts as
+coalesced. Failed jobs are retried with exponential backoff
+(REFRESH_RETRY_BASE_SECONDS doubling up to REFRESH_RETRY_MAX_SECONDS) and
+parked as "failed" after REFRESH_MAX_ATTEMPTS.
+
+Every pre-forked API worker runs its own worker thread against the same
+file; jobs are leased for REFRESH_LEASE_SECONDS when claimed, so each is
+processed by one of them, and a lease left by a crashed process expires.
+Each completed chunk id is also appended to a `refreshed` log that every
+worker polls, so all processes drop cached answers built from the old
+content, not only the one that ran the job. Chunks re-indexed elsewhere
+(inline refreshes, ingest scripts) are logged with `mark_refreshed`; with
+the queue disabled each process still runs a worker that only follows the
+log.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.log import get_logger
+
+logger = get_logger("refresh")
+
+# Job latencies kept for the percentiles in stats()
+LATENCY_WINDOW = 1000
+# How long completed chunk ids stay in the refreshed log for other workers to see
+REFRESHED_RETENTION_SECONDS = 3600
+
+
+class RefreshQueue:
+    """Persistent, coalescing job table of chunks waiting to be re-indexed."""
+
+    def __init__(
+        self,
+        path: str = None,
+        max_attempts: int = None,
+        retry_base_seconds: float = None,
+        retry_max_seconds: float = None,
+        lease_seconds: float = None
+    ):
+        self.path = path or settings.REFRESH_QUEUE_PATH
+        self.max_attempts = max_attempts or settings.REFRESH_MAX_ATTEMPTS
+        self.retry_base_seconds = retry_base_seconds or settings.REFRESH_RETRY_BASE_SECONDS
+        self.retry_max_seconds = retry_max_seconds or settings.REFRESH_RETRY_MAX_SECONDS
+        self.lease_seconds = lease_seconds or settings.REFRESH_LEASE_SECONDS
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection = None
+        self._pid = None
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.counts = {"enqueued": 0, "coalesced": 0, "completed": 0, "retried": 0, "failed": 0}
+
+    def enqueue(self, reason: str, documents: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Queue documents ({"id", "content", "metadata"}) for re-indexing.
+
+        Returns:
+            {"queued": new jobs, "coalesced": requests merged into a queued job}
+        """
+        documents = [doc for doc in documents if doc.get("id") and doc.get("content")]
+        if not documents:
+            return {"queued": 0, "coalesced": 0}
+        now = time.time()
+        ids = [doc["id"] for doc in documents]
+        with self._lock:
+            with self._transaction() as conn:
+                placeholders = ",".join("?" * len(ids))
+                queued = {
+                    row[0] for row in conn.execute(
+                        f"SELECT chunk_id FROM jobs WHERE status = 'pending' AND chunk_id IN ({placeholders})", ids
+                    )
+                }
+                # A queued chunk keeps its place, attempts and backoff; a failed one starts over
+                conn.executemany(
+                    "INSERT INTO jobs (chunk_id, document, reason, version, attempts, enqueued_at, "
+                    "next_attempt_at, leased_until, status) VALUES (?, ?, ?, 1, 0, ?, ?, 0, 'pending') "
+                    "ON CONFLICT(chunk_id) DO UPDATE SET "
+                    "document = excluded.document, reason = excluded.reason, version = jobs.version + 1, "
+                    "attempts = CASE WHEN jobs.status = 'failed' THEN 0 ELSE jobs.attempts END, "
+                    "enqueued_at = CASE WHEN jobs.status = 'failed' THEN excluded.enqueued_at ELSE jobs.enqueued_at END, "
+                    "next_attempt_at = CASE WHEN jobs.status = 'failed' THEN excluded.next_attempt_at "
+                    "ELSE jobs.next_attempt_at END, "
+                    "status = 'pending', last_error = NULL",
+                    [(doc["id"], json.dumps(doc, default=str), reason, now, now) for doc in documents]
+                )
+            coalesced = sum(1 for chunk_id in ids if chunk_id in queued)
+            self.counts["enqueued"] += len(ids) - coalesced
+            self.counts["coalesced"] += coalesced
+        metrics.REFRESH_JOBS.inc(len(ids) - coalesced, outcome="enqueued")
+        metrics.REFRESH_JOBS.inc(coalesced, outcome="coalesced")
+        return {"queued": len(ids) - coalesced, "coalesced": coalesced}
+
+    def claim(self, limit: int) -> List[Dict[str, Any]]:
+        """Lease up to `limit` due jobs, oldest first."""
+        now = time.time()
+        with self._lock:
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    "SELECT chunk_id, document, reason, version, attempts, enqueued_at FROM jobs "
+                    "WHERE status = 'pending' AND next_attempt_at <= ? AND leased_until <= ? "
+                    "ORDER BY enqueued_at LIMIT ?",
+                    (now, now, limit)
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE jobs SET leased_until = ? WHERE chunk_id = ?",
+                    [(now + self.lease_seconds, row[0]) for row in rows]
+                )
+        return [
+            {
+                "chunk_id": chunk_id,
+                "document": json.loads(document),
+                "reason": reason,
+                "version": version,
+                "attempts": attempts,
+                "enqueued_at": enqueued_at
+            }
+            for chunk_id, document, reason, version, attempts, enqueued_at in rows
+        ]
+
+    def complete(self, jobs: List[Dict[str, Any]]) -> None:
+        """Drop finished jobs; one re-queued while it ran stays queued with its new content."""
+        now = time.time()
+        with self._lock:
+            with self._transaction() as conn:
+                for job in jobs:
+                    deleted = conn.execute(
+                        "DELETE FROM jobs WHERE chunk_id = ? AND version = ?", (job["chunk_id"], job["version"])
+                    ).rowcount
+                    if not deleted:
+                        conn.execute("UPDATE jobs SET leased_until = 0 WHERE chunk_id = ?", (job["chunk_id"],))
+                self._log_refreshed(conn, [job["chunk_id"] for job in jobs], now)
+            for job in jobs:
+                self._latencies.append(now - job["enqueued_at"])
+            self.counts["completed"] += len(jobs)
+        for job in jobs:
+            metrics.REFRESH_JOB_SECONDS.observe(now - job["enqueued_at"])
+        metrics.REFRESH_JOBS.inc(len(jobs), outcome="completed")
+
+    def fail(self, jobs: List[Dict[str, Any]], error: str) -> None:
+        """Schedule a backed-off retry, or park the job as failed after max_attempts."""
+        now = time.time()
+        retried = failed = 0
+        with self._lock:
+            with self._transaction() as conn:
+                for job in jobs:
+                    attempts = job["attempts"] + 1
+                    if attempts >= self.max_attempts:
+                        status, next_attempt_at = "failed", now
+                        failed += 1
+                    else:
+                        delay = min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+                        status, next_attempt_at = "pending", now + delay
+                        retried += 1
+                    conn.execute(
+                        "UPDATE jobs SET attempts = ?, status = ?, next_attempt_at = ?, leased_until = 0, "
+                        "last_error = ? WHERE chunk_id = ? AND version = ?",
+                        (attempts, status, next_attempt_at, error, job["chunk_id"], job["version"])
+                    )
+                    # Re-queued while it ran: retry the new content now
+                    conn.execute(
+                        "UPDATE jobs SET leased_until = 0 WHERE chunk_id = ? AND version != ?",
+                        (job["chunk_id"], job["version"])
+                    )
+            self.counts["retried"] += retried
+            self.counts["failed"] += failed
+        metrics.REFRESH_JOBS.inc(retried, outcome="retried")
+        metrics.REFRESH_JOBS.inc(failed, outcome="failed")
+
+    def mark_refreshed(self, chunk_ids: List[str]) -> None:
+        """Log chunks re-indexed or deleted outside the queue so every worker evicts their answers."""
+        chunk_ids = [chunk_id for chunk_id in chunk_ids if chunk_id]
+        if not chunk_ids:
+            return
+        with self._lock:
+            with self._transaction() as conn:
+                self._log_refreshed(conn, chunk_ids, time.time())
+
+    def refreshed_since(self, seq: int) -> Tuple[int, List[str]]:
+        """
+        Chunk ids re-indexed by any worker after log position `seq`.
+
+        Returns:
+            (latest position, chunk ids); pass the position back on the next call
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT seq, chunk_id FROM refreshed WHERE seq > ? ORDER BY seq", (seq,)
+            ).fetchall()
+        if not rows:
+            return seq, []
+        return rows[-1][0], [chunk_id for _, chunk_id in rows]
+
+    def refreshed_position(self) -> int:
+        """Current end of the refreshed log."""
+        with self._lock:
+            return self._connection().execute("SELECT COALESCE(MAX(seq), 0) FROM refreshed").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth (all workers) and job latency (this worker's completions)."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            depth = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            in_flight = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'pending' AND leased_until > ?", (now,)
+            ).fetchone()[0]
+            oldest = conn.execute("SELECT MIN(enqueued_at) FROM jobs WHERE status = 'pending'").fetchone()[0]
+            latencies = sorted(self._latencies)
+            counts = dict(self.counts)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 2)
+
+        return {
+            "pending": depth.get("pending", 0),
+            "in_flight": in_flight,
+            "failed": depth.get("failed", 0),
+            "oldest_pending_s": round(now - oldest, 1) if oldest is not None else None,
+            "job_latency_p50_s": percentile(0.50),
+            "job_latency_p95_s": percentile(0.95),
+            # This worker's job outcomes since start
+            "jobs": counts
+        }
+
+    @staticmethod
+    def _log_refreshed(conn: sqlite3.Connection, chunk_ids: List[str], now: float) -> None:
+        """Append to the refreshed log and prune entries past retention (in a transaction)."""
+        conn.executemany(
+            "INSERT INTO refreshed (chunk_id, refreshed_at) VALUES (?, ?)",
+            [(chunk_id, now) for chunk_id in chunk_ids]
+        )
+        conn.execute("DELETE FROM refreshed WHERE refreshed_at < ?", (now - REFRESHED_RETENTION_SECONDS,))
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction, taken up front so concurrent workers serialize (lock held)."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open lazily, and again after a fork: connections must not cross processes (lock held)."""
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit; writes go through _transaction
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "chunk_id TEXT PRIMARY KEY, document TEXT NOT NULL, reason TEXT, "
+                "version INTEGER NOT NULL, attempts INTEGER NOT NULL, enqueued_at REAL NOT NULL, "
+                "next_attempt_at REAL NOT NULL, leased_until REAL NOT NULL, "
+                "status TEXT NOT NULL, last_error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, next_attempt_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS refreshed ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, chunk_id TEXT NOT NULL, refreshed_at REAL NOT NULL)"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+
+class RefreshWorker:
+    """
+    Daemon thread that drains a RefreshQueue through `refresh(reason, documents)`
+    and passes chunk ids re-indexed by any worker to `on_refreshed(chunk_ids)`.
+    With `refresh=None` it only follows the refreshed log.
+    """
+
+    def __init__(
+        self,
+        queue: RefreshQueue,
+        refresh: Optional[Callable[[str, List[Dict[str, Any]]], Any]],
+        on_refreshed: Callable[[List[str]], Any] = None,
+        batch_size: int = None,
+        poll_seconds: float = None
+    ):
+        self.queue = queue
+        self.refresh = refresh
+        self.on_refreshed = on_refreshed
+        self.batch_size = batch_size or settings.REFRESH_QUEUE_BATCH_SIZE
+        self.poll_seconds = poll_seconds or settings.REFRESH_POLL_SECONDS
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._seq = 0
+
+    def start(self) -> None:
+        """Start the thread once per process (again in a forked child)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name="axiomai-refresh", daemon=True).start()
+
+    def wake(self) -> None:
+        """Check the queue now instead of at the next poll."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        try:
+            # A new process has nothing cached from before it started
+            self._seq = self.queue.refreshed_position()
+        except Exception as e:
+            logger.warning("refresh queue unavailable", extra={"fields": {"error": str(e)}})
+        while True:
+            self._broadcast()
+            jobs = []
+            if self.refresh is not None:
+                try:
+                    jobs = self.queue.claim(self.batch_size)
+                except Exception as e:
+                    logger.warning("refresh queue unavailable", extra={"fields": {"error": str(e)}})
+            if not jobs:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+            jobs.sort(key=lambda job: job["reason"] or "")
+            for reason, group in groupby(jobs, key=lambda job: job["reason"] or ""):
+                self._process(reason, list(group))
+
+    def _broadcast(self) -> None:
+        """Hand chunk ids re-indexed by any worker since the last check to on_refreshed."""
+        if self.on_refreshed is None:
+            return
+        try:
+            self._seq, chunk_ids = self.queue.refreshed_since(self._seq)
+            if chunk_ids:
+                self.on_refreshed(chunk_ids)
+        except Exception as e:
+            logger.warning("refresh broadcast failed", extra={"fields": {"error": str(e)}})
+
+    def _process(self, reason: str, jobs: List[Dict[str, Any]]) -> None:
+        try:
+            self.refresh(reason, [job["document"] for job in jobs])
+        except Exception as e:
+            logger.warning("refresh job failed", extra={"fields": {"jobs": len(jobs), "error": str(e)}})
+            self.queue.fail(jobs, str(e))
+            return
+        self.queue.complete(jobs)
+
+
+_queue: RefreshQueue = None
+_queue_lock = threading.Lock()
+
+
+def get_refresh_queue() -> RefreshQueue:
+    """Return the process-wide refresh queue."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = RefreshQueue()
+    return _queue
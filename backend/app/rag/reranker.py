@@ -0,0 +1,96 @@
+"""
+Reranker Agent for AXIOMAI.
+
+Sits between retrieval and generation: the retriever over-fetches
+candidates, a CPU cross-encoder (BGE reranker) scores each (query, chunk)
+pair, and only the best few chunks are passed to the generator. Fewer,
+better chunks mean shorter prompts and fewer untrusted-answer loops.
+"""
+import threading
+import time
+from typing import List, Dict, Any
+
+import numpy as np
+from app.core.config import settings
+
+
+class RerankerAgent:
+    """
+    Cross-encoder reranker with a latency cap.
+
+    Candidates are scored in batches, in retrieval order. If the latency
+    budget runs out, the unscored tail keeps its retrieval order behind the
+    scored candidates, so the cap degrades quality gracefully.
+    """
+
+    def __init__(self):
+        # Deferred: importing sentence_transformers pulls in torch
+        from sentence_transformers import CrossEncoder
+
+        self.model = CrossEncoder(settings.RERANKER_MODEL_NAME, device="cpu", max_length=512)
+        self.batch_size = settings.RERANK_BATCH_SIZE
+        self.max_latency_ms = settings.RERANK_MAX_LATENCY_MS
+        self._lock = threading.Lock()
+
+    def rerank(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]],
+        document_embeddings: List[List[float]] = None,
+        top_n: int = None
+    ) -> Dict[str, Any]:
+        """
+        Reorder retrieved documents by cross-encoder relevance and keep the best.
+
+        Args:
+            query: User question string
+            documents: Retrieved chunks, best vector match first
+            document_embeddings: Optional vectors aligned with documents;
+                                 kept aligned with the reranked output
+            top_n: Chunks to keep (default: settings.RERANK_TOP_N)
+
+        Returns:
+            {
+                "documents": [...],             # each with "rerank_score" when scored
+                "document_embeddings": [...],
+                "scored": int,                  # candidates scored before the cap
+                "latency_ms": float
+            }
+        """
+        top_n = top_n or settings.RERANK_TOP_N
+        started = time.perf_counter()
+        if not documents:
+            return {"documents": [], "document_embeddings": [], "scored": 0, "latency_ms": 0.0}
+
+        scores = []
+        for start in range(0, len(documents), self.batch_size):
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if scores and elapsed_ms >= self.max_latency_ms:
+                break
+            pairs = [(query, doc.get("content", "")) for doc in documents[start:start + self.batch_size]]
+            with self._lock:
+                batch_scores = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+            scores.extend(float(score) for score in np.asarray(batch_scores).reshape(-1))
+
+        scored = len(scores)
+        # Scored candidates by relevance, then the unscored tail in retrieval order
+        order = sorted(range(scored), key=lambda i: scores[i], reverse=True) + list(range(scored, len(documents)))
+        order = order[:top_n]
+
+        reranked = []
+        for i in order:
+            doc = dict(documents[i])
+            if i < scored:
+                doc["rerank_score"] = round(scores[i], 4)
+            reranked.append(doc)
+
+        embeddings = []
+        if document_embeddings is not None and len(document_embeddings) == len(documents):
+            embeddings = [document_embeddings[i] for i in order]
+
+        return {
+            "documents": reranked,
+            "document_embeddings": embeddings,
+            "scored": scored,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
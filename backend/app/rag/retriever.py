@@ -1,64 +1,163 @@
-import os
 from typing import List, Dict, Any
 
-# Fix Windows OSError 1455 by disabling symlinks, safetensors aggressive usage, and limiting threads
-os.environ["HF_HUB_DISABLE_SYMLINKS_WARNING"] = "1"
-os.environ["SAFETENSORS_FAST_GPU"] = "0"
-os.environ["OMP_NUM_THREADS"] = "1"
-os.environ["TOKENIZERS_PARALLELISM"] = "false"
-
-import torch
-
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_pinecone import PineconeVectorStore
+import numpy as np
 from app.core.config import settings
+from app.core.executors import run_io
+from app.rag.embeddings import get_embedding_service
+from app.rag.lexical import get_lexical_index
+from app.rag.vector_store import TEXT_KEY, _matches_filter, get_vector_store
 
 class RetrieverAgent:
     def __init__(self):
-        # Fix for Windows OSError 1455 (Paging file too small): Force CPU and limit thread memory
-        # We pass 'use_safetensors': False to force standard PyTorch weight loading instead of mmap
-        # This bypasses the Windows paging file memory overload (OS Error 1455)
-        model_kwargs = {
-            'device': 'cpu',
-            'trust_remote_code': True
-        }
-        encode_kwargs = {
-            'normalize_embeddings': True
-        }
-        
-        # Override the underlying transformer to force PyTorch binary loading
-        os.environ['HF_HUB_ENABLE_HF_TRANSFER'] = '0'
-        
-        # Force sentence-transformers to avoid safetensors if passing `model_kwargs` doesn't stick
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=settings.EMBEDDING_MODEL_NAME,
-            model_kwargs=model_kwargs,
-            encode_kwargs=encode_kwargs
-        )
-        # HuggingFace uses sentence-transformers beneath. 
-        # Safetensors mmap is failing. We can try deleting the .safetensors file in the cache, or bypass it.
-        self.vectorstore = PineconeVectorStore(
-            index_name=settings.PINECONE_INDEX_NAME,
-            embedding=self.embeddings,
-            pinecone_api_key=settings.PINECONE_API_KEY
-        )
+        # Shared process-wide model; see app/rag/embeddings.py
+        self.embeddings = get_embedding_service()
+        # Pinecone or local index, selected by settings.VECTOR_STORE_BACKEND
+        self.store = get_vector_store()
+        # BM25 keyword index built at ingestion; fused with dense results
+        self.lexical = get_lexical_index() if settings.HYBRID_SEARCH_ENABLED else None
 
     def retrieve(self, query: str) -> List[Dict[str, Any]]:
+        return self.retrieve_with_embeddings(query)["documents"]
+
+    def retrieve_with_embeddings(
+        self,
+        query: str,
+        query_embedding: List[float] = None,
+        metadata_filter: Dict[str, Any] = None,
+        top_k: int = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve Top-K chunks together with the vectors the store already holds,
+        so downstream agents don't have to re-embed them. With hybrid search
+        enabled, dense and BM25 rankings are merged by reciprocal-rank fusion.
+
+        Args:
+            query: User question string
+            query_embedding: Optional precomputed query vector
+            metadata_filter: Optional Pinecone-style metadata filter
+            top_k: Chunks to fetch (default: settings.TOP_K; the graph
+                   over-fetches candidates for the reranker)
+
+        Returns:
+            {
+                "documents": [{"id", "content", "metadata", "score"}],
+                "query_embedding": List[float],
+                "document_embeddings": List[List[float]]
+            }
+        """
         cleaned_query = query.strip()
         if not cleaned_query:
-            return []
+            return self._empty_result()
 
-        results = self.vectorstore.similarity_search_with_score(
-            query=cleaned_query,
-            k=settings.TOP_K
+        if not query_embedding:
+            query_embedding = self.embeddings.embed_query(cleaned_query)
+
+        matches = self._search(cleaned_query, query_embedding, metadata_filter, top_k)
+        return self._format_response(matches, query_embedding)
+
+    async def aretrieve_with_embeddings(
+        self,
+        query: str,
+        query_embedding: List[float] = None,
+        metadata_filter: Dict[str, Any] = None,
+        top_k: int = None
+    ) -> Dict[str, Any]:
+        """Async `retrieve_with_embeddings`; embedding and vector search run off the event loop."""
+        cleaned_query = query.strip()
+        if not cleaned_query:
+            return self._empty_result()
+
+        if not query_embedding:
+            query_embedding = await self.embeddings.aembed_query(cleaned_query)
+
+        matches = await run_io(self._search, cleaned_query, query_embedding, metadata_filter, top_k)
+        return self._format_response(matches, query_embedding)
+
+    def _query_index(
+        self,
+        query_embedding: List[float],
+        metadata_filter: Dict[str, Any] = None,
+        top_k: int = None
+    ) -> List[Dict[str, Any]]:
+        return self.store.query(
+            query_embedding,
+            top_k=top_k or settings.TOP_K,
+            metadata_filter=metadata_filter,
+            include_values=True
         )
 
+    def _search(
+        self,
+        query: str,
+        query_embedding: List[float],
+        metadata_filter: Dict[str, Any] = None,
+        top_k: int = None
+    ) -> List[Dict[str, Any]]:
+        top_k = top_k or settings.TOP_K
+        dense = self._query_index(query_embedding, metadata_filter, top_k)
+        if self.lexical is None or not len(self.lexical):
+            return dense
+        lexical = self.lexical.search(query, top_k)
+        if not lexical:
+            return dense
+        return self._fuse(dense, lexical, query_embedding, metadata_filter, top_k)
+
+    def _fuse(
+        self,
+        dense: List[Dict[str, Any]],
+        lexical: List[tuple],
+        query_embedding: List[float],
+        metadata_filter: Dict[str, Any],
+        top_k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Reciprocal-rank fusion: score(d) = sum over rankings of 1 / (k + rank).
+        Keyword-only hits are fetched from the store so they carry vectors too.
+        """
+        k = settings.HYBRID_RRF_K
+        fused = {}
+        for rank, match in enumerate(dense, start=1):
+            fused[match["id"]] = fused.get(match["id"], 0.0) + 1.0 / (k + rank)
+        for rank, (vector_id, _) in enumerate(lexical, start=1):
+            fused[vector_id] = fused.get(vector_id, 0.0) + 1.0 / (k + rank)
+
+        matches = {match["id"]: match for match in dense}
+        missing = [vector_id for vector_id, _ in lexical if vector_id not in matches]
+        if missing:
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            for vector_id, record in self.store.fetch(missing).items():
+                if metadata_filter and not _matches_filter(record["metadata"], metadata_filter):
+                    continue
+                matches[vector_id] = {
+                    **record,
+                    # Cosine similarity, comparable with the dense scores
+                    "score": float(np.dot(query_vector, np.asarray(record["values"], dtype=np.float32)))
+                }
+
+        ranked = sorted((vector_id for vector_id in fused if vector_id in matches), key=fused.get, reverse=True)
+        return [matches[vector_id] for vector_id in ranked[:top_k]]
+
+    @staticmethod
+    def _empty_result() -> Dict[str, Any]:
+        return {"documents": [], "query_embedding": [], "document_embeddings": []}
+
+    @staticmethod
+    def _format_response(matches: List[Dict[str, Any]], query_embedding: List[float]) -> Dict[str, Any]:
         formatted_results = []
-        for doc, score in results:
+        document_embeddings = []
+        for match in matches:
+            metadata = dict(match["metadata"])
+            content = metadata.pop(TEXT_KEY, "")
             formatted_results.append({
-                "content": doc.page_content,
-                "metadata": doc.metadata,
-                "score": score
+                "id": match["id"],
+                "content": content,
+                "metadata": metadata,
+                "score": match["score"]
             })
-        
-        return formatted_results
+            document_embeddings.append(match["values"])
+
+        return {
+            "documents": formatted_results,
+            "query_embedding": query_embedding,
+            "document_embeddings": document_embeddings
+        }
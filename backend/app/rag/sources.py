@@ -0,0 +1,131 @@
+"""
+Ingested Source Lookup for AXIOMAI.
+
+The source of truth the DocumentWatcherAgent checks indexed chunks
+against. Scripts/ingest_pdf_book.py writes one manifest per book under
+INGEST_MANIFEST_DIR recording the PDF's path and SHA-256. While the file
+on disk still has that hash, nothing indexed from it can have changed.
+Once it differs, the chunk's page is extracted and split again exactly
+as ingestion splits it, and the text at the chunk's position (page,
+index within page) is its current content.
+
+Chunks with no manifest, or whose PDF is no longer on disk, have nothing
+to compare with and are treated as unchanged.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+CHUNK_SIZE = 1000  # Reasonable chunk size for technical content
+CHUNK_OVERLAP = 200  # Overlap to maintain context
+
+# Split pages kept for repeated checks of a changed PDF
+PAGE_CACHE_SIZE = 256
+
+
+def make_splitter():
+    """The text splitter ingestion uses; chunk positions depend on it."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]
+    )
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file, streamed."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestedSources:
+    """Current source text of ingested chunks, read from their PDFs only when those changed."""
+
+    def __init__(self, manifest_dir: str = None):
+        self.manifest_dir = manifest_dir or settings.INGEST_MANIFEST_DIR
+        self._lock = threading.Lock()
+        # source → (manifest mtime, manifest)
+        self._manifests: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # PDF path → ((mtime_ns, size), sha256): hashed again only when the file changes
+        self._file_hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        # (PDF path, (mtime_ns, size), page) → chunk texts
+        self._pages: "OrderedDict[Tuple[str, Tuple[int, int], int], List[str]]" = OrderedDict()
+
+    def current_content(self, metadata: Dict[str, Any]) -> Optional[str]:
+        """
+        Text now at this chunk's position in its source.
+
+        Returns:
+            The current text when the source changed since ingestion, or None
+            (source unchanged, unknown, or the position no longer exists)
+        """
+        source = metadata.get("source")
+        page, index = metadata.get("page"), metadata.get("chunk_id")
+        if not source or page is None or index is None:
+            return None
+        manifest = self._manifest(source)
+        path = manifest.get("pdf_path") if manifest else None
+        if not path or not os.path.exists(path):
+            return None
+
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._file_hash(path, signature) == manifest.get("pdf_sha256"):
+            return None
+        try:
+            chunks = self._page_chunks(path, signature, int(page))
+            index = int(index)
+        except (ValueError, IndexError):
+            return None
+        return chunks[index] if index < len(chunks) else None
+
+    def _manifest(self, source: str) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.manifest_dir, f"{source}.json")
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._manifests.get(source)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        with self._lock:
+            self._manifests[source] = (mtime, manifest)
+        return manifest
+
+    def _file_hash(self, path: str, signature: Tuple[int, int]) -> str:
+        with self._lock:
+            cached = self._file_hashes.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        digest = file_hash(path)
+        with self._lock:
+            self._file_hashes[path] = (signature, digest)
+        return digest
+
+    def _page_chunks(self, path: str, signature: Tuple[int, int], page: int) -> List[str]:
+        key = (path, signature, page)
+        with self._lock:
+            if key in self._pages:
+                self._pages.move_to_end(key)
+                return self._pages[key]
+        from pypdf import PdfReader
+        text = PdfReader(path).pages[page].extract_text() or ""
+        chunks = make_splitter().split_text(text)
+        with self._lock:
+            self._pages[key] = chunks
+            while len(self._pages) > PAGE_CACHE_SIZE:
+                self._pages.popitem(last=False)
+        return chunks
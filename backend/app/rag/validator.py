@@ -1,21 +1,30 @@
 from typing import List, Dict, Any
 from datetime import datetime, timezone
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
-from app.core.config import settings
+from app.core.log import get_logger
+from app.rag.embeddings import get_embedding_service
+
+logger = get_logger("validator")
 
 class AnswerValidatorAgent:
     def __init__(self):
-        self.model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+        self.embeddings = get_embedding_service()
         # Weights
         self.W_SIMILARITY = 0.4
         self.W_SOURCE = 0.3
         self.W_FRESHNESS = 0.3
         self.TRUST_THRESHOLD = 0.65
 
-    def validate(self, answer: str, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def validate(
+        self,
+        answer: str,
+        documents: List[Dict[str, Any]],
+        answer_embedding: List[float] = None,
+        document_embeddings: List[List[float]] = None
+    ) -> Dict[str, Any]:
         """
         Validates the generated answer against retrieved documents.
+        Precomputed embeddings are reused when provided.
         Returns a dict with trust_score and decision.
         """
         if not documents:
@@ -25,7 +34,9 @@ class AnswerValidatorAgent:
             }
 
         # 1. Similarity Score
-        similarity_score = self._compute_similarity(answer, documents)
+        similarity_score = self._compute_similarity(
+            answer, documents, answer_embedding, document_embeddings
+        )
         
         # 2. Source Count Weight
         source_score = self._compute_source_weight(documents)
@@ -55,32 +66,40 @@ class AnswerValidatorAgent:
             }
         }
 
-    def _compute_similarity(self, answer: str, documents: List[Dict[str, Any]]) -> float:
+    def _compute_similarity(
+        self,
+        answer: str,
+        documents: List[Dict[str, Any]],
+        answer_embedding: List[float] = None,
+        document_embeddings: List[List[float]] = None
+    ) -> float:
         """
         Computes cosine similarity between answer and documents.
         Returns average similarity.
         """
         try:
-            # Encode answer
-            answer_emb = self.model.encode(answer, convert_to_tensor=True)
-            
-            # Encode documents
-            doc_contents = [doc.get("content", "") for doc in documents]
-            doc_embs = self.model.encode(doc_contents, convert_to_tensor=True)
-            
-            # Compute cosine similarities
-            # util.cos_sim returns a matrix [num_query, num_corpus]
-            # Here it is [1, num_docs]
-            cosine_scores = util.cos_sim(answer_emb, doc_embs)
+            if answer_embedding is None or document_embeddings is None or len(document_embeddings) != len(documents):
+                # Encode answer and documents in one batch
+                doc_contents = [doc.get("content", "") for doc in documents]
+                # Only the chunks are worth keeping in the embedding cache
+                vectors = self.embeddings.embed([answer] + doc_contents, persist=[False] + [True] * len(doc_contents))
+                answer_embedding, document_embeddings = vectors[0], vectors[1:]
+
+            answer_emb = np.asarray(answer_embedding, dtype=np.float32)
+            doc_embs = np.asarray(document_embeddings, dtype=np.float32)
+
+            # Normalize so cosine similarity is a dot product: [num_docs]
+            answer_emb = answer_emb / max(np.linalg.norm(answer_emb), 1e-12)
+            doc_embs = doc_embs / np.maximum(np.linalg.norm(doc_embs, axis=1, keepdims=True), 1e-12)
+            cosine_scores = doc_embs @ answer_emb
             
             # Take the mean of the scores
-            # converting tensor to numpy float
-            avg_similarity = cosine_scores.mean().item()
+            avg_similarity = float(cosine_scores.mean())
             
             # Ensure between 0 and 1
             return max(0.0, min(1.0, avg_similarity))
         except Exception as e:
-            print(f"Error computing similarity: {e}")
+            logger.warning("similarity failed", extra={"fields": {"error": str(e)}})
             return 0.0
 
     def _compute_source_weight(self, documents: List[Dict[str, Any]]) -> float:
@@ -0,0 +1,586 @@
+"""
+Vector Store Backends for AXIOMAI.
+
+Agents talk to a small `VectorStore` interface instead of a specific
+database client. The backend is selected by `settings.VECTOR_STORE_BACKEND`:
+
+- "pinecone": the hosted Pinecone index (default).
+- "local": an in-process index over a contiguous float32 NumPy matrix,
+  memory-mapped from disk, with exact or IVF (approximate) top-k search.
+
+All backends exchange plain dicts:
+    vector: {"id": str, "values": List[float], "metadata": dict}
+    match:  {"id": str, "score": float, "values": List[float], "metadata": dict}
+Chunk text is stored in metadata under TEXT_KEY.
+"""
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from app.core.config import settings
+from app.core.tracing import record_vector_store_call
+
+try:
+    import fcntl
+except ImportError:  # Windows: flushes from separate processes are not serialized
+    fcntl = None
+
+# Metadata key the chunk text is stored under (PineconeVectorStore's default)
+TEXT_KEY = "text"
+
+
+class VectorStore:
+    """Interface shared by all vector store backends."""
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        include_values: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Return the top_k matches, best first."""
+        raise NotImplementedError
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> int:
+        """Insert or replace vectors by id. Returns the number written."""
+        raise NotImplementedError
+
+    def delete(self, ids: List[str]) -> None:
+        raise NotImplementedError
+
+    def delete_matching(self, metadata_filter: Dict[str, Any]) -> List[str]:
+        """Delete every vector whose metadata matches the filter. Returns the deleted ids."""
+        raise NotImplementedError
+
+    def fetch(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Return stored vectors by id (missing ids are omitted)."""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Persist buffered writes. No-op for backends that write through."""
+        return None
+
+
+# ── Pinecone ──
+
+class PineconeStore(VectorStore):
+    """Hosted Pinecone index."""
+
+    def __init__(self):
+        from pinecone import Pinecone
+
+        self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+        # One pooled connection shared by every caller; sized for concurrent upserts
+        self.index = self.pc.Index(
+            settings.PINECONE_INDEX_NAME,
+            pool_threads=max(settings.UPSERT_CONCURRENCY, 1)
+        )
+
+    def query(self, vector, top_k, metadata_filter=None, include_values=True):
+        record_vector_store_call("query")
+        response = self.index.query(
+            vector=list(vector),
+            top_k=top_k,
+            filter=metadata_filter,
+            include_metadata=True,
+            include_values=include_values
+        )
+        return [
+            {
+                "id": match.id,
+                "score": match.score,
+                "values": list(match.values or []),
+                "metadata": dict(match.metadata or {})
+            }
+            for match in response.matches
+        ]
+
+    def upsert(self, vectors):
+        if not vectors:
+            return 0
+        record_vector_store_call("upsert")
+        self.index.upsert(vectors=vectors)
+        return len(vectors)
+
+    def delete(self, ids):
+        if ids:
+            record_vector_store_call("delete")
+            self.index.delete(ids=list(ids))
+
+    def delete_matching(self, metadata_filter):
+        # Serverless indexes do not delete by filter: page through matches instead
+        probe = [1.0] * self.index.describe_index_stats()["dimension"]
+        deleted = set()
+        while True:
+            record_vector_store_call("query")
+            response = self.index.query(
+                vector=probe, top_k=1000, filter=metadata_filter, include_metadata=False, include_values=False
+            )
+            # Deletes are eventually consistent; stop once only deleted ids come back
+            ids = [match.id for match in response.matches if match.id not in deleted]
+            if not ids:
+                return sorted(deleted)
+            self.delete(ids)
+            deleted.update(ids)
+
+    def fetch(self, ids):
+        if not ids:
+            return {}
+        record_vector_store_call("fetch")
+        response = self.index.fetch(ids=list(ids))
+        return {
+            vector_id: {
+                "id": vector_id,
+                "values": list(vector.values or []),
+                "metadata": dict(vector.metadata or {})
+            }
+            for vector_id, vector in response.vectors.items()
+        }
+
+    def count(self):
+        return self.index.describe_index_stats().get("total_vector_count", 0)
+
+
+# ── Local (in-process) ──
+
+def _matches_filter(metadata: Dict[str, Any], metadata_filter: Dict[str, Any]) -> bool:
+    """Evaluate a Pinecone-style metadata filter against one metadata dict."""
+    for key, condition in metadata_filter.items():
+        if key == "$and":
+            if not all(_matches_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(_matches_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        for op, expected in condition.items():
+            if op == "$eq" and value != expected:
+                return False
+            if op == "$ne" and value == expected:
+                return False
+            if op == "$in" and value not in expected:
+                return False
+            if op == "$nin" and value in expected:
+                return False
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                if op == "$gt" and not value > expected:
+                    return False
+                if op == "$gte" and not value >= expected:
+                    return False
+                if op == "$lt" and not value < expected:
+                    return False
+                if op == "$lte" and not value <= expected:
+                    return False
+    return True
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector index for small/medium corpora.
+
+    Vectors live in one contiguous, L2-normalized float32 matrix persisted
+    as `vectors.npy` and memory-mapped on load; ids and metadata are kept in
+    `records.json`. Search is an exact matrix-vector product, or an IVF
+    (inverted file) probe over k-means clusters when `search="ivf"` and the
+    corpus is large enough. Writes are buffered in memory and persisted on
+    `flush()` (or automatically every `flush_every` written vectors).
+
+    Several processes may share one index directory (API workers, ingest
+    scripts). Each picks up files another process flushed before it reads
+    or writes, and a flush merges this process's unflushed upserts and
+    deletes into the files on disk instead of overwriting them.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    RECORDS_FILE = "records.json"
+    IVF_FILE = "ivf.npz"
+    LOCK_FILE = ".lock"
+
+    def __init__(
+        self,
+        path: str = None,
+        search: str = None,
+        nprobe: int = None,
+        ivf_min_vectors: int = None,
+        flush_every: int = 1000
+    ):
+        self.path = path or settings.LOCAL_INDEX_DIR
+        self.search = search or settings.LOCAL_INDEX_SEARCH
+        self.nprobe = nprobe or settings.LOCAL_INDEX_NPROBE
+        self.ivf_min_vectors = ivf_min_vectors or settings.LOCAL_INDEX_IVF_MIN_VECTORS
+        self.flush_every = flush_every
+
+        self._lock = threading.RLock()
+        self._matrix: np.ndarray = None
+        self._ids: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        self._ivf: Optional[Dict[str, np.ndarray]] = None
+        self._pending = 0
+        # Ids written or deleted here since the last flush; re-applied over newer files
+        self._upserted = set()
+        self._deleted = set()
+        # (mtime_ns, size) of the files last loaded or written
+        self._signature = None
+
+        self._load()
+
+    # ── Public API ──
+
+    def query(self, vector, top_k, metadata_filter=None, include_values=True):
+        record_vector_store_call("query")
+        with self._lock:
+            self._reload_if_changed()
+            matrix, ids, metadata, ivf = self._matrix, self._ids, self._metadata, self._ivf
+
+        if matrix is None or not ids or top_k <= 0:
+            return []
+
+        q = np.asarray(vector, dtype=np.float32)
+        q = q / max(float(np.linalg.norm(q)), 1e-12)
+
+        if ivf is not None and self.search == "ivf":
+            candidates = self._ivf_candidates(q, ivf, len(ids))
+            scores = matrix[candidates] @ q
+        else:
+            candidates = None
+            scores = matrix @ q
+
+        if metadata_filter:
+            order = np.argsort(-scores)
+        elif top_k < len(scores):
+            top = np.argpartition(-scores, top_k)[:top_k]
+            order = top[np.argsort(-scores[top])]
+        else:
+            order = np.argsort(-scores)
+
+        results = []
+        for i in order:
+            row = int(candidates[i]) if candidates is not None else int(i)
+            if metadata_filter and not _matches_filter(metadata[row], metadata_filter):
+                continue
+            results.append({
+                "id": ids[row],
+                "score": float(scores[i]),
+                "values": matrix[row].tolist() if include_values else [],
+                "metadata": dict(metadata[row])
+            })
+            if len(results) >= top_k:
+                break
+        return results
+
+    def upsert(self, vectors):
+        if not vectors:
+            return 0
+
+        record_vector_store_call("upsert")
+        values = np.asarray([v["values"] for v in vectors], dtype=np.float32)
+        values = values / np.maximum(np.linalg.norm(values, axis=1, keepdims=True), 1e-12)
+
+        with self._lock:
+            self._reload_if_changed()
+            self._write_rows(vectors, values)
+            for vector in vectors:
+                self._upserted.add(vector["id"])
+                self._deleted.discard(vector["id"])
+
+            self._pending += len(vectors)
+            if self._pending >= self.flush_every:
+                self._persist()
+
+        return len(vectors)
+
+    def delete(self, ids):
+        record_vector_store_call("delete")
+        ids = set(ids or [])
+        with self._lock:
+            self._reload_if_changed()
+            if not self._remove_rows(ids):
+                return
+            self._deleted |= ids
+            self._upserted -= ids
+            self._pending += 1
+
+    def delete_matching(self, metadata_filter):
+        with self._lock:
+            self._reload_if_changed()
+            ids = [
+                vector_id for vector_id, metadata in zip(self._ids, self._metadata)
+                if _matches_filter(metadata, metadata_filter)
+            ]
+        self.delete(ids)
+        return ids
+
+    def fetch(self, ids):
+        record_vector_store_call("fetch")
+        with self._lock:
+            self._reload_if_changed()
+            found = {}
+            for vector_id in ids:
+                position = self._positions.get(vector_id)
+                if position is not None:
+                    found[vector_id] = {
+                        "id": vector_id,
+                        "values": self._matrix[position].tolist(),
+                        "metadata": dict(self._metadata[position])
+                    }
+            return found
+
+    def count(self):
+        with self._lock:
+            self._reload_if_changed()
+            return len(self._ids)
+
+    def flush(self):
+        with self._lock:
+            if self._pending:
+                self._persist()
+
+    # ── Rows ──
+
+    def _write_rows(self, vectors: List[Dict[str, Any]], values: np.ndarray) -> None:
+        """Replace rows by id in place and append new ones (lock held)."""
+        if self._matrix is None:
+            self._matrix = np.zeros((0, values.shape[1]), dtype=np.float32)
+        # Detach from the read-only memory map before writing
+        if isinstance(self._matrix, np.memmap):
+            self._matrix = np.array(self._matrix)
+
+        new_rows = []
+        for vector, row_values in zip(vectors, values):
+            position = self._positions.get(vector["id"])
+            if position is not None:
+                self._matrix[position] = row_values
+                self._metadata[position] = dict(vector.get("metadata", {}))
+            else:
+                self._positions[vector["id"]] = len(self._ids) + len(new_rows)
+                new_rows.append((vector, row_values))
+
+        if new_rows:
+            self._matrix = np.vstack([self._matrix, np.stack([r for _, r in new_rows])])
+            for vector, _ in new_rows:
+                self._ids.append(vector["id"])
+                self._metadata.append(dict(vector.get("metadata", {})))
+
+    def _remove_rows(self, ids: set) -> bool:
+        """Drop rows by id; False if none were stored (lock held)."""
+        keep = [i for i, vector_id in enumerate(self._ids) if vector_id not in ids]
+        if len(keep) == len(self._ids):
+            return False
+        self._matrix = np.array(self._matrix[keep])
+        self._ids = [self._ids[i] for i in keep]
+        self._metadata = [self._metadata[i] for i in keep]
+        self._positions = {vector_id: i for i, vector_id in enumerate(self._ids)}
+        # Row numbers changed; fall back to exact search until the next flush
+        self._ivf = None
+        return True
+
+    # ── Persistence ──
+
+    def _disk_signature(self) -> Optional[Tuple]:
+        """Identifies the flushed files; records are written last (lock held)."""
+        try:
+            vectors = os.stat(os.path.join(self.path, self.VECTORS_FILE))
+            records = os.stat(os.path.join(self.path, self.RECORDS_FILE))
+        except OSError:
+            return None
+        return (vectors.st_mtime_ns, vectors.st_size, records.st_mtime_ns, records.st_size)
+
+    def _reload_if_changed(self) -> bool:
+        """
+        Load files another process flushed, then re-apply this process's
+        unflushed upserts and deletes on top (lock held). True if reloaded.
+        """
+        signature = self._disk_signature()
+        if signature is None or signature == self._signature:
+            return False
+
+        upserted = [
+            {"id": vector_id, "metadata": self._metadata[self._positions[vector_id]]}
+            for vector_id in self._upserted
+        ]
+        values = np.array([self._matrix[self._positions[v["id"]]] for v in upserted], dtype=np.float32)
+        if not self._load():
+            return False
+        if self._deleted:
+            self._remove_rows(self._deleted)
+        if upserted:
+            self._write_rows(upserted, values)
+        return True
+
+    def _load(self) -> bool:
+        """Replace the in-memory index with the flushed files; False if absent or mid-write."""
+        signature = self._disk_signature()
+        if signature is None:
+            return False
+
+        with open(os.path.join(self.path, self.RECORDS_FILE), encoding="utf-8") as f:
+            records = json.load(f)
+        matrix = np.load(os.path.join(self.path, self.VECTORS_FILE), mmap_mode="r")
+        ivf = None
+        ivf_path = os.path.join(self.path, self.IVF_FILE)
+        if os.path.exists(ivf_path):
+            try:
+                with np.load(ivf_path) as data:
+                    ivf = {key: data[key] for key in data.files}
+            except (OSError, ValueError):
+                ivf = None  # replaced while reading
+        if self._disk_signature() != signature or matrix.shape[0] != len(records["ids"]):
+            return False  # caught mid-flush; the next check loads the finished files
+
+        # IVF lists are only valid for the flush that wrote them
+        if ivf is not None and str(ivf.pop("generation", "")) != records.get("generation", ""):
+            ivf = None
+
+        self._matrix = matrix
+        self._ids = records["ids"]
+        self._metadata = records["metadata"]
+        self._positions = {vector_id: i for i, vector_id in enumerate(self._ids)}
+        self._ivf = ivf
+        self._signature = signature
+        return True
+
+    @contextmanager
+    def _flush_lock(self):
+        """Serializes flushes from every process sharing the index directory."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.path, self.LOCK_FILE), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _persist(self) -> None:
+        """Merge with the files on disk, then atomically write vectors, records and IVF lists (lock held)."""
+        os.makedirs(self.path, exist_ok=True)
+
+        with self._flush_lock():
+            self._reload_if_changed()
+
+            if self.search == "ivf" and len(self._ids) >= self.ivf_min_vectors:
+                if self._ivf is None or len(self._ids) > 1.1 * int(self._ivf["rows"]):
+                    self._ivf = self._build_ivf(np.asarray(self._matrix))
+            elif len(self._ids) < self.ivf_min_vectors:
+                self._ivf = None
+
+            generation = uuid.uuid4().hex
+            if self._ivf is not None:
+                self._atomic_write(
+                    self.IVF_FILE,
+                    lambda f: np.savez(f, generation=np.asarray(generation), **self._ivf)
+                )
+            elif os.path.exists(os.path.join(self.path, self.IVF_FILE)):
+                os.remove(os.path.join(self.path, self.IVF_FILE))
+            self._atomic_write(self.VECTORS_FILE, lambda f: np.save(f, np.asarray(self._matrix, dtype=np.float32)))
+            self._atomic_write(
+                self.RECORDS_FILE,
+                lambda f: f.write(json.dumps({
+                    "ids": self._ids,
+                    "metadata": self._metadata,
+                    "generation": generation
+                }).encode("utf-8"))
+            )
+
+            self._signature = self._disk_signature()
+            self._pending = 0
+            self._upserted.clear()
+            self._deleted.clear()
+            # Re-open read-only so the OS page cache backs the matrix
+            self._matrix = np.load(os.path.join(self.path, self.VECTORS_FILE), mmap_mode="r")
+
+    def _atomic_write(self, filename: str, write) -> None:
+        final_path = os.path.join(self.path, filename)
+        tmp_path = final_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, final_path)
+
+    # ── IVF (approximate search) ──
+
+    @staticmethod
+    def _build_ivf(matrix: np.ndarray, iterations: int = 10, seed: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Spherical k-means over a sample, then assign every row to its
+        nearest centroid. Rows are stored sorted by list so each inverted
+        list is a contiguous slice of `order`.
+        """
+        rng = np.random.default_rng(seed)
+        n = matrix.shape[0]
+        nlist = max(1, int(np.sqrt(n)))
+
+        sample = matrix[rng.choice(n, min(n, nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[c] = centroid / max(float(np.linalg.norm(centroid)), 1e-12)
+
+        assignments = np.concatenate([
+            np.argmax(matrix[start:start + 4096] @ centroids.T, axis=1)
+            for start in range(0, n, 4096)
+        ])
+        order = np.argsort(assignments, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assignments[order], np.arange(nlist + 1)).astype(np.int64)
+
+        return {
+            "centroids": centroids.astype(np.float32),
+            "order": order,
+            "offsets": offsets,
+            "rows": np.asarray(n)
+        }
+
+    def _ivf_candidates(self, q: np.ndarray, ivf: Dict[str, np.ndarray], total_rows: int) -> np.ndarray:
+        centroids, order, offsets = ivf["centroids"], ivf["order"], ivf["offsets"]
+        nprobe = min(self.nprobe, len(centroids))
+        probe = np.argpartition(-(centroids @ q), nprobe - 1)[:nprobe]
+
+        parts = [order[offsets[c]:offsets[c + 1]] for c in probe]
+        # Rows appended since the lists were built are always scanned
+        indexed_rows = int(ivf["rows"])
+        if total_rows > indexed_rows:
+            parts.append(np.arange(indexed_rows, total_rows, dtype=np.int64))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+# ── Factory ──
+
+_store: VectorStore = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """Return the process-wide vector store selected by settings.VECTOR_STORE_BACKEND."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = settings.VECTOR_STORE_BACKEND
+                if backend == "pinecone":
+                    _store = PineconeStore()
+                elif backend == "local":
+                    _store = LocalVectorStore()
+                else:
+                    raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {backend}")
+    return _store
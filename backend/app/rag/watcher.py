@@ -1,14 +1,16 @@
 """
 Document Watcher Agent for AXIOMAI.
 
-Monitors document content for changes using SHA256 hashing
-and timestamp-based freshness detection. Does not perform
-any vector DB operations or trigger refresh — it only detects
-and reports staleness.
+Monitors document content for changes against its ingested source
+(app/rag/sources.py) and SHA256 hashing, plus timestamp-based freshness
+detection. Does not perform any vector DB operations or trigger
+refresh — it only detects and reports staleness.
 """
 import hashlib
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from app.rag.sources import IngestedSources
 
 
 class DocumentWatcherAgent:
@@ -16,12 +18,17 @@ class DocumentWatcherAgent:
     Background-style agent that checks documents for staleness.
 
     Detection methods:
-    1. Hash-based: SHA256 of content vs stored hash in metadata.
-    2. Timestamp-based: published_at older than 180 days → outdated.
+    1. Source-based: the indexed text vs the text now at the chunk's
+       position in its source file (when `sources` is given).
+    2. Hash-based: SHA256 of content vs stored hash in metadata.
+    3. Timestamp-based: published_at older than 180 days → outdated.
     """
 
     FRESHNESS_THRESHOLD_DAYS = 180
 
+    def __init__(self, sources: Optional[IngestedSources] = None):
+        self.sources = sources
+
     def check_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Check a list of documents for staleness.
@@ -40,32 +47,11 @@ class DocumentWatcherAgent:
                 "reason": "hash_mismatch" | "outdated" | "no_change"
             }
         """
-        if not documents:
-            return {
-                "stale": False,
-                "changed_documents": 0,
-                "reason": "no_change"
-            }
-
-        hash_mismatches = 0
-        outdated_count = 0
-
-        for doc in documents:
-            content = doc.get("content", "")
-            metadata = doc.get("metadata", {})
-
-            # 1. Hash-based change detection
-            current_hash = self._compute_hash(content)
-            stored_hash = metadata.get("content_hash", "")
-            if stored_hash and current_hash != stored_hash:
-                hash_mismatches += 1
-
-            # 2. Timestamp freshness detection
-            published_at = metadata.get("published_at", "")
-            if published_at and self._is_outdated(published_at):
-                outdated_count += 1
+        stale = self.find_stale(documents)
+        hash_mismatches = len(stale["changed"])
+        outdated_count = len(stale["outdated"])
 
-        # 3. Final decision
+        # Final decision
         if hash_mismatches > 0:
             return {
                 "stale": True,
@@ -85,6 +71,38 @@ class DocumentWatcherAgent:
                 "reason": "no_change"
             }
 
+    def find_stale(self, documents: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Per-document staleness, for refreshing only what changed.
+
+        Returns:
+            {
+                "changed": documents whose source text changed since indexing
+                           (with "content" set to the current text), or whose
+                           content no longer matches "content_hash",
+                "outdated": documents whose "published_at" is past the threshold
+            }
+        """
+        changed, outdated = [], []
+        for doc in documents or []:
+            content = doc.get("content", "")
+            metadata = doc.get("metadata", {})
+
+            # 1. Source-based change detection: re-index with the current text
+            current = self.sources.current_content(metadata) if self.sources is not None else None
+            if current is not None and current != content:
+                changed.append({**doc, "content": current})
+
+            # 2. Hash-based change detection (indexed record edited in place)
+            elif metadata.get("content_hash") and self._compute_hash(content) != metadata["content_hash"]:
+                changed.append(doc)
+
+            # 3. Timestamp freshness detection
+            published_at = metadata.get("published_at", "")
+            if published_at and self._is_outdated(published_at):
+                outdated.append(doc)
+        return {"changed": changed, "outdated": outdated}
+
     @staticmethod
     def _compute_hash(content: str) -> str:
         """Compute SHA256 hash of document content."""
@@ -0,0 +1,20 @@
+import pytest
+
+# test_retrieval.py is a manual script against the live Pinecone index and Gemini
+collect_ignore = ["test_retrieval.py"]
+
+
+class Clock:
+    """Settable stand-in for time.time / time.monotonic."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """A Clock; modules patch it over the time function their code under test reads."""
+    return Clock()
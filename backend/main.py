@@ -1,14 +1,16 @@
 import sys
+from app.core.startup import lifespan
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
 from app.api.routes import router
+from app.core.config import settings
+from app.core.server import serve_prefork
 
 # Fix encoding for Windows console
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
-app = FastAPI(title="AXIOMAI API")
+app = FastAPI(title="AXIOMAI API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,8 +23,9 @@ app.add_middleware(
 app.include_router(router, prefix="/api/v1")
 
 def main():
-    # Fix for Windows OSError 1455: Disable reload/multiprocessing which duplicates memory
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=False, workers=1)
+    # Fix for Windows OSError 1455: Disable reload/multiprocessing which duplicates memory.
+    # On Linux, API_WORKERS > 1 pre-forks workers that share the loaded model weights.
+    serve_prefork("main:app", host=settings.API_HOST, port=settings.API_PORT, workers=settings.API_WORKERS)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,83 @@
+from app.agents.context import build_context, estimate_tokens
+
+
+def chunk(vector_id, content, source="book", page=1, chunk_id=None, score=0.5):
+    metadata = {"source": source, "page": page}
+    if chunk_id is not None:
+        metadata["chunk_id"] = chunk_id
+    return {"id": vector_id, "content": content, "metadata": metadata, "score": score}
+
+
+def words(prefix: str, count: int) -> str:
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+
+def test_packing_stays_within_budget_best_first():
+    docs = [
+        chunk(f"c{i}", words(f"topic{i}x", 60), source=f"book-{i}", score=i / 10)
+        for i in range(8)
+    ]
+    context = build_context(docs, token_budget=300)
+
+    assert context["tokens"] <= 300
+    assert context["raw_tokens"] > 300
+    assert 0 < context["blocks_packed"] < len(docs)
+    # Highest scores first
+    assert context["chunk_ids"][0] == "c7"
+    assert context["chunk_ids"] == sorted(context["chunk_ids"], reverse=True)
+
+
+def test_smaller_block_fills_remaining_budget():
+    docs = [
+        chunk("big", words("alpha", 100), source="a", score=0.9),
+        chunk("bigger", words("beta", 100), source="b", score=0.8),
+        chunk("small", "gamma delta epsilon", source="c", score=0.1),
+    ]
+    budget = estimate_tokens(f"Chunk 1 [Source: a]:\n{docs[0]['content']}\n") + 20
+    context = build_context(docs, token_budget=budget)
+
+    assert context["chunk_ids"] == ["big", "small"]
+
+
+def test_oversized_best_block_is_truncated_not_dropped():
+    context = build_context([chunk("huge", words("w", 2000))], token_budget=100)
+
+    assert context["chunk_ids"] == ["huge"]
+    assert context["tokens"] <= 100
+
+
+def test_adjacent_chunks_merge_without_overlap():
+    overlap = "shared sentence that spans both chunks."
+    docs = [
+        chunk("second", f"{overlap} Then the second chunk continues.", chunk_id=1, score=0.4),
+        chunk("first", f"The first chunk starts here. {overlap}", chunk_id=0, score=0.6),
+    ]
+    context = build_context(docs, token_budget=1000)
+
+    assert context["blocks_packed"] == 1
+    assert context["chunk_ids"] == ["first", "second"]
+    assert context["text"].count(overlap) == 1
+
+
+def test_near_duplicates_are_dropped():
+    text = words("repeat", 40)
+    docs = [
+        chunk("original", text, source="a", score=0.9),
+        chunk("copy", text, source="b", score=0.5),
+    ]
+    context = build_context(docs, token_budget=1000, dedup_threshold=0.8)
+
+    assert context["chunk_ids"] == ["original"]
+
+
+def test_mixed_chunk_id_types_do_not_break_ordering():
+    docs = [
+        chunk("b", "second part of the page", chunk_id="1"),
+        chunk("a", "first part of the page", chunk_id=0.0),
+        chunk("c", "unnumbered text", chunk_id="appendix"),
+        chunk("d", "text without a position"),
+    ]
+    context = build_context(docs, token_budget=1000)
+
+    assert context["chunk_ids"][:2] == ["a", "b"]
+    assert set(context["chunk_ids"]) == {"a", "b", "c", "d"}
@@ -0,0 +1,67 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.rag.embedding_batcher import EmbeddingBatcher
+
+
+def test_concurrent_submissions_share_a_forward_pass():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        started.set()
+        release.wait(5)
+        return np.arange(len(texts), dtype=np.float32)[:, None]
+
+    batcher = EmbeddingBatcher(encode, max_batch_size=64, max_wait_ms=0)
+    first = batcher.submit(["a"])
+    assert started.wait(5)
+    # Queued while the first batch is still encoding
+    second, third = batcher.submit(["b", "c"]), batcher.submit(["d"])
+    release.set()
+
+    assert first.result(5).ravel().tolist() == [0.0]
+    assert second.result(5).ravel().tolist() == [0.0, 1.0]
+    assert third.result(5).ravel().tolist() == [2.0]
+    assert calls == [["a"], ["b", "c", "d"]]
+
+
+def test_cancelled_submission_does_not_stop_the_worker():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        started.set()
+        release.wait(5)
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    batcher = EmbeddingBatcher(encode, max_batch_size=64, max_wait_ms=0)
+    running = batcher.submit(["running"])
+    assert started.wait(5)
+    # Claimed by the worker, so the caller can no longer cancel it
+    assert not running.cancel()
+
+    cancelled = batcher.submit(["cancelled"])
+    assert cancelled.cancel()
+    release.set()
+    assert running.result(5).shape == (1, 2)
+
+    assert batcher.submit(["next"]).result(5).shape == (1, 2)
+    assert ["cancelled"] not in calls and "cancelled" not in calls[-1]
+
+
+def test_encode_failure_reaches_every_caller_and_the_worker_survives():
+    def encode(texts):
+        if "bad" in texts:
+            raise RuntimeError("model failed")
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    batcher = EmbeddingBatcher(encode, max_batch_size=64, max_wait_ms=0)
+    with pytest.raises(RuntimeError, match="model failed"):
+        batcher.submit(["bad"]).result(5)
+
+    assert batcher.submit(["good"]).result(5).shape == (1, 2)
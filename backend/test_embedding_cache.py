@@ -0,0 +1,105 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from app.rag.embedding_cache import EmbeddingCache, content_hash
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(path=str(tmp_path / "embeddings.sqlite3"), max_entries=100)
+
+
+def last_used(cache: EmbeddingCache, key: str) -> float:
+    with sqlite3.connect(cache.path) as conn:
+        return conn.execute("SELECT last_used FROM embeddings WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_key_separates_models_and_backends():
+    text = "IPSec secures IP traffic."
+    keys = {
+        EmbeddingCache.key("bge-large:torch", text),
+        EmbeddingCache.key("bge-large:int8", text),
+        EmbeddingCache.key("bge-small:torch", text),
+    }
+    assert len(keys) == 3
+    assert EmbeddingCache.key("bge-large:torch", text).endswith(content_hash(text))
+
+
+def test_vectors_never_cross_backends(cache):
+    text = "same chunk"
+    torch_key = EmbeddingCache.key("m:torch", text)
+    cache.put_many([(torch_key, np.ones(4, dtype=np.float32))])
+
+    assert torch_key in cache.get_many([torch_key], dimension=4)
+    assert cache.get_many([EmbeddingCache.key("m:int8", text)], dimension=4) == {}
+
+
+def test_wrong_dimension_is_a_miss(cache):
+    cache.put_many([("k", np.ones(4, dtype=np.float32))])
+
+    assert cache.get_many(["k"], dimension=8) == {}
+    stats = cache.stats()
+    assert stats["hits"] == 0 and stats["misses"] == 1
+
+
+def test_hits_update_recency_in_batches(cache):
+    cache.put_many([("k", np.ones(4, dtype=np.float32))])
+    stored = last_used(cache, "k")
+
+    assert "k" in cache.get_many(["k"], dimension=4)
+    assert last_used(cache, "k") == stored
+
+    cache.flush()
+    assert last_used(cache, "k") >= stored
+    assert cache._touched == {}
+
+
+def test_eviction_drops_least_recently_used(cache, monkeypatch):
+    from app.rag import embedding_cache as cache_module
+
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(cache_module.time, "time", lambda: float(next(clock)))
+    monkeypatch.setattr(cache_module, "EVICT_CHECK_EVERY", 1)
+    cache.max_entries = 2
+    cache.put_many([("old", np.ones(4)), ("used", np.ones(4))])
+    cache.get_many(["used"], dimension=4)
+    # Eviction sees the batched hit on "used" before choosing
+    cache.put_many([("new", np.ones(4))])
+
+    remaining = cache.get_many(["old", "used", "new"], dimension=4)
+    assert set(remaining) == {"used", "new"}
+
+
+def test_transient_texts_bypass_the_cache(tmp_path):
+    pytest.importorskip("langchain_core")
+    from app.rag.embeddings import EmbeddingService
+
+    class CountingEmbeddings(EmbeddingService):
+        BACKENDS = ("counting",)
+
+        def __init__(self):
+            self.forwarded = []
+            super().__init__(model_name="counting", backend="counting")
+
+        def _load_model(self):
+            return None
+
+        @property
+        def dimension(self):
+            return 4
+
+        def _forward(self, texts):
+            self.forwarded.extend(texts)
+            return np.ones((len(texts), 4), dtype=np.float32) / 2
+
+    service = CountingEmbeddings()
+    service.cache = EmbeddingCache(path=str(tmp_path / "embeddings.sqlite3"))
+    service.batcher = None
+
+    service.embed(["query", "chunk"], persist=[False, True])
+    service.embed(["query", "chunk"], persist=[False, True])
+
+    assert service.forwarded == ["query", "chunk", "query"]
+    assert service.cache.stats()["entries"] == 1
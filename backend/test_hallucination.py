@@ -0,0 +1,83 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from app.rag.hallucination import HallucinationDetectorAgent
+
+VOCABULARY = ["ipsec", "tunnel", "tls", "handshake", "moon"]
+
+
+class KeywordEmbeddings:
+    """One dimension per vocabulary word; records every embed call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts, persist=True):
+        self.calls.append(list(texts))
+        vectors = np.array(
+            [[float(word in text.lower()) for word in VOCABULARY] for text in texts],
+            dtype=np.float32
+        )
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+@pytest.fixture
+def detector():
+    detector = HallucinationDetectorAgent.__new__(HallucinationDetectorAgent)
+    detector.embeddings = KeywordEmbeddings()
+    detector.similarity_threshold = 0.76
+    return detector
+
+
+DOCUMENTS = [
+    {"content": "IPSec tunnel mode", "metadata": {}},
+    {"content": "TLS handshake", "metadata": {}},
+    {"content": "IPSec tunnel and TLS handshake", "metadata": {}},
+]
+
+
+def test_claims_are_scored_against_every_chunk_in_one_matrix(detector):
+    answer = "IPSec uses a tunnel. The moon is made of cheese. TLS starts with a handshake"
+    result = detector.detect(answer, DOCUMENTS)
+
+    # One batch for the chunks, one for all the claims
+    assert len(detector.embeddings.calls) == 2
+    assert len(detector.embeddings.calls[1]) == 3
+
+    claims = {claim["text"]: claim for claim in result["claims"]}
+    ipsec = claims["IPSec uses a tunnel"]
+    assert ipsec["supported"] and ipsec["best_chunk"] == 0 and ipsec["evidence_count"] == 1
+    tls = claims["TLS starts with a handshake"]
+    assert tls["supported"] and tls["best_chunk"] == 1
+    assert result["unsupported_claims"] == ["The moon is made of cheese"]
+    assert result["hallucination"] is True
+
+
+def test_precomputed_document_embeddings_are_reused(detector):
+    document_embeddings = detector.embeddings.embed([doc["content"] for doc in DOCUMENTS]).tolist()
+    detector.embeddings.calls.clear()
+
+    result = detector.detect("IPSec uses a tunnel", DOCUMENTS, document_embeddings=document_embeddings)
+
+    assert detector.embeddings.calls == [["IPSec uses a tunnel"]]
+    assert result["hallucination"] is False
+
+
+def test_no_documents_means_every_claim_is_unsupported(detector):
+    result = detector.detect("IPSec uses a tunnel. TLS too", [])
+
+    assert result["hallucination"] is True
+    assert result["unsupported_claims"] == ["IPSec uses a tunnel", "TLS too"]
+
+
+def test_cancelled_check_skips_claim_embedding(detector):
+    cancel = threading.Event()
+    cancel.set()
+    result = detector.detect("IPSec uses a tunnel", DOCUMENTS, cancel=cancel)
+
+    assert result == {"hallucination": False, "unsupported_claims": [], "claims": [], "cancelled": True}
+    assert all("IPSec uses a tunnel" not in call for call in detector.embeddings.calls)
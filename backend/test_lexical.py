@@ -0,0 +1,101 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from app.rag.lexical import BM25Index, tokenize
+
+CHUNKS = {
+    "ipsec": "IPSec secures IP traffic. IPSec uses ESP and AH in tunnel or transport mode.",
+    "tls": "TLS secures a TCP connection with a handshake and certificates.",
+    "tcp": "TCP/IP is the transport protocol suite; TCP handshake opens the connection.",
+    "osi": "The OSI model has seven layers, from physical to application.",
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = BM25Index(path=str(tmp_path))
+    index.update(CHUNKS)
+    return index
+
+
+def test_tokenize_splits_symbols_and_drops_stopwords():
+    assert tokenize("What is TCP/IP?") == ["tcp", "ip"]
+
+
+def test_search_ranks_exact_terms_first(index):
+    assert index.search("IPSec", top_k=4)[0][0] == "ipsec"
+    assert index.search("osi layers", top_k=4)[0][0] == "osi"
+    assert index.search("unrelated words", top_k=4) == []
+
+
+def test_term_frequency_and_rarity_drive_the_score(index):
+    # "tcp" appears twice in "tcp" and once in "tls"; the denser chunk wins
+    ranked = [vector_id for vector_id, _ in index.search("tcp", top_k=4)]
+    assert ranked[:2] == ["tcp", "tls"]
+    # A rare term outweighs a common one
+    scores = dict(index.search("handshake certificates", top_k=4))
+    assert scores["tls"] > scores["tcp"]
+
+
+def test_top_k_limits_and_orders_results(index):
+    results = index.search("tcp handshake secures", top_k=2)
+    assert len(results) == 2
+    assert results[0][1] >= results[1][1]
+
+
+def test_edits_and_save_round_trip(tmp_path, index):
+    index.remove(["osi"])
+    index.update({"dns": "DNS resolves names to addresses."})
+    index.save()
+
+    reopened = BM25Index(path=str(tmp_path))
+    assert len(reopened) == 4
+    assert reopened.contains(["dns", "ipsec"]) and not reopened.contains(["osi"])
+    assert reopened.search("dns names", top_k=1)[0][0] == "dns"
+
+
+def test_reader_reloads_after_another_instance_saves(tmp_path, index):
+    index.save()
+    reader = BM25Index(path=str(tmp_path))
+    assert reader.search("kerberos", top_k=1) == []
+
+    index.update({"kerberos": "Kerberos issues tickets."})
+    index.save()
+    # Make sure the new files differ in mtime even on coarse filesystem clocks
+    later = time.time() + 5
+    for name in (BM25Index.LEXICON_FILE, BM25Index.POSTINGS_FILE):
+        os.utime(os.path.join(str(tmp_path), name), (later, later))
+
+    assert reader.search("kerberos", top_k=1)[0][0] == "kerberos"
+
+
+def test_reciprocal_rank_fusion(tmp_path):
+    pytest.importorskip("langchain_core")
+    from app.rag.retriever import RetrieverAgent
+    from app.rag.vector_store import LocalVectorStore
+
+    store = LocalVectorStore(path=str(tmp_path))
+    store.upsert([
+        {"id": vector_id, "values": np.eye(4)[i].tolist(), "metadata": {"source": vector_id}}
+        for i, vector_id in enumerate(["a", "b", "c", "d"])
+    ])
+    retriever = RetrieverAgent.__new__(RetrieverAgent)
+    retriever.store = store
+
+    dense = [
+        {"id": "a", "score": 0.9, "values": np.eye(4)[0].tolist(), "metadata": {"source": "a"}},
+        {"id": "b", "score": 0.8, "values": np.eye(4)[1].tolist(), "metadata": {"source": "b"}},
+    ]
+    lexical = [("b", 7.0), ("c", 3.0)]
+    fused = retriever._fuse(dense, lexical, np.eye(4)[0].tolist(), None, top_k=3)
+
+    # b is in both rankings; the keyword-only hit c is fetched from the store
+    assert [match["id"] for match in fused] == ["b", "a", "c"]
+    assert fused[2]["values"] == np.eye(4)[2].tolist()
+    assert fused[2]["score"] == pytest.approx(0.0)
+
+    filtered = retriever._fuse(dense, lexical, np.eye(4)[0].tolist(), {"source": {"$ne": "c"}}, top_k=3)
+    assert [match["id"] for match in filtered] == ["b", "a"]
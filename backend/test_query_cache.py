@@ -0,0 +1,103 @@
+import pytest
+
+from app.orchestration import cache as cache_module
+from app.orchestration.cache import QueryCache
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def result(answer: str, *doc_ids: str) -> dict:
+    return {
+        "query": answer,
+        "answer": answer,
+        "validation": {"decision": "trusted", "trust_score": 0.9},
+        "documents": [
+            {"id": doc_id, "content": f"text of {doc_id}", "metadata": {"source": "s"}, "score": 0.8}
+            for doc_id in doc_ids
+        ],
+        "document_embeddings": [[0.1] * 8 for _ in doc_ids],
+        "answer_embedding": [0.2] * 8,
+        "trace": {"nodes": []},
+    }
+
+
+def test_exact_hit_uses_normalized_query():
+    cache = QueryCache()
+    cache.put("What is IPSec?", result("ipsec", "d1"))
+
+    hit = cache.get("  what is   ipsec ")
+    assert hit["tier"] == "exact"
+    assert hit["result"]["answer"] == "ipsec"
+    assert cache.get("what is tls") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = QueryCache(ttl_seconds=60)
+    cache.put("q", result("a", "d1"))
+
+    clock.now += 59
+    assert cache.get("q") is not None
+    clock.now += 2
+    assert cache.get("q") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_entries=2)
+    cache.put("one", result("1", "d1"))
+    cache.put("two", result("2", "d2"))
+    cache.get("one")
+    cache.put("three", result("3", "d3"))
+
+    assert cache.get("two") is None
+    assert cache.get("one") is not None and cache.get("three") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_refreshed_chunks_invalidate_dependent_answers():
+    cache = QueryCache()
+    cache.put("a", result("a", "d1", "d2"))
+    cache.put("b", result("b", "d3"))
+
+    assert cache.invalidate_documents(["d2"]) == 1
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.invalidate_documents([]) == 0
+
+
+def test_cached_payload_is_trimmed_and_copied():
+    cache = QueryCache()
+    state = result("a", "d1")
+    cache.put("a", state)
+    state["validation"]["decision"] = "untrusted"
+    state["documents"][0]["content"] = "mutated"
+
+    cached = cache.get("a")["result"]
+    assert cached["validation"]["decision"] == "trusted"
+    assert cached["documents"][0] == {"id": "d1", "content": "text of d1", "metadata": {"source": "s"}, "score": 0.8}
+    for key in ("document_embeddings", "answer_embedding", "trace"):
+        assert key not in cached
+
+
+def test_semantic_tier_is_off_by_default_and_opt_in():
+    assert not QueryCache().semantic_enabled
+
+    cache = QueryCache(semantic_distance=0.05)
+    cache.put("how does ipsec work", result("ipsec", "d1"), [1.0, 0.0, 0.0])
+
+    hit = cache.get("explain ipsec", [0.99, 0.05, 0.0])
+    assert hit["tier"] == "semantic"
+    assert cache.get("what is tls", [0.0, 1.0, 0.0]) is None
+
+
+def test_empty_query_embedding_skips_the_semantic_tier():
+    cache = QueryCache(semantic_distance=0.05)
+    cache.put("how does ipsec work", result("ipsec", "d1"), [1.0, 0.0, 0.0])
+
+    assert cache.get("", []) is None
+    assert cache.stats()["misses"] == 1
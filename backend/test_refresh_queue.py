@@ -0,0 +1,158 @@
+import pytest
+
+from app.rag import refresh_queue as queue_module
+from app.rag.refresh_queue import RefreshQueue, RefreshWorker
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    monkeypatch.setattr(queue_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return RefreshQueue(
+        path=str(tmp_path / "queue.sqlite3"),
+        max_attempts=3,
+        retry_base_seconds=10,
+        retry_max_seconds=15,
+        lease_seconds=60
+    )
+
+
+def doc(chunk_id: str, content: str = "text") -> dict:
+    return {"id": chunk_id, "content": content, "metadata": {"source": "s"}}
+
+
+def test_requests_for_a_queued_chunk_coalesce(queue):
+    assert queue.enqueue("hallucination", [doc("a"), doc("b")]) == {"queued": 2, "coalesced": 0}
+    assert queue.enqueue("hallucination", [doc("a", "newer"), doc("c")]) == {"queued": 1, "coalesced": 1}
+
+    jobs = {job["chunk_id"]: job for job in queue.claim(10)}
+    assert set(jobs) == {"a", "b", "c"}
+    assert jobs["a"]["document"]["content"] == "newer"
+    # Documents without an id or content are not queued
+    assert queue.enqueue("x", [{"id": "d"}, {"content": "no id"}]) == {"queued": 0, "coalesced": 0}
+
+
+def test_claimed_jobs_are_leased_until_expiry(queue, clock):
+    queue.enqueue("r", [doc("a")])
+    assert [job["chunk_id"] for job in queue.claim(10)] == ["a"]
+    assert queue.claim(10) == []
+    assert queue.stats()["in_flight"] == 1
+
+    # A crashed worker's lease runs out
+    clock.now += 61
+    assert [job["chunk_id"] for job in queue.claim(10)] == ["a"]
+
+
+def test_complete_keeps_a_job_requeued_while_it_ran(queue):
+    queue.enqueue("r", [doc("a"), doc("b")])
+    jobs = queue.claim(10)
+    queue.enqueue("r", [doc("a", "edited again")])
+    queue.complete(jobs)
+
+    remaining = queue.claim(10)
+    assert [(job["chunk_id"], job["document"]["content"]) for job in remaining] == [("a", "edited again")]
+    assert queue.stats()["pending"] == 1
+
+
+def test_failures_back_off_then_park_as_failed(queue, clock):
+    queue.enqueue("r", [doc("a")])
+
+    queue.fail(queue.claim(10), "boom")
+    assert queue.claim(10) == []
+    clock.now += 10
+    jobs = queue.claim(10)
+    assert jobs[0]["attempts"] == 1
+
+    # Second retry waits 20s, capped at retry_max_seconds
+    queue.fail(jobs, "boom")
+    clock.now += 14
+    assert queue.claim(10) == []
+    clock.now += 1
+    jobs = queue.claim(10)
+
+    queue.fail(jobs, "boom")
+    clock.now += 1000
+    assert queue.claim(10) == []
+    stats = queue.stats()
+    assert stats["failed"] == 1 and stats["pending"] == 0
+    assert stats["jobs"]["retried"] == 2 and stats["jobs"]["failed"] == 1
+
+    # A new request for a failed chunk starts over
+    assert queue.enqueue("r", [doc("a")]) == {"queued": 1, "coalesced": 0}
+    assert queue.claim(10)[0]["attempts"] == 0
+
+
+def test_completed_chunks_are_logged_for_every_worker(tmp_path, queue):
+    other = RefreshQueue(path=queue.path)
+    start = other.refreshed_position()
+
+    queue.enqueue("r", [doc("a"), doc("b")])
+    queue.complete(queue.claim(10))
+
+    position, chunk_ids = other.refreshed_since(start)
+    assert sorted(chunk_ids) == ["a", "b"]
+    assert other.refreshed_since(position) == (position, [])
+
+
+def test_worker_refreshes_by_reason_and_broadcasts(queue):
+    refreshed, broadcast = [], []
+    worker = RefreshWorker(
+        queue,
+        refresh=lambda reason, documents: refreshed.append((reason, [d["id"] for d in documents])),
+        on_refreshed=broadcast.extend
+    )
+    queue.enqueue("hallucination", [doc("a")])
+    queue.enqueue("outdated", [doc("b")])
+
+    for job in queue.claim(10):
+        worker._process(job["reason"], [job])
+    worker._broadcast()
+
+    assert sorted(refreshed) == [("hallucination", ["a"]), ("outdated", ["b"])]
+    assert sorted(broadcast) == ["a", "b"]
+
+
+def test_worker_failure_schedules_a_retry(queue):
+    def refresh(reason, documents):
+        raise RuntimeError("store unavailable")
+
+    worker = RefreshWorker(queue, refresh=refresh)
+    queue.enqueue("r", [doc("a")])
+    worker._process("r", queue.claim(10))
+
+    assert queue.stats()["jobs"]["retried"] == 1
+    assert queue.stats()["pending"] == 1
+
+
+def test_chunks_refreshed_outside_the_queue_reach_every_worker(queue):
+    other = RefreshQueue(path=queue.path)
+    start = other.refreshed_position()
+
+    queue.mark_refreshed(["a", None, "b"])
+    queue.mark_refreshed([])
+
+    assert other.refreshed_since(start)[1] == ["a", "b"]
+
+
+def test_worker_without_refresh_only_follows_the_log(queue, monkeypatch):
+    broadcast = []
+    worker = RefreshWorker(queue, refresh=None, on_refreshed=broadcast.extend)
+    queue.enqueue("r", [doc("queued")])
+    queue.mark_refreshed(["before start"])
+
+    def stop(timeout):
+        raise InterruptedError
+    monkeypatch.setattr(worker._wake, "wait", stop)
+    with pytest.raises(InterruptedError):
+        worker._run()
+
+    # Started at the end of the log, and left the job for a draining worker
+    assert broadcast == []
+    assert queue.stats()["in_flight"] == 0
+    queue.mark_refreshed(["ingested"])
+    worker._broadcast()
+    assert broadcast == ["ingested"]
@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+
+from app.rag.vector_store import TEXT_KEY, LocalVectorStore, _matches_filter
+
+
+def make_vectors(count: int, dimension: int = 32, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(count, dimension)).astype(np.float32)
+    return [
+        {
+            "id": f"chunk-{i}",
+            "values": values[i].tolist(),
+            "metadata": {TEXT_KEY: f"text {i}", "source": f"book-{i % 3}", "page": i // 10}
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def vectors():
+    return make_vectors(400)
+
+
+def test_ivf_probing_every_list_matches_exact_search(tmp_path, vectors):
+    exact = LocalVectorStore(path=str(tmp_path / "exact"), search="exact")
+    ivf = LocalVectorStore(path=str(tmp_path / "ivf"), search="ivf", nprobe=1000, ivf_min_vectors=100)
+    for store in (exact, ivf):
+        store.upsert(vectors)
+        store.flush()
+    assert ivf._ivf is not None
+
+    for query in make_vectors(10, seed=1):
+        expected = exact.query(query["values"], top_k=5)
+        actual = ivf.query(query["values"], top_k=5)
+        assert [m["id"] for m in actual] == [m["id"] for m in expected]
+        assert [m["score"] for m in actual] == pytest.approx([m["score"] for m in expected])
+
+
+def test_ivf_recall_with_default_probes(tmp_path, vectors):
+    exact = LocalVectorStore(path=str(tmp_path / "exact"), search="exact")
+    ivf = LocalVectorStore(path=str(tmp_path / "ivf"), search="ivf", nprobe=8, ivf_min_vectors=100)
+    for store in (exact, ivf):
+        store.upsert(vectors)
+        store.flush()
+
+    # A stored vector is its own nearest neighbour in both modes
+    for vector in vectors[:50]:
+        assert ivf.query(vector["values"], top_k=1)[0]["id"] == vector["id"]
+        assert exact.query(vector["values"], top_k=1)[0]["id"] == vector["id"]
+
+
+def test_rows_added_after_ivf_build_are_searched(tmp_path, vectors):
+    store = LocalVectorStore(path=str(tmp_path), search="ivf", nprobe=1, ivf_min_vectors=100)
+    store.upsert(vectors)
+    store.flush()
+    extra = make_vectors(1, seed=7)[0]
+    extra["id"] = "late"
+    store.upsert([extra])
+
+    assert store.query(extra["values"], top_k=1)[0]["id"] == "late"
+
+
+def test_metadata_filter_in_query(tmp_path, vectors):
+    store = LocalVectorStore(path=str(tmp_path), search="exact")
+    store.upsert(vectors)
+
+    matches = store.query(vectors[0]["values"], top_k=5, metadata_filter={"source": "book-1"})
+    assert len(matches) == 5
+    assert all(m["metadata"]["source"] == "book-1" for m in matches)
+
+    matches = store.query(
+        vectors[0]["values"], top_k=50,
+        metadata_filter={"$and": [{"source": {"$in": ["book-0", "book-2"]}}, {"page": {"$gte": 30}}]}
+    )
+    assert matches
+    assert all(m["metadata"]["source"] != "book-1" and m["metadata"]["page"] >= 30 for m in matches)
+
+
+@pytest.mark.parametrize("metadata_filter, expected", [
+    ({"source": "a"}, True),
+    ({"source": {"$ne": "a"}}, False),
+    ({"page": {"$gt": 2, "$lte": 3}}, True),
+    ({"page": {"$lt": 3}}, False),
+    ({"missing": {"$gte": 1}}, False),
+    ({"source": {"$nin": ["b", "c"]}}, True),
+    ({"$or": [{"source": "b"}, {"page": 3}]}, True),
+    ({"$or": [{"source": "b"}, {"page": 4}]}, False),
+])
+def test_matches_filter(metadata_filter, expected):
+    assert _matches_filter({"source": "a", "page": 3}, metadata_filter) is expected
+
+
+def test_flush_persists_and_delete_removes(tmp_path, vectors):
+    store = LocalVectorStore(path=str(tmp_path), search="exact")
+    store.upsert(vectors[:20])
+    store.delete(["chunk-3"])
+    store.flush()
+
+    reopened = LocalVectorStore(path=str(tmp_path), search="exact")
+    assert reopened.count() == 19
+    assert "chunk-3" not in reopened.fetch(["chunk-3", "chunk-4"])
+    assert reopened.query(vectors[4]["values"], top_k=1)[0]["id"] == "chunk-4"
+
+
+def test_reader_sees_vectors_another_process_flushed(tmp_path, vectors):
+    api = LocalVectorStore(path=str(tmp_path), search="exact")
+    assert api.count() == 0
+
+    ingest = LocalVectorStore(path=str(tmp_path), search="exact")
+    ingest.upsert(vectors[:10])
+    ingest.flush()
+
+    assert api.count() == 10
+    assert api.query(vectors[3]["values"], top_k=1)[0]["id"] == "chunk-3"
+
+
+def test_flush_merges_instead_of_overwriting(tmp_path, vectors):
+    api = LocalVectorStore(path=str(tmp_path), search="exact")
+    ingest = LocalVectorStore(path=str(tmp_path), search="exact")
+    ingest.upsert(vectors[:10])
+    ingest.flush()
+
+    # The API worker refreshes and deletes chunks it loaded before the ingest flushed
+    api.upsert([dict(vectors[3], values=vectors[20]["values"])])
+    api.delete(["chunk-4"])
+    ingest.upsert(vectors[10:15])
+    ingest.delete(["chunk-5"])
+    ingest.flush()
+    api.flush()
+
+    reopened = LocalVectorStore(path=str(tmp_path), search="exact")
+    assert reopened.count() == 13
+    assert set(reopened.fetch([f"chunk-{i}" for i in range(15)])) == (
+        {f"chunk-{i}" for i in range(15)} - {"chunk-4", "chunk-5"}
+    )
+    assert reopened.query(vectors[20]["values"], top_k=1)[0]["id"] == "chunk-3"
+
+
+def test_ivf_lists_from_another_flush_are_not_reused(tmp_path, vectors):
+    store = LocalVectorStore(path=str(tmp_path), search="ivf", nprobe=1000, ivf_min_vectors=100)
+    store.upsert(vectors)
+    store.flush()
+    other = LocalVectorStore(path=str(tmp_path), search="exact")
+    other.delete(["chunk-0"])
+    other.flush()
+
+    assert store.count() == 399
+    assert store._ivf is None
+    assert store.query(vectors[1]["values"], top_k=1)[0]["id"] == "chunk-1"
+
+
+def test_delete_matching_removes_by_metadata(tmp_path, vectors):
+    store = LocalVectorStore(path=str(tmp_path), search="exact")
+    store.upsert(vectors[:30])
+
+    deleted = store.delete_matching({"source": "book-1"})
+
+    assert sorted(deleted) == sorted(f"chunk-{i}" for i in range(1, 30, 3))
+    assert store.count() == 20
+    assert store.delete_matching({"source": "book-1"}) == []